@@ -0,0 +1,48 @@
+"""Store itinerary and search history travel dates as DATE
+
+Revision ID: 004_travel_dates_as_date
+Revises: 003_add_chat_sessions
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "004_travel_dates_as_date"
+down_revision: Union[str, None] = "003_add_chat_sessions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, nullable) pairs whose travel_start / travel_end columns hold calendar dates.
+_TRAVEL_DATE_TABLES = (
+    ("itineraries", False),
+    ("search_history", True),
+)
+
+
+def _alter_travel_columns(from_type: sa.types.TypeEngine, to_type: sa.types.TypeEngine, cast: str) -> None:
+    for table, nullable in _TRAVEL_DATE_TABLES:
+        # batch mode recreates the table on SQLite, which can't ALTER COLUMN TYPE
+        with op.batch_alter_table(table) as batch_op:
+            for column in ("travel_start", "travel_end"):
+                batch_op.alter_column(
+                    column,
+                    existing_type=from_type,
+                    type_=to_type,
+                    existing_nullable=nullable,
+                    postgresql_using=f"{column}::{cast}",
+                )
+
+
+def upgrade() -> None:
+    # Values were always written as midnight datetimes, so the cast is lossless.
+    _alter_travel_columns(sa.DateTime(), sa.Date(), "date")
+
+
+def downgrade() -> None:
+    _alter_travel_columns(sa.Date(), sa.DateTime(), "timestamp")
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from datetime import date
 
 from app.services.agent_service import TravelResearchAgent, research_travel_destination
+from app.utils.keyword_scan import compile_keyword_table, labels_in
 
 router = APIRouter(prefix="/api/v1/agent", tags=["ai-agent"])
 
@@ -51,6 +52,15 @@ class ChatRequest(BaseModel):
 # Initialize agent
 agent = TravelResearchAgent()
 
+# Chat intent -> trigger phrases, in priority order
+_CHAT_INTENT_PHRASES = {
+    "research": ["research", "tell me about", "info on", "what is"],
+    "compare": ["compare", "vs", "versus", "difference between"],
+    "gems": ["hidden gem", "secret", "off beaten", "less touristy"],
+    "itinerary": ["itinerary", "plan", "schedule", "day by day"],
+}
+_CHAT_INTENT_SCAN = compile_keyword_table(_CHAT_INTENT_PHRASES)
+
 
 @router.post("/research")
 async def research_destination(request: ResearchRequest):
@@ -178,7 +188,8 @@ async def agent_chat(request: ChatRequest):
         message = request.message.lower()
         
         # Simple intent detection
-        if any(word in message for word in ["research", "tell me about", "info on", "what is"]):
+        intents = labels_in(message, _CHAT_INTENT_SCAN)
+        if "research" in intents:
             # Extract destination (simplified)
             words = message.replace("tell me about", "").replace("research", "").replace("what is", "").strip()
             if words:
@@ -190,7 +201,7 @@ async def agent_chat(request: ChatRequest):
                     "data": result
                 }
         
-        elif any(word in message for word in ["compare", "vs", "versus", "difference between"]):
+        elif "compare" in intents:
             # Extract destinations to compare
             return {
                 "status": "success",
@@ -198,7 +209,7 @@ async def agent_chat(request: ChatRequest):
                 "message": "I'd be happy to compare destinations for you! Please use the compare tool and enter the destinations you'd like to compare."
             }
         
-        elif any(word in message for word in ["hidden gem", "secret", "off beaten", "less touristy"]):
+        elif "gems" in intents:
             # Extract region
             return {
                 "status": "success",
@@ -206,7 +217,7 @@ async def agent_chat(request: ChatRequest):
                 "message": "I can help you find hidden gems! Please specify which region you're interested in exploring."
             }
         
-        elif any(word in message for word in ["itinerary", "plan", "schedule", "day by day"]):
+        elif "itinerary" in intents:
             return {
                 "status": "success",
                 "response_type": "itinerary_prompt",
@@ -7,7 +7,7 @@ RESTful API endpoints for the autonomous AI travel agent.
 
 from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.responses import StreamingResponse
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import json
 import time
@@ -21,6 +21,7 @@ from app.utils.destination_affinity_graph import get_destination_affinity_graph
 from app.utils.logging_config import get_logger
 from app.utils.datetime_utils import utcnow_naive
 from app.utils.hypothesis_engine import get_hypothesis_engine
+from app.utils.keyword_scan import compile_keyword_table, first_label
 from app.utils.meta_learner import get_meta_learner
 from app.services.proactive_agent import get_proactive_agent
 from app.utils.user_style_classifier import get_user_style_classifier
@@ -303,53 +304,57 @@ def _recent_learning_signals(planning_data: Dict[str, Any], limit: int = 8) -> L
     return recent
 
 
+# Canonical learning feature -> keywords that map to it (first match wins),
+# and exact aliases checked before the keyword scan
+_LEARNING_FEATURE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "food": ("food", "restaurant", "dining", "cuisine", "street food", "eat"),
+    "weather": ("weather", "climate", "sunny", "warm", "cold", "rain"),
+    "attractions": ("attraction", "sightseeing", "museum", "landmark", "things to do"),
+    "visa_ease": ("visa", "entry", "passport"),
+    "flight_time": ("flight", "airport", "layover", "nonstop"),
+    "price": ("price", "budget", "cost", "affordable", "hotel"),
+    "nightlife": ("nightlife", "bar", "club", "party"),
+    "family": ("family", "kids", "children"),
+    "culture": ("culture", "history", "art", "architecture"),
+    "beach": ("beach", "island", "coast", "seaside"),
+    "nature": ("nature", "hiking", "mountain", "park", "outdoors"),
+    "luxury": ("luxury", "premium", "resort", "upscale"),
+}
+_LEARNING_FEATURE_SCAN = compile_keyword_table(_LEARNING_FEATURE_KEYWORDS)
+_LEARNING_FEATURE_ALIASES: Dict[str, str] = {
+    "restaurants": "food",
+    "restaurant": "food",
+    "dining": "food",
+    "events": "nightlife",
+    "flights": "flight_time",
+    "visa": "visa_ease",
+    "hotels": "price",
+    "hotel": "price",
+    "history": "culture",
+    "art": "culture",
+}
+
+
 def _normalize_learning_feature(value: Any) -> Optional[str]:
     text = str(value or "").strip().lower().replace("-", " ").replace("_", " ")
     if not text:
         return None
 
-    keyword_map = {
-        "food": ["food", "restaurant", "dining", "cuisine", "street food", "eat"],
-        "weather": ["weather", "climate", "sunny", "warm", "cold", "rain"],
-        "attractions": ["attraction", "sightseeing", "museum", "landmark", "things to do"],
-        "visa_ease": ["visa", "entry", "passport"],
-        "flight_time": ["flight", "airport", "layover", "nonstop"],
-        "price": ["price", "budget", "cost", "affordable", "hotel"],
-        "nightlife": ["nightlife", "bar", "club", "party"],
-        "family": ["family", "kids", "children"],
-        "culture": ["culture", "history", "art", "architecture"],
-        "beach": ["beach", "island", "coast", "seaside"],
-        "nature": ["nature", "hiking", "mountain", "park", "outdoors"],
-        "luxury": ["luxury", "premium", "resort", "upscale"],
-    }
-    alias_map = {
-        "restaurants": "food",
-        "restaurant": "food",
-        "dining": "food",
-        "events": "nightlife",
-        "flights": "flight_time",
-        "visa": "visa_ease",
-        "hotels": "price",
-        "hotel": "price",
-        "history": "culture",
-        "art": "culture",
-    }
-    if text in alias_map:
-        return alias_map[text]
-    if text in keyword_map:
+    if text in _LEARNING_FEATURE_ALIASES:
+        return _LEARNING_FEATURE_ALIASES[text]
+    if text in _LEARNING_FEATURE_KEYWORDS:
         return text
-    for canonical, keywords in keyword_map.items():
-        if any(keyword in text for keyword in keywords):
-            return canonical
-    return None
+    return first_label(text, _LEARNING_FEATURE_KEYWORDS, _LEARNING_FEATURE_SCAN)
 
 
 def _extract_feedback_features(session: Optional[Any], destination: str, comment: str) -> list[str]:
     features: list[str] = []
+    seen: set[str] = set()
 
     def add_feature(value: Any) -> None:
         normalized = _normalize_learning_feature(value)
-        if normalized and normalized not in features:
+        if normalized and normalized not in seen:
+            seen.add(normalized)
             features.append(normalized)
 
     if not session:
@@ -363,10 +368,11 @@ def _extract_feedback_features(session: Optional[Any], destination: str, comment
     plan = plan if isinstance(plan, dict) else {}
     destination_data = plan.get("destination_data") if isinstance(plan.get("destination_data"), dict) else {}
 
+    destination_lower = str(destination).strip().lower()
     target_key = destination if destination in destination_data else None
     if target_key is None:
         for key in destination_data.keys():
-            if str(key).strip().lower() == str(destination).strip().lower():
+            if str(key).strip().lower() == destination_lower:
                 target_key = key
                 break
 
@@ -410,24 +416,25 @@ def _build_hypothesis_research_snapshot(
     plan = plan if isinstance(plan, dict) else {}
     destination_data = plan.get("destination_data") if isinstance(plan.get("destination_data"), dict) else {}
 
+    destination_lower = str(destination).strip().lower()
     target_key = destination if destination in destination_data else None
     if target_key is None:
         for key in destination_data.keys():
-            if str(key).strip().lower() == str(destination).strip().lower():
+            if str(key).strip().lower() == destination_lower:
                 target_key = key
                 break
 
     if target_key is not None and isinstance(destination_data.get(target_key), dict):
         snapshot.update(destination_data[target_key])
 
+    # `derived_features` keeps first-seen order; `seen` makes the duplicate
+    # check O(1)
     derived_features: list[str] = []
-    for feature in features:
+    seen: set[str] = set()
+    for feature in (*features, *snapshot.keys()):
         normalized = _normalize_learning_feature(feature)
-        if normalized and normalized not in derived_features:
-            derived_features.append(normalized)
-    for section in snapshot.keys():
-        normalized = _normalize_learning_feature(section)
-        if normalized and normalized not in derived_features:
+        if normalized and normalized not in seen:
+            seen.add(normalized)
             derived_features.append(normalized)
 
     if derived_features:
@@ -443,7 +450,7 @@ def _build_hypothesis_research_snapshot(
             if not isinstance(ev, dict):
                 continue
             ev_dest = str(ev.get("destination") or "").strip().lower()
-            if ev_dest == str(destination).strip().lower():
+            if ev_dest == destination_lower:
                 criteria_scores = ev.get("criteria_scores") or ev.get("scores") or {}
                 if criteria_scores:
                     snapshot["criteria_scores"] = dict(criteria_scores)
@@ -457,7 +464,8 @@ def _build_hypothesis_research_snapshot(
                         # Add them to features so hypothesis engine can pattern-match
                         for wc in weak_criteria:
                             neg_feature = f"low_{wc}"
-                            if neg_feature not in derived_features:
+                            if neg_feature not in seen:
+                                seen.add(neg_feature)
                                 derived_features.append(neg_feature)
                         snapshot["features"] = derived_features
                 break
@@ -1005,8 +1013,9 @@ async def submit_plan_feedback(
         engagement_log = session.planning_data.get("engagement_log") if session else []
         destination_engagement_ms = 0
         if isinstance(engagement_log, list):
+            destination_lower = str(destination).strip().lower()
             for evt in engagement_log:
-                if str(evt.get("destination") or "").strip().lower() != str(destination).strip().lower():
+                if str(evt.get("destination") or "").strip().lower() != destination_lower:
                     continue
                 try:
                     destination_engagement_ms += int(evt.get("time_spent_ms", evt.get("duration_ms", 0)) or 0)
@@ -1,69 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from datetime import datetime, time, timedelta
 
 from app.database.connection import get_db
 from app.database.models import Itinerary, ItineraryDay, ItineraryActivity, User
 from app.models.itinerary import (
     ItineraryCreate, ItineraryUpdate, ItineraryResponse, ItinerarySummary,
     ItineraryDayCreate, ItineraryDayUpdate,
-    ItineraryActivityCreate, ItineraryActivityUpdate, ItineraryActivityResponse
+    ItineraryActivityCreate, ItineraryActivityUpdate
 )
+from app.utils.http_cache import cache_control, cached_json_response
 from app.utils.security import get_current_user
 
 router = APIRouter(prefix="/api/v1/itineraries", tags=["itineraries"])
 
+_MIDNIGHT = time(0, 0)
+_CACHE_PUBLIC_LIST = cache_control(60)
 
-def _activity_to_response(activity: ItineraryActivity) -> dict:
-    """Convert activity DB model to response dict"""
-    return {
-        "id": activity.id,
-        "day_id": activity.day_id,
-        "title": activity.title,
-        "description": activity.description,
-        "activity_type": activity.activity_type,
-        "start_time": activity.start_time,
-        "end_time": activity.end_time,
-        "location_name": activity.location_name,
-        "latitude": activity.latitude,
-        "longitude": activity.longitude,
-        "cost": activity.cost,
-        "booking_reference": activity.booking_reference,
-        "notes": activity.notes,
-        "created_at": activity.created_at
-    }
+# The _itinerary_to_* helpers below build dicts that already match the
+# ItineraryResponse / ItinerarySummary schemas, so handlers return them through
+# ORJSONResponse directly. Returning a Response skips FastAPI's response_model
+# validation and jsonable_encoder pass; response_model is kept on the routes for
+# the OpenAPI docs only. Keep _itinerary_to_summary in sync with ItinerarySummary.
 
 
-def _day_to_response(day: ItineraryDay) -> dict:
-    """Convert day DB model to response dict"""
-    return {
-        "id": day.id,
-        "itinerary_id": day.itinerary_id,
-        "day_number": day.day_number,
-        "date": day.date,
-        "notes": day.notes,
-        "activities": [_activity_to_response(a) for a in day.activities]
-    }
+_WITH_DAYS_AND_ACTIVITIES = selectinload(Itinerary.days).selectinload(ItineraryDay.activities)
+
+
+def _load_itinerary(db: Session, itinerary_id: str) -> Optional[Itinerary]:
+    """Load an itinerary with its days and activities eager-loaded.
+
+    Two IN-style SELECTs fetch the whole graph, so rendering the response
+    doesn't trigger a lazy load per day.
+    """
+    return db.execute(
+        select(Itinerary).options(_WITH_DAYS_AND_ACTIVITIES).where(Itinerary.id == itinerary_id)
+    ).scalar_one_or_none()
 
 
 def _itinerary_to_response(itinerary: Itinerary) -> dict:
-    """Convert itinerary DB model to response dict"""
-    return {
-        "id": itinerary.id,
-        "user_id": itinerary.user_id,
-        "title": itinerary.title,
-        "destination_id": itinerary.destination_id,
-        "destination_name": itinerary.destination_name,
-        "destination_country": itinerary.destination_country,
-        "travel_start": itinerary.travel_start.date(),
-        "travel_end": itinerary.travel_end.date(),
-        "notes": itinerary.notes,
-        "is_public": itinerary.is_public,
-        "created_at": itinerary.created_at,
-        "updated_at": itinerary.updated_at,
-        "days": [_day_to_response(d) for d in sorted(itinerary.days, key=lambda x: x.day_number)]
-    }
+    """Convert itinerary DB model (with its days and activities) to a JSON-ready response dict.
+
+    ItineraryResponse validates straight from the ORM attributes (from_attributes),
+    so pydantic-core walks the day/activity graph instead of hand-copied dicts.
+    Days come back ordered by day_number via the relationship's order_by.
+    """
+    return ItineraryResponse.model_validate(itinerary).model_dump(mode="json")
+
+
+def _commit_and_render(db: Session, itinerary: Itinerary) -> ORJSONResponse:
+    """Flush pending changes, render the in-memory graph, then commit.
+
+    Rendering happens before the commit expires the session, so the graph
+    loaded by owned_itinerary is reused for the response without reloading.
+    """
+    db.flush()
+    itinerary.days.sort(key=lambda d: d.day_number)
+    payload = _itinerary_to_response(itinerary)
+    db.commit()
+    return ORJSONResponse(payload)
 
 
 def _itinerary_to_summary(itinerary: Itinerary) -> dict:
@@ -74,8 +72,8 @@ def _itinerary_to_summary(itinerary: Itinerary) -> dict:
         "title": itinerary.title,
         "destination_name": itinerary.destination_name,
         "destination_country": itinerary.destination_country,
-        "travel_start": itinerary.travel_start.date(),
-        "travel_end": itinerary.travel_end.date(),
+        "travel_start": itinerary.travel_start,
+        "travel_end": itinerary.travel_end,
         "is_public": itinerary.is_public,
         "created_at": itinerary.created_at,
         "total_days": len(itinerary.days),
@@ -100,8 +98,8 @@ async def create_itinerary(
         destination_id=itinerary_data.destination_id,
         destination_name=itinerary_data.destination_name,
         destination_country=itinerary_data.destination_country,
-        travel_start=datetime.combine(itinerary_data.travel_start, datetime.min.time()),
-        travel_end=datetime.combine(itinerary_data.travel_end, datetime.min.time()),
+        travel_start=itinerary_data.travel_start,
+        travel_end=itinerary_data.travel_end,
         notes=itinerary_data.notes,
         is_public=itinerary_data.is_public
     )
@@ -140,10 +138,7 @@ async def create_itinerary(
     else:
         # Auto-generate empty days
         for i in range(num_days):
-            day_date = datetime.combine(
-                itinerary_data.travel_start + timedelta(days=i),
-                datetime.min.time()
-            )
+            day_date = datetime.combine(itinerary_data.travel_start + timedelta(days=i), _MIDNIGHT)
             db_day = ItineraryDay(
                 itinerary_id=db_itinerary.id,
                 day_number=i + 1,
@@ -152,10 +147,11 @@ async def create_itinerary(
             )
             db.add(db_day)
     
+    itinerary_id = db_itinerary.id
     db.commit()
-    db.refresh(db_itinerary)
+    db_itinerary = _load_itinerary(db, itinerary_id)
     
-    return _itinerary_to_response(db_itinerary)
+    return ORJSONResponse(_itinerary_to_response(db_itinerary), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=List[ItinerarySummary])
@@ -164,60 +160,90 @@ async def list_itineraries(
     db: Session = Depends(get_db)
 ):
     """List all itineraries for the current user"""
-    itineraries = db.query(Itinerary).filter(
+    itineraries = db.query(Itinerary).options(_WITH_DAYS_AND_ACTIVITIES).filter(
         Itinerary.user_id == current_user.id
     ).order_by(Itinerary.created_at.desc()).all()
     
-    return [_itinerary_to_summary(i) for i in itineraries]
+    return ORJSONResponse([_itinerary_to_summary(i) for i in itineraries])
 
 
 @router.get("/public", response_model=List[ItinerarySummary])
 async def list_public_itineraries(
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """List all public itineraries"""
-    itineraries = db.query(Itinerary).filter(
+    itineraries = db.query(Itinerary).options(_WITH_DAYS_AND_ACTIVITIES).filter(
         Itinerary.is_public == True
     ).order_by(Itinerary.created_at.desc()).all()
     
-    return [_itinerary_to_summary(i) for i in itineraries]
+    return cached_json_response(request, [_itinerary_to_summary(i) for i in itineraries], _CACHE_PUBLIC_LIST)
 
 
-@router.get("/{itinerary_id}", response_model=ItineraryResponse)
-async def get_itinerary(
+def viewable_itinerary(
     itinerary_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
-):
-    """Get a specific itinerary"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
-    
+) -> Itinerary:
+    """Dependency: the eager-loaded itinerary if the user owns it or it is public"""
+    itinerary = _load_itinerary(db, itinerary_id)
+
     if not itinerary:
         raise HTTPException(status_code=404, detail="Itinerary not found")
-    
-    # Check if user owns the itinerary or if it's public
+
     if itinerary.user_id != current_user.id and not itinerary.is_public:
         raise HTTPException(status_code=403, detail="Not authorized to view this itinerary")
-    
-    return _itinerary_to_response(itinerary)
 
+    return itinerary
 
-@router.put("/{itinerary_id}", response_model=ItineraryResponse)
-async def update_itinerary(
+
+def owned_itinerary(
     itinerary_id: str,
-    update_data: ItineraryUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
-):
-    """Update an itinerary"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
-    
+) -> Itinerary:
+    """Dependency: the eager-loaded itinerary if the user owns it"""
+    itinerary = _load_itinerary(db, itinerary_id)
+
     if not itinerary:
         raise HTTPException(status_code=404, detail="Itinerary not found")
-    
+
     if itinerary.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this itinerary")
-    
+        raise HTTPException(status_code=403, detail="Not authorized to modify this itinerary")
+
+    return itinerary
+
+
+def _find_day(itinerary: Itinerary, day_id: str) -> ItineraryDay:
+    """Look up a day in the loaded itinerary or raise 404"""
+    day = next((d for d in itinerary.days if d.id == day_id), None)
+    if not day:
+        raise HTTPException(status_code=404, detail="Day not found")
+    return day
+
+
+def _find_activity(itinerary: Itinerary, day_id: str, activity_id: str) -> ItineraryActivity:
+    """Look up an activity in the loaded itinerary or raise 404"""
+    day = next((d for d in itinerary.days if d.id == day_id), None)
+    activity = next((a for a in day.activities if a.id == activity_id), None) if day else None
+    if not activity:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return activity
+
+
+@router.get("/{itinerary_id}", response_model=ItineraryResponse)
+async def get_itinerary(itinerary: Itinerary = Depends(viewable_itinerary)):
+    """Get a specific itinerary"""
+    return ORJSONResponse(_itinerary_to_response(itinerary))
+
+
+@router.put("/{itinerary_id}", response_model=ItineraryResponse)
+async def update_itinerary(
+    update_data: ItineraryUpdate,
+    itinerary: Itinerary = Depends(owned_itinerary),
+    db: Session = Depends(get_db)
+):
+    """Update an itinerary"""
     # Update fields
     if update_data.title is not None:
         itinerary.title = update_data.title
@@ -226,31 +252,19 @@ async def update_itinerary(
     if update_data.is_public is not None:
         itinerary.is_public = update_data.is_public
     if update_data.travel_start is not None:
-        itinerary.travel_start = datetime.combine(update_data.travel_start, datetime.min.time())
+        itinerary.travel_start = update_data.travel_start
     if update_data.travel_end is not None:
-        itinerary.travel_end = datetime.combine(update_data.travel_end, datetime.min.time())
+        itinerary.travel_end = update_data.travel_end
     
-    db.commit()
-    db.refresh(itinerary)
-    
-    return _itinerary_to_response(itinerary)
+    return _commit_and_render(db, itinerary)
 
 
 @router.delete("/{itinerary_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_itinerary(
-    itinerary_id: str,
-    current_user: User = Depends(get_current_user),
+    itinerary: Itinerary = Depends(owned_itinerary),
     db: Session = Depends(get_db)
 ):
     """Delete an itinerary"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
-    
-    if not itinerary:
-        raise HTTPException(status_code=404, detail="Itinerary not found")
-    
-    if itinerary.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this itinerary")
-    
     db.delete(itinerary)
     db.commit()
     
@@ -261,67 +275,31 @@ async def delete_itinerary(
 
 @router.post("/{itinerary_id}/days", response_model=ItineraryResponse)
 async def add_day(
-    itinerary_id: str,
     day_data: ItineraryDayCreate,
-    current_user: User = Depends(get_current_user),
+    itinerary: Itinerary = Depends(owned_itinerary),
     db: Session = Depends(get_db)
 ):
     """Add a day to an itinerary"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
-    
-    if not itinerary:
-        raise HTTPException(status_code=404, detail="Itinerary not found")
-    
-    if itinerary.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to modify this itinerary")
-    
     db_day = ItineraryDay(
-        itinerary_id=itinerary_id,
         day_number=day_data.day_number,
         date=day_data.date,
-        notes=day_data.notes
+        notes=day_data.notes,
+        activities=[ItineraryActivity(**a.model_dump()) for a in day_data.activities]
     )
-    db.add(db_day)
-    db.flush()
-    
-    # Add activities
-    for activity_data in day_data.activities:
-        db_activity = ItineraryActivity(
-            day_id=db_day.id,
-            **activity_data.model_dump()
-        )
-        db.add(db_activity)
+    itinerary.days.append(db_day)
     
-    db.commit()
-    db.refresh(itinerary)
-    
-    return _itinerary_to_response(itinerary)
+    return _commit_and_render(db, itinerary)
 
 
 @router.put("/{itinerary_id}/days/{day_id}", response_model=ItineraryResponse)
 async def update_day(
-    itinerary_id: str,
     day_id: str,
     day_data: ItineraryDayUpdate,
-    current_user: User = Depends(get_current_user),
+    itinerary: Itinerary = Depends(owned_itinerary),
     db: Session = Depends(get_db)
 ):
     """Update a day in an itinerary"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
-    
-    if not itinerary:
-        raise HTTPException(status_code=404, detail="Itinerary not found")
-    
-    if itinerary.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to modify this itinerary")
-    
-    day = db.query(ItineraryDay).filter(
-        ItineraryDay.id == day_id,
-        ItineraryDay.itinerary_id == itinerary_id
-    ).first()
-    
-    if not day:
-        raise HTTPException(status_code=404, detail="Day not found")
+    day = _find_day(itinerary, day_id)
     
     if day_data.day_number is not None:
         day.day_number = day_data.day_number
@@ -330,147 +308,69 @@ async def update_day(
     if day_data.notes is not None:
         day.notes = day_data.notes
     
-    db.commit()
-    db.refresh(itinerary)
-    
-    return _itinerary_to_response(itinerary)
+    return _commit_and_render(db, itinerary)
 
 
 @router.delete("/{itinerary_id}/days/{day_id}", response_model=ItineraryResponse)
 async def delete_day(
-    itinerary_id: str,
     day_id: str,
-    current_user: User = Depends(get_current_user),
+    itinerary: Itinerary = Depends(owned_itinerary),
     db: Session = Depends(get_db)
 ):
     """Delete a day from an itinerary"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
+    day = _find_day(itinerary, day_id)
     
-    if not itinerary:
-        raise HTTPException(status_code=404, detail="Itinerary not found")
-    
-    if itinerary.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to modify this itinerary")
+    itinerary.days.remove(day)
     
-    day = db.query(ItineraryDay).filter(
-        ItineraryDay.id == day_id,
-        ItineraryDay.itinerary_id == itinerary_id
-    ).first()
-    
-    if not day:
-        raise HTTPException(status_code=404, detail="Day not found")
-    
-    db.delete(day)
-    db.commit()
-    db.refresh(itinerary)
-    
-    return _itinerary_to_response(itinerary)
+    return _commit_and_render(db, itinerary)
 
 
 # Activity management endpoints
 
 @router.post("/{itinerary_id}/days/{day_id}/activities", response_model=ItineraryResponse)
 async def add_activity(
-    itinerary_id: str,
     day_id: str,
     activity_data: ItineraryActivityCreate,
-    current_user: User = Depends(get_current_user),
+    itinerary: Itinerary = Depends(owned_itinerary),
     db: Session = Depends(get_db)
 ):
     """Add an activity to a day"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
+    day = _find_day(itinerary, day_id)
     
-    if not itinerary:
-        raise HTTPException(status_code=404, detail="Itinerary not found")
-    
-    if itinerary.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to modify this itinerary")
-    
-    day = db.query(ItineraryDay).filter(
-        ItineraryDay.id == day_id,
-        ItineraryDay.itinerary_id == itinerary_id
-    ).first()
+    day.activities.append(ItineraryActivity(**activity_data.model_dump()))
     
-    if not day:
-        raise HTTPException(status_code=404, detail="Day not found")
-    
-    db_activity = ItineraryActivity(
-        day_id=day_id,
-        **activity_data.model_dump()
-    )
-    db.add(db_activity)
-    db.commit()
-    db.refresh(itinerary)
-    
-    return _itinerary_to_response(itinerary)
+    return _commit_and_render(db, itinerary)
 
 
 @router.put("/{itinerary_id}/days/{day_id}/activities/{activity_id}", response_model=ItineraryResponse)
 async def update_activity(
-    itinerary_id: str,
     day_id: str,
     activity_id: str,
     activity_data: ItineraryActivityUpdate,
-    current_user: User = Depends(get_current_user),
+    itinerary: Itinerary = Depends(owned_itinerary),
     db: Session = Depends(get_db)
 ):
     """Update an activity"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
-    
-    if not itinerary:
-        raise HTTPException(status_code=404, detail="Itinerary not found")
-    
-    if itinerary.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to modify this itinerary")
-    
-    activity = db.query(ItineraryActivity).join(ItineraryDay).filter(
-        ItineraryActivity.id == activity_id,
-        ItineraryActivity.day_id == day_id,
-        ItineraryDay.itinerary_id == itinerary_id
-    ).first()
-    
-    if not activity:
-        raise HTTPException(status_code=404, detail="Activity not found")
+    activity = _find_activity(itinerary, day_id, activity_id)
     
     # Update fields
     update_dict = activity_data.model_dump(exclude_unset=True)
     for field, value in update_dict.items():
         setattr(activity, field, value)
     
-    db.commit()
-    db.refresh(itinerary)
-    
-    return _itinerary_to_response(itinerary)
+    return _commit_and_render(db, itinerary)
 
 
 @router.delete("/{itinerary_id}/days/{day_id}/activities/{activity_id}", response_model=ItineraryResponse)
 async def delete_activity(
-    itinerary_id: str,
     day_id: str,
     activity_id: str,
-    current_user: User = Depends(get_current_user),
+    itinerary: Itinerary = Depends(owned_itinerary),
     db: Session = Depends(get_db)
 ):
     """Delete an activity"""
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
+    activity = _find_activity(itinerary, day_id, activity_id)
     
-    if not itinerary:
-        raise HTTPException(status_code=404, detail="Itinerary not found")
-    
-    if itinerary.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to modify this itinerary")
-    
-    activity = db.query(ItineraryActivity).join(ItineraryDay).filter(
-        ItineraryActivity.id == activity_id,
-        ItineraryActivity.day_id == day_id,
-        ItineraryDay.itinerary_id == itinerary_id
-    ).first()
-    
-    if not activity:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    
-    db.delete(activity)
-    db.commit()
-    db.refresh(itinerary)
+    activity.day.activities.remove(activity)
     
-    return _itinerary_to_response(itinerary)
+    return _commit_and_render(db, itinerary)
@@ -3,12 +3,22 @@ Reddit Community Insights Routes
 Exposes Reddit posts for travel destinations.
 """
 
+import asyncio
+
+import httpx
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from app.services.reddit_service import RedditService, RedditInsightsResponse
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/v1/reddit", tags=["reddit"])
 reddit_service = RedditService()
 
+# Degraded response body, built once; only "city" varies per request.
+_EMPTY_REDDIT = RedditInsightsResponse(city="", posts=[], community_subreddit=None).model_dump()
+
 
 @router.get("/city/{city_name}", response_model=RedditInsightsResponse)
 async def city_reddit_insights(
@@ -28,6 +38,8 @@ async def city_reddit_insights(
             limit_per_sub=limit_per_sub,
         )
         return result
-    except Exception as e:
-        # Gracefully degrade — Reddit is best-effort
-        return RedditInsightsResponse(city=city_name, posts=[], community_subreddit=None)
+    except (httpx.HTTPError, asyncio.TimeoutError, ValueError) as e:
+        # Gracefully degrade — Reddit is best-effort. Anything else (including
+        # cancellation) propagates to the caller / global handlers.
+        logger.warning("Reddit insights unavailable", city=city_name, error=str(e))
+        return ORJSONResponse({**_EMPTY_REDDIT, "city": city_name})
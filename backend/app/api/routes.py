@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, status, Request
-from typing import List, Optional
-from datetime import date, datetime, timedelta
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Path, status, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import date, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 import traceback
 import asyncio
 from pydantic import BaseModel
-from collections import deque
+from collections import defaultdict, deque
+from functools import lru_cache
 from threading import Lock
+import hashlib
 import json
+import orjson
 
-from app.database.connection import get_db, engine
+from app.database.connection import get_db, engine, SessionLocal
 from app.database.models import User, SearchHistory, AnalyticsEvent
 from app.models.destination import Destination
 from app.models.user import TravelRequest, UserPreferences, Interest, TravelStyle
@@ -21,19 +25,62 @@ from app.services.attractions_service import AttractionsService
 from app.services.affordability_service import AffordabilityService
 from app.services.events_service import EventsService
 from app.services.flight_service import FlightService
-from app.config import POPULAR_DESTINATIONS
+from app.config import POPULAR_DESTINATIONS, POPULAR_DESTS, COUNTRY_TO_CONTINENT, PopularDest
 from app.utils.datetime_utils import utcnow_naive
+from app.utils.http_cache import cache_control, cached_json_response, not_modified, weak_etag
 from app.utils.security import get_current_user, get_current_user_optional
 from app.utils.logging_config import get_logger
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.utils.request_cache import AsyncTTLCache, RequestCache
+from app.utils.token_bucket import TokenBucketLimiter
 
 logger = get_logger(__name__)
 
-# Create limiter for this module
-limiter = Limiter(key_func=get_remote_address)
+# 30 requests/minute per caller with bursts up to 30, keyed by user id (IP for anonymous)
+recommendations_limiter = TokenBucketLimiter(capacity=30, per_seconds=60)
 
 router = APIRouter(prefix="/api/v1", tags=["recommendations"])
+
+# POPULAR_DESTINATIONS is immutable, so the lowercased match keys and the
+# continents a destination matches are computed once instead of per request.
+_DEST_LOWER = [
+    (
+        d,
+        d.city.lower(),
+        d.country.lower(),
+        frozenset({d.continent, COUNTRY_TO_CONTINENT.get(d.country)}),
+    )
+    for d in POPULAR_DESTS
+]
+
+_DEST_BY_ID = {d["id"]: d for d in POPULAR_DESTINATIONS}
+
+# Lookup indices for list_destinations: destinations per country code, and one
+# lowercased search string per destination (fields joined with a separator a
+# query can't match across)
+_COUNTRY_INDEX: Dict[str, List[dict]] = defaultdict(list)
+for _d in POPULAR_DESTINATIONS:
+    _COUNTRY_INDEX[_d["country_code"]].append(_d)
+del _d
+_SEARCH_CORPUS = [
+    (d, "\n".join((d["name"], d["country"], d["city"])).lower())
+    for d in POPULAR_DESTINATIONS
+]
+
+# Content version of the destination list; list_destinations ETags combine it
+# with the filter inputs so repeat requests get a 304 without filtering
+_DEST_LIST_VERSION = hashlib.blake2b(orjson.dumps(POPULAR_DESTINATIONS), digest_size=8).hexdigest()
+
+# Pre-serialized bodies for the unfiltered list at common page sizes
+_DEST_TOP = {k: orjson.dumps(POPULAR_DESTINATIONS[:k]) for k in (5, 10, 20, 50, 100)}
+
+# Visa rules per (passport, destination) change on the order of months, so
+# lookups are shared in-process across requests for a day
+_visa_cache = AsyncTTLCache(maxsize=4096, ttl=86400)
+
+# Cache-Control policies for read-only endpoints
+_CACHE_DESTINATIONS = cache_control(3600)
+_CACHE_LIVE_DATA = cache_control(300, stale_while_revalidate=60)  # weather, attractions, events
+_CACHE_VISA = cache_control(86400)
 _analytics_events = deque(maxlen=5000)
 _analytics_lock = Lock()
 _analytics_table_ready = False
@@ -59,6 +106,44 @@ class ItineraryExportRequest(BaseModel):
     highlights: Optional[dict] = None
 
 
+# Service providers: one instance per process so API clients, tokens and
+# internal caches are reused across requests. Injected via Depends so tests
+# can swap them with app.dependency_overrides.
+@lru_cache()
+def get_ai_service() -> AIRecommendationService:
+    return AIRecommendationService()
+
+
+@lru_cache()
+def get_weather_service() -> WeatherService:
+    return WeatherService()
+
+
+@lru_cache()
+def get_visa_service() -> VisaService:
+    return VisaService()
+
+
+@lru_cache()
+def get_attractions_service() -> AttractionsService:
+    return AttractionsService()
+
+
+@lru_cache()
+def get_affordability_service() -> AffordabilityService:
+    return AffordabilityService()
+
+
+@lru_cache()
+def get_events_service() -> EventsService:
+    return EventsService()
+
+
+@lru_cache()
+def get_flight_service() -> FlightService:
+    return FlightService()
+
+
 def _ensure_analytics_table():
     """Create analytics table lazily if migrations haven't been applied yet."""
     global _analytics_table_ready
@@ -69,7 +154,9 @@ def _ensure_analytics_table():
 
 
 @router.get("/travel-pulse")
-async def get_travel_pulse():
+async def get_travel_pulse(
+    flight_service: FlightService = Depends(get_flight_service)
+):
     """Return a lightweight live travel pulse feed for top routes."""
     routes = [
         {"from_city": "New York", "to_city": "Lisbon", "from_code": "JFK", "to_code": "LIS"},
@@ -79,7 +166,6 @@ async def get_travel_pulse():
         {"from_city": "Boston", "to_city": "Barcelona", "from_code": "BOS", "to_code": "BCN"},
     ]
     departure_date = date.today() + timedelta(days=30)
-    flight_service = FlightService()
     pulse = []
 
     for route in routes:
@@ -245,12 +331,143 @@ async def export_itinerary(request: ItineraryExportRequest):
     markdown = "\n".join(lines)
     return {"markdown": markdown}
 
-@router.post("/recommendations", response_model=List[Destination])
-@limiter.limit("30/minute")
+async def rate_limit_30pm(
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    """Token-bucket rate limit for the recommendations endpoint"""
+    if current_user is not None:
+        key = f"user:{current_user.id}"
+    else:
+        key = f"ip:{request.client.host if request.client else 'unknown'}"
+    if not recommendations_limiter.allow(key):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded: 30 per 1 minute",
+            headers={"Retry-After": str(recommendations_limiter.retry_after())},
+        )
+
+
+async def _cached_visa(visa_service: VisaService, passport_country: str, destination_country: str):
+    """Visa requirements via the process-wide cache"""
+    key = (passport_country, destination_country)
+    visa = await _visa_cache.fetch(
+        key, lambda: visa_service.get_visa_requirements(passport_country, destination_country)
+    )
+    # Mock data standing in for a failed API call shouldn't be kept for a day
+    if isinstance(visa, dict) and visa.get("is_mock") and getattr(visa_service, "api_key", None):
+        _visa_cache.evict(key)
+    return visa
+
+
+async def _enrich_destination(
+    dest_data: PopularDest,
+    travel_start: date,
+    travel_end: date,
+    passport_country: str,
+    travel_style: str,
+    services: tuple,
+    calls: RequestCache,
+) -> Optional[Destination]:
+    """
+    Enrich a single destination with all data. services is
+    (weather, visa, affordability, attractions, events); calls with the same
+    arguments (e.g. visa for two cities in one country) are shared via calls.
+    """
+    weather_service, visa_service, affordability_service, attractions_service, events_service = services
+    try:
+        lat, lng = dest_data.lat, dest_data.lng
+        dest = Destination(
+            id=dest_data.id,
+            name=dest_data.name,
+            country=dest_data.country,
+            city=dest_data.city,
+            country_code=dest_data.country_code,
+            coordinates={"lat": lat, "lng": lng}
+        )
+
+        # Fetch all data in parallel for this destination
+        dest.weather, dest.visa, dest.affordability, dest.attractions, dest.events = await asyncio.gather(
+            calls.fetch(
+                ("weather", lat, lng, travel_start),
+                lambda: weather_service.get_weather(lat, lng, travel_start),
+            ),
+            _cached_visa(visa_service, passport_country, dest_data.country_code),
+            calls.fetch(
+                ("affordability", dest_data.country_code, travel_style),
+                lambda: affordability_service.get_affordability(dest_data.country_code, travel_style),
+            ),
+            calls.fetch(
+                ("attractions", lat, lng),
+                lambda: attractions_service.get_natural_attractions(lat, lng, limit=8),
+            ),
+            calls.fetch(
+                ("events", dest_data.city, dest_data.country_code),
+                lambda: events_service.get_events(dest_data.city, travel_start, travel_end, dest_data.country_code),
+            ),
+            return_exceptions=True
+        )
+
+        # Log any errors but continue
+        for field, value in [("weather", dest.weather), ("visa", dest.visa),
+                             ("affordability", dest.affordability), ("attractions", dest.attractions),
+                             ("events", dest.events)]:
+            if isinstance(value, Exception):
+                logger.warning(f"Failed to fetch {field} for {dest.name}", error=str(value))
+                setattr(dest, field, None)
+
+        return dest
+    except Exception as dest_err:
+        logger.error(f"Error enriching {dest_data.name}", error=str(dest_err))
+        return None
+
+
+async def _enrich_candidates(
+    request_data: TravelRequest,
+    candidates: List[PopularDest],
+    services: tuple,
+) -> AsyncIterator[Destination]:
+    """
+    Enrich candidates with real-time data IN PARALLEL, yielding each destination
+    as soon as it completes so one slow upstream doesn't hold up the rest
+    """
+    # Read request fields once rather than per candidate
+    preferences = request_data.user_preferences
+    args = (
+        request_data.travel_start,
+        request_data.travel_end,
+        preferences.passport_country,
+        preferences.travel_style.value,
+        services,
+        RequestCache(),
+    )
+    tasks = [asyncio.create_task(_enrich_destination(d, *args)) for d in candidates]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            dest = await next_done
+            if dest is not None:
+                yield dest
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@router.post(
+    "/recommendations",
+    response_model=List[Destination],
+    dependencies=[Depends(rate_limit_30pm)],
+)
 async def get_recommendations(
     request: Request,
     request_data: TravelRequest,
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    background_tasks: BackgroundTasks,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    ai_service: AIRecommendationService = Depends(get_ai_service),
+    weather_service: WeatherService = Depends(get_weather_service),
+    visa_service: VisaService = Depends(get_visa_service),
+    attractions_service: AttractionsService = Depends(get_attractions_service),
+    affordability_service: AffordabilityService = Depends(get_affordability_service),
+    events_service: EventsService = Depends(get_events_service),
 ):
     """Get AI-powered travel recommendations"""
     try:
@@ -259,92 +476,23 @@ async def get_recommendations(
                    travel_start=str(request_data.travel_start),
                    num_travelers=request_data.num_travelers)
 
-        # Initialize services
-        ai_service = AIRecommendationService()
-        weather_service = WeatherService()
-        visa_service = VisaService()
-        attractions_service = AttractionsService()
-        affordability_service = AffordabilityService()
-        events_service = EventsService()
-
         # Get candidate destinations
         candidates = await _get_candidate_destinations(request_data)
         logger.info(f"Got {len(candidates)} candidate destinations")
 
-        # Enrich each destination with real-time data IN PARALLEL
-        async def enrich_destination(dest_data: dict) -> Optional[Destination]:
-            """Enrich a single destination with all data"""
-            try:
-                dest = Destination(
-                    id=dest_data["id"],
-                    name=dest_data["name"],
-                    country=dest_data["country"],
-                    city=dest_data["city"],
-                    country_code=dest_data["country_code"],
-                    coordinates=dest_data["coordinates"]
-                )
-
-                # Fetch all data in parallel for this destination
-                dest.weather, dest.visa, dest.affordability, dest.attractions, dest.events = await asyncio.gather(
-                    weather_service.get_weather(
-                        dest.coordinates["lat"],
-                        dest.coordinates["lng"],
-                        request_data.travel_start
-                    ),
-                    visa_service.get_visa_requirements(
-                        request_data.user_preferences.passport_country,
-                        dest.country_code
-                    ),
-                    affordability_service.get_affordability(
-                        dest.country_code,
-                        request_data.user_preferences.travel_style.value
-                    ),
-                    attractions_service.get_natural_attractions(
-                        dest.coordinates["lat"],
-                        dest.coordinates["lng"],
-                        limit=8
-                    ),
-                    events_service.get_events(
-                        dest.city,
-                        request_data.travel_start,
-                        request_data.travel_end,
-                        dest.country_code
-                    ),
-                    return_exceptions=True
-                )
-
-                # Log any errors but continue
-                for field, value in [("weather", dest.weather), ("visa", dest.visa),
-                                     ("affordability", dest.affordability), ("attractions", dest.attractions),
-                                     ("events", dest.events)]:
-                    if isinstance(value, Exception):
-                        logger.warning(f"Failed to fetch {field} for {dest.name}", error=str(value))
-                        setattr(dest, field, None)
-
-                return dest
-            except Exception as dest_err:
-                logger.error(f"Error enriching {dest_data.get('name', '?')}", error=str(dest_err))
-                return None
-
-        # Process all destinations in parallel
-        enriched_results = await asyncio.gather(
-            *[enrich_destination(d) for d in candidates]
-        )
-        enriched_destinations = [d for d in enriched_results if d is not None]
-
-        logger.info(f"Enriched {len(enriched_destinations)} destinations, generating AI recommendations")
+        services = (weather_service, visa_service, affordability_service, attractions_service, events_service)
 
         # Generate AI recommendations
         recommendations = await ai_service.generate_recommendations(
             request_data,
-            enriched_destinations
+            _enrich_candidates(request_data, candidates, services)
         )
 
         logger.info(f"Generated {len(recommendations)} recommendations")
 
-        # Save search to history if user is logged in
+        # Save search to history after the response is sent if user is logged in
         if current_user:
-            await _save_search_history(current_user.id, request_data, len(recommendations))
+            background_tasks.add_task(_save_search_history, current_user.id, request_data, len(recommendations))
 
         return recommendations
 
@@ -352,66 +500,120 @@ async def get_recommendations(
         logger.exception("Error generating recommendations")
         raise HTTPException(status_code=500, detail="Internal server error while generating recommendations")
 
+
+@router.post("/recommendations/stream", dependencies=[Depends(rate_limit_30pm)])
+async def stream_recommendations(
+    request_data: TravelRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    ai_service: AIRecommendationService = Depends(get_ai_service),
+    weather_service: WeatherService = Depends(get_weather_service),
+    visa_service: VisaService = Depends(get_visa_service),
+    attractions_service: AttractionsService = Depends(get_attractions_service),
+    affordability_service: AffordabilityService = Depends(get_affordability_service),
+    events_service: EventsService = Depends(get_events_service),
+):
+    """
+    Stream scored destinations as NDJSON, one line per destination in the order
+    enrichment completes. Lines carry scores but no AI explanation; clients rank
+    by overall_score. Use POST /recommendations for the ranked, explained list.
+    """
+    candidates = await _get_candidate_destinations(request_data)
+    services = (weather_service, visa_service, affordability_service, attractions_service, events_service)
+    preferences = request_data.user_preferences
+    streamed = 0
+
+    async def ndjson_lines():
+        nonlocal streamed
+        try:
+            async for dest in _enrich_candidates(request_data, candidates, services):
+                ai_service.score_destination(dest, preferences)
+                streamed += 1
+                yield orjson.dumps(dest.model_dump(mode="json")) + b"\n"
+        except Exception:
+            # Headers are already sent, so end the stream instead of raising a 500
+            logger.exception("Error streaming recommendations")
+
+    if current_user:
+        user_id = current_user.id
+        background_tasks.add_task(lambda: _save_search_history(user_id, request_data, streamed))
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson", background=background_tasks)
+
 @router.get("/destinations")
 async def list_destinations(
+    request: Request,
     query: Optional[str] = Query(None, min_length=1, max_length=100, description="Search query"),
     country: Optional[str] = Query(None, min_length=2, max_length=2, description="Filter by country code"),
     max_results: int = Query(20, ge=1, le=100, description="Maximum results to return")
 ):
     """List available destinations"""
-    destinations = POPULAR_DESTINATIONS
+    etag = weak_etag(_DEST_LIST_VERSION, query, country and country.upper(), max_results)
+    cached = not_modified(request, etag, _CACHE_DESTINATIONS)
+    if cached is not None:
+        return cached
+
+    if not query and not country:
+        # Unfiltered default page: common sizes are serialized once at import
+        body = _DEST_TOP.get(max_results)
+        if body is not None:
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers={"ETag": etag, "Cache-Control": _CACHE_DESTINATIONS},
+            )
 
     if query:
         query_lower = query.lower()
-        destinations = [
-            d for d in destinations
-            if query_lower in d["name"].lower()
-            or query_lower in d["country"].lower()
-            or query_lower in d["city"].lower()
-        ]
-
-    if country:
-        destinations = [d for d in destinations if d["country_code"] == country.upper()]
+        destinations = [d for d, text in _SEARCH_CORPUS if query_lower in text]
+        if country:
+            country_code = country.upper()
+            destinations = [d for d in destinations if d["country_code"] == country_code]
+    elif country:
+        destinations = _COUNTRY_INDEX.get(country.upper(), [])
+    else:
+        destinations = POPULAR_DESTINATIONS
 
-    return destinations[:max_results]
+    return cached_json_response(request, destinations[:max_results], _CACHE_DESTINATIONS, etag=etag)
 
 @router.get("/destinations/{destination_id}")
 async def get_destination_details(
+    request: Request,
     destination_id: str = Path(..., min_length=1, max_length=100, pattern="^[a-zA-Z0-9_-]+$"),
     travel_start: Optional[date] = None,
     travel_end: Optional[date] = None,
-    passport_country: str = "US"
+    passport_country: str = "US",
+    weather_service: WeatherService = Depends(get_weather_service),
+    visa_service: VisaService = Depends(get_visa_service),
+    attractions_service: AttractionsService = Depends(get_attractions_service),
+    affordability_service: AffordabilityService = Depends(get_affordability_service),
+    events_service: EventsService = Depends(get_events_service),
 ):
     """Get detailed information about a specific destination"""
     logger.info("Fetching destination details", destination_id=destination_id)
     
-    # Find destination
-    dest_data = next(
-        (d for d in POPULAR_DESTINATIONS if d["id"] == destination_id),
-        None
-    )
-
+    dest_data = _DEST_BY_ID.get(destination_id)
     if not dest_data:
         raise HTTPException(status_code=404, detail="Destination not found")
 
-    # Initialize services
-    weather_service = WeatherService()
-    visa_service = VisaService()
-    attractions_service = AttractionsService()
-    affordability_service = AffordabilityService()
-    events_service = EventsService()
+    # Fetch all data in parallel; events need both dates, so a no-op stands in without them
+    if travel_start and travel_end:
+        events_call = events_service.get_events(
+            dest_data["city"],
+            travel_start,
+            travel_end,
+            dest_data["country_code"]
+        )
+    else:
+        events_call = asyncio.sleep(0, result=[])
 
-    # Fetch all data in parallel
-    weather, visa, affordability, attractions = await asyncio.gather(
+    weather, visa, affordability, attractions, events = await asyncio.gather(
         weather_service.get_weather(
             dest_data["coordinates"]["lat"],
             dest_data["coordinates"]["lng"],
             travel_start or date.today()
         ),
-        visa_service.get_visa_requirements(
-            passport_country,
-            dest_data["country_code"]
-        ),
+        _cached_visa(visa_service, passport_country, dest_data["country_code"]),
         affordability_service.get_affordability(
             dest_data["country_code"]
         ),
@@ -420,6 +622,7 @@ async def get_destination_details(
             dest_data["coordinates"]["lng"],
             limit=15
         ),
+        events_call,
         return_exceptions=True
     )
 
@@ -431,18 +634,10 @@ async def get_destination_details(
         affordability = None
     if isinstance(attractions, Exception):
         attractions = []
+    if isinstance(events, Exception):
+        events = []
 
-    events = []
-    if travel_start and travel_end:
-        maybe_events = await events_service.get_events(
-            dest_data["city"],
-            travel_start,
-            travel_end,
-            dest_data["country_code"]
-        )
-        events = maybe_events if not isinstance(maybe_events, Exception) else []
-
-    return {
+    return cached_json_response(request, {
         "id": dest_data["id"],
         "name": dest_data["name"],
         "country": dest_data["country"],
@@ -454,97 +649,85 @@ async def get_destination_details(
         "affordability": affordability,
         "attractions": attractions,
         "events": events,
-    }
+    }, _CACHE_LIVE_DATA)
 
 @router.get("/visa-requirements/{passport_country}/{destination_country}")
 async def check_visa_requirements(
+    request: Request,
     passport_country: str,
-    destination_country: str
+    destination_country: str,
+    visa_service: VisaService = Depends(get_visa_service)
 ):
     """Check visa requirements between countries"""
-    visa_service = VisaService()
-    visa = await visa_service.get_visa_requirements(
-        passport_country.upper(),
-        destination_country.upper()
-    )
-    return {
+    visa = await _cached_visa(visa_service, passport_country.upper(), destination_country.upper())
+    return cached_json_response(request, {
         "visa": visa,
         "summary": visa_service.get_visa_summary(visa)
-    }
+    }, _CACHE_VISA)
 
 @router.get("/weather/{lat},{lon}")
 async def get_weather(
+    request: Request,
     lat: float,
     lon: float,
-    date: Optional[date] = None
+    date: Optional[date] = None,
+    weather_service: WeatherService = Depends(get_weather_service)
 ):
     """Get weather for a location"""
-    weather_service = WeatherService()
     weather = await weather_service.get_weather(lat, lon, date)
     if not weather:
         raise HTTPException(status_code=404, detail="Weather data not available")
-    return weather
+    return cached_json_response(request, weather, _CACHE_LIVE_DATA)
 
 @router.get("/attractions/{lat},{lon}")
 async def get_attractions(
+    request: Request,
     lat: float,
     lon: float,
     natural_only: bool = False,
-    limit: int = Query(10, ge=1, le=20)
+    limit: int = Query(10, ge=1, le=20),
+    attractions_service: AttractionsService = Depends(get_attractions_service)
 ):
     """Get attractions near a location"""
-    attractions_service = AttractionsService()
-    
     if natural_only:
         attractions = await attractions_service.get_natural_attractions(lat, lon, limit=limit)
     else:
         attractions = await attractions_service.get_all_attractions(lat, lon, limit=limit)
     
-    return attractions
+    return cached_json_response(request, attractions, _CACHE_LIVE_DATA)
 
-async def _get_candidate_destinations(request: TravelRequest) -> List[dict]:
+async def _get_candidate_destinations(request: TravelRequest) -> List[PopularDest]:
     """Get candidate destinations based on search criteria"""
-    from app.config import COUNTRY_TO_CONTINENT
-    
     origin_lower = request.origin.lower()
     prefs = request.user_preferences
+    continent = prefs.preferred_continent
+    countries = prefs.preferred_countries
     
     candidates = [
-        d for d in POPULAR_DESTINATIONS
-        if origin_lower not in d["city"].lower()
-        and origin_lower not in d["country"].lower()
+        d for d, city_lower, country_lower, dest_continents in _DEST_LOWER
+        if origin_lower not in city_lower
+        and origin_lower not in country_lower
+        # Filter by preferred continent
+        and (not continent or continent in dest_continents)
+        # Filter by preferred countries
+        and (not countries or d.country in countries)
     ]
     
-    # Filter by preferred continent
-    if prefs.preferred_continent:
-        candidates = [
-            d for d in candidates 
-            if d.get("continent") == prefs.preferred_continent
-            or COUNTRY_TO_CONTINENT.get(d["country"]) == prefs.preferred_continent
-        ]
-    
-    # Filter by preferred countries
-    if prefs.preferred_countries:
-        candidates = [
-            d for d in candidates 
-            if d["country"] in prefs.preferred_countries
-        ]
-    
     # Limit to reasonable number for scoring
     return candidates[:15]
 
-async def _save_search_history(user_id: str, request: TravelRequest, results_count: int):
-    """Save search to user history"""
-    from app.database.connection import SessionLocal
-    
+def _save_search_history(user_id: str, request: TravelRequest, results_count: int):
+    """Save search to user history (background task; sync, so it runs in the threadpool)"""
     db = SessionLocal()
     try:
         search = SearchHistory(
             user_id=user_id,
             origin=request.origin,
-            travel_start=datetime.combine(request.travel_start, datetime.min.time()),
-            travel_end=datetime.combine(request.travel_end, datetime.min.time()),
-            search_query=f"From {request.origin}, {request.num_travelers} travelers, {request.travel_start} to {request.travel_end}",
+            travel_start=request.travel_start,
+            travel_end=request.travel_end,
+            search_query="From %s, %d travelers, %s to %s" % (
+                request.origin, request.num_travelers, request.travel_start, request.travel_end
+            ),
             results_count=results_count
         )
         db.add(search)
@@ -3,15 +3,15 @@ Social Media & Influencer API Routes
 Placeholder endpoints for future Instagram/influencer integration
 
 Note: This feature is not yet implemented. Endpoints return empty responses
-to prevent frontend errors while the backend is under development.
+to prevent frontend errors while the backend is under development. The
+placeholders stay async def (their bodies never block, so they run inline on
+the event loop) and don't open a DB session; add Depends(get_db) back as
+endpoints gain real queries.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
-
-from app.database.connection import get_db
 from app.database.models import User
 from app.models.social import (
     SocialFeedRequest, SocialFeedResponse, SocialContentResponse,
@@ -29,6 +29,19 @@ router = APIRouter(prefix="/api/v1/social", tags=["social"])
 # Feature flag - set to True when social features are ready
 SOCIAL_FEATURES_ENABLED = False
 
+# Placeholder responses, built once rather than per request
+_EMPTY_FEED = SocialFeedResponse(
+    items=[],
+    has_more=False,
+    trending_hashtags=[],
+    suggested_influencers=[]
+)
+_EMPTY_EXPLORE = {"items": [], "has_more": False, "status": "coming_soon"}
+_COMING_SOON = {"success": False, "message": "Feature coming soon!"}
+_SAVE_COMING_SOON = {**_COMING_SOON, "saved_content_id": None}
+_INSTAGRAM_COMING_SOON = {"success": False, "message": "Instagram integration coming soon!"}
+_INSTAGRAM_STATUS = {"connected": False, "message": "Instagram integration coming soon!"}
+
 
 def _feature_not_available():
     """Log and return feature not available response"""
@@ -41,25 +54,18 @@ def _feature_not_available():
 @router.post("/feed", response_model=SocialFeedResponse)
 async def get_social_feed(
     request: SocialFeedRequest,
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Get personalized social feed (Coming Soon)"""
     if not SOCIAL_FEATURES_ENABLED:
-        return SocialFeedResponse(
-            items=[],
-            has_more=False,
-            trending_hashtags=[],
-            suggested_influencers=[]
-        )
+        return _EMPTY_FEED
     return _feature_not_available()
 
 
 @router.get("/feed/trending", response_model=List[SocialContentResponse])
 async def get_trending_content(
     period: str = Query("week", enum=["today", "week", "month"]),
-    limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=50)
 ):
     """Get trending content (Coming Soon)"""
     return []
@@ -71,11 +77,10 @@ async def explore_content(
     lng: Optional[float] = Query(None),
     radius_km: float = Query(10, ge=1, le=100),
     content_type: Optional[ContentType] = None,
-    limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=50)
 ):
     """Explore content near a location (Coming Soon)"""
-    return {"items": [], "has_more": False, "status": "coming_soon"}
+    return _EMPTY_EXPLORE
 
 
 # ============== INFLUENCER ENDPOINTS ==============
@@ -88,8 +93,7 @@ async def list_influencers(
     featured_only: bool = Query(False),
     sort_by: str = Query("followers", enum=["followers", "engagement", "recent", "trending"]),
     limit: int = Query(20, ge=1, le=50),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    offset: int = Query(0, ge=0)
 ):
     """List travel influencers (Coming Soon)"""
     return []
@@ -97,8 +101,7 @@ async def list_influencers(
 
 @router.get("/influencers/{influencer_id}", response_model=InfluencerResponse)
 async def get_influencer_profile(
-    influencer_id: str,
-    db: Session = Depends(get_db)
+    influencer_id: str
 ):
     """Get influencer profile (Coming Soon)"""
     raise HTTPException(
@@ -113,8 +116,7 @@ async def get_influencer_content(
     content_type: Optional[ContentType] = Query(None),
     destination: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=50),
-    cursor: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None)
 ):
     """Get influencer content (Coming Soon)"""
     return []
@@ -122,8 +124,7 @@ async def get_influencer_content(
 
 @router.get("/influencers/{influencer_id}/guides", response_model=List[CollectionResponse])
 async def get_influencer_guides(
-    influencer_id: str,
-    db: Session = Depends(get_db)
+    influencer_id: str
 ):
     """Get influencer guides (Coming Soon)"""
     return []
@@ -132,8 +133,7 @@ async def get_influencer_guides(
 @router.get("/influencers/recommended", response_model=List[InfluencerRecommendation])
 async def get_recommended_influencers(
     current_user: User = Depends(get_current_user),
-    limit: int = Query(10, ge=1, le=20),
-    db: Session = Depends(get_db)
+    limit: int = Query(10, ge=1, le=20)
 ):
     """Get recommended influencers (Coming Soon)"""
     return []
@@ -142,21 +142,19 @@ async def get_recommended_influencers(
 @router.post("/influencers/{influencer_id}/follow")
 async def follow_influencer(
     influencer_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Follow an influencer (Coming Soon)"""
-    return {"success": False, "message": "Feature coming soon!"}
+    return _COMING_SOON
 
 
 @router.post("/influencers/{influencer_id}/unfollow")
 async def unfollow_influencer(
     influencer_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Unfollow an influencer (Coming Soon)"""
-    return {"success": False, "message": "Feature coming soon!"}
+    return _COMING_SOON
 
 
 # ============== CONTENT ENDPOINTS ==============
@@ -164,8 +162,7 @@ async def unfollow_influencer(
 @router.get("/content/{content_id}", response_model=SocialContentResponse)
 async def get_content_details(
     content_id: str,
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Get content details (Coming Soon)"""
     raise HTTPException(
@@ -179,28 +176,25 @@ async def save_content(
     content_id: str,
     collection_name: Optional[str] = None,
     notes: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Save content (Coming Soon)"""
-    return {"success": False, "message": "Feature coming soon!", "saved_content_id": None}
+    return _SAVE_COMING_SOON
 
 
 @router.post("/content/{content_id}/unsave")
 async def unsave_content(
     content_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Unsave content (Coming Soon)"""
-    return {"success": False, "message": "Feature coming soon!"}
+    return _COMING_SOON
 
 
 @router.get("/content/{content_id}/related")
 async def get_related_content(
     content_id: str,
-    limit: int = Query(10, ge=1, le=20),
-    db: Session = Depends(get_db)
+    limit: int = Query(10, ge=1, le=20)
 ):
     """Get related content (Coming Soon)"""
     return []
@@ -209,8 +203,7 @@ async def get_related_content(
 @router.get("/content/{content_id}/similar-destinations")
 async def get_similar_destinations_from_content(
     content_id: str,
-    limit: int = Query(5, ge=1, le=10),
-    db: Session = Depends(get_db)
+    limit: int = Query(5, ge=1, le=10)
 ):
     """Get similar destinations (Coming Soon)"""
     return []
@@ -222,8 +215,7 @@ async def get_similar_destinations_from_content(
 async def get_trending_destinations(
     period: str = Query("week", enum=["today", "week", "month"]),
     region: Optional[str] = Query(None),
-    limit: int = Query(10, ge=1, le=20),
-    db: Session = Depends(get_db)
+    limit: int = Query(10, ge=1, le=20)
 ):
     """Get trending destinations (Coming Soon)"""
     return []
@@ -232,8 +224,7 @@ async def get_trending_destinations(
 @router.get("/trending/hashtags", response_model=List[TrendingHashtag])
 async def get_trending_hashtags(
     period: str = Query("week", enum=["today", "week", "month"]),
-    limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=50)
 ):
     """Get trending hashtags (Coming Soon)"""
     return []
@@ -242,8 +233,7 @@ async def get_trending_hashtags(
 @router.get("/trending/experiences")
 async def get_trending_experiences(
     destination: Optional[str] = Query(None),
-    limit: int = Query(10, ge=1, le=20),
-    db: Session = Depends(get_db)
+    limit: int = Query(10, ge=1, le=20)
 ):
     """Get trending experiences (Coming Soon)"""
     return []
@@ -258,8 +248,7 @@ async def list_collections(
     influencer_id: Optional[str] = Query(None),
     destination: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=50),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    offset: int = Query(0, ge=0)
 ):
     """List collections (Coming Soon)"""
     return []
@@ -267,8 +256,7 @@ async def list_collections(
 
 @router.get("/collections/{collection_id}", response_model=CollectionResponse)
 async def get_collection_details(
-    collection_id: str,
-    db: Session = Depends(get_db)
+    collection_id: str
 ):
     """Get collection details (Coming Soon)"""
     raise HTTPException(
@@ -280,39 +268,35 @@ async def get_collection_details(
 @router.post("/collections/{collection_id}/save")
 async def save_collection(
     collection_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Save collection (Coming Soon)"""
-    return {"success": False, "message": "Feature coming soon!"}
+    return _COMING_SOON
 
 
 # ============== INSTAGRAM INTEGRATION ==============
 
 @router.post("/instagram/connect")
 async def connect_instagram(
-    request: any,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: dict,
+    current_user: User = Depends(get_current_user)
 ):
     """Connect Instagram account (Coming Soon)"""
-    return {"success": False, "message": "Instagram integration coming soon!"}
+    return _INSTAGRAM_COMING_SOON
 
 
 @router.post("/instagram/share")
 async def share_to_instagram(
-    request: any,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: dict,
+    current_user: User = Depends(get_current_user)
 ):
     """Share to Instagram (Coming Soon)"""
-    return {"success": False, "message": "Instagram integration coming soon!"}
+    return _INSTAGRAM_COMING_SOON
 
 
 @router.get("/instagram/status")
 async def get_instagram_status(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Check Instagram connection status (Coming Soon)"""
-    return {"connected": False, "message": "Instagram integration coming soon!"}
+    return _INSTAGRAM_STATUS
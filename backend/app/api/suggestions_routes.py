@@ -4,10 +4,25 @@ Endpoint:  GET /api/v1/suggestions/similar?cities=paris,tokyo&limit=4
 
 No LLM required — pure static data so it works on the free Render tier.
 """
-from fastapi import APIRouter, Query
-from typing import Optional
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import ORJSONResponse, Response
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, Iterator, Optional, TypeVar
+import hashlib
+import sys
 
-router = APIRouter(prefix="/api/v1/suggestions", tags=["suggestions"])
+import orjson
+
+from app.utils.http_cache import cache_control, etag_matches
+
+T = TypeVar("T")
+
+router = APIRouter(
+    prefix="/api/v1/suggestions",
+    tags=["suggestions"],
+    default_response_class=ORJSONResponse,
+)
 
 # ---------------------------------------------------------------------------
 # Curated similarity map
@@ -142,39 +157,199 @@ FALLBACK_SUGGESTIONS = [
 ]
 
 
+# Dashes become spaces and commas are dropped, in one pass
+_NORMALISE_TABLE = str.maketrans({"-": " ", ",": None})
+
+
+# Common spellings of curated cities, mapped to their SIMILAR key
+_ALIASES: dict[str, str] = {
+    "nyc": "new york",
+    "new york city": "new york",
+    "ny": "new york",
+    "roma": "rome",
+    "praha": "prague",
+    "lisboa": "lisbon",
+    "marrakesh": "marrakech",
+    "istambul": "istanbul",
+    "krung thep": "bangkok",
+    # Multi-word keys written without spaces, e.g. "newyork", "capetown"
+    **{city.replace(" ", ""): city for city in SIMILAR if " " in city},
+}
+
+
+def _fold(city: str) -> str:
+    return " ".join(city.lower().translate(_NORMALISE_TABLE).split())
+
+
+# Every spelling the tables know (aliases included) -> its canonical key,
+# interned once here. Known cities resolve to the shared interned string, so
+# lookups usually match on identity; unknown input is returned as-is and never
+# interned, since interned strings are never freed.
+_CANONICAL: dict[str, str] = {
+    key: sys.intern(_ALIASES.get(key, key))
+    for key in chain(
+        SIMILAR,
+        _ALIASES,
+        (_fold(s["city"]) for suggestions in SIMILAR.values() for s in suggestions),
+        (_fold(fb["city"]) for fb in FALLBACK_SUGGESTIONS),
+    )
+}
+
+
+# Whitespace runs collapse to one space and known aliases resolve to their
+# canonical key
 def _normalise(city: str) -> str:
-    return city.lower().strip().replace("-", " ").replace(",", "")
+    key = _fold(city)
+    return _CANONICAL.get(key, key)
 
 
-@router.get("/similar")
-async def get_similar(
-    cities: str = Query(..., description="Comma-separated city names e.g. paris,tokyo"),
-    limit: int = Query(4, ge=1, le=8),
-):
-    """Return smart alternative city suggestions based on the provided destinations."""
-    city_list = [_normalise(c) for c in cities.split(",") if c.strip()]
-    seen: set[str] = set(city_list)
-    results: list[dict] = []
+# Every city the data can mention gets its own bit, so a set of cities is a
+# single int and "seen" checks are a mask test instead of a string hash
+_CITY_BIT: dict[str, int] = {
+    city: 1 << index
+    for index, city in enumerate(dict.fromkeys(chain(
+        map(sys.intern, SIMILAR),
+        (_normalise(s["city"]) for suggestions in SIMILAR.values() for s in suggestions),
+        (_normalise(fb["city"]) for fb in FALLBACK_SUGGESTIONS),
+    )))
+}
+
+# Parallel tuples of city bits and response payloads per source city,
+# computed once at import
+_SIMILAR_KEYS: dict[str, tuple[int, ...]] = {
+    sys.intern(city): tuple(_CITY_BIT[_normalise(s["city"])] for s in suggestions)
+    for city, suggestions in SIMILAR.items()
+}
+_SIMILAR_PAYLOADS: dict[str, tuple[dict, ...]] = {
+    sys.intern(city): tuple(suggestions) for city, suggestions in SIMILAR.items()
+}
+_FALLBACK_KEYS: tuple[int, ...] = tuple(_CITY_BIT[_normalise(fb["city"])] for fb in FALLBACK_SUGGESTIONS)
+_FALLBACK_PAYLOADS: tuple[dict, ...] = tuple(FALLBACK_SUGGESTIONS)
+
+# The response shape is fixed: {"input_cities": [str], "suggestions":
+# [{"city", "country", "reason"}]}. Each suggestion is rendered once at import
+# by walking that schema (strings escaped by orjson), so response bodies are
+# assembled from bytes without building or walking any dicts per request.
+_SUGGESTION_FIELDS = (b'{"city":', "city"), (b',"country":', "country"), (b',"reason":', "reason")
+_BODY_PREFIX = b'{"input_cities":'
+_BODY_MID = b',"suggestions":['
+_BODY_SUFFIX = b"]}"
+
+
+def _render_suggestion(suggestion: dict) -> bytes:
+    return b"".join(
+        [prefix + orjson.dumps(suggestion[field]) for prefix, field in _SUGGESTION_FIELDS] + [b"}"]
+    )
+
 
+_SIMILAR_JSON: dict[str, tuple[bytes, ...]] = {
+    city: tuple(map(_render_suggestion, payloads)) for city, payloads in _SIMILAR_PAYLOADS.items()
+}
+_FALLBACK_JSON: tuple[bytes, ...] = tuple(map(_render_suggestion, _FALLBACK_PAYLOADS))
+
+
+def _iter_suggestions(
+    city_list: tuple[str, ...],
+    limit: int,
+    similar: dict[str, tuple[T, ...]],
+    fallback: tuple[T, ...],
+) -> Iterator[T]:
+    """
+    Yield up to limit alternatives for city_list, taken from the given
+    payload tables (the dicts, or their pre-serialized _JSON forms).
+    """
+    # Input cities the data never mentions can't collide with a candidate,
+    # so they have no bit to mark
+    seen = 0
     for city in city_list:
-        for suggestion in SIMILAR.get(city, []):
-            key = _normalise(suggestion["city"])
-            if key not in seen:
-                seen.add(key)
-                results.append(suggestion)
-            if len(results) >= limit:
-                break
-        if len(results) >= limit:
-            break
+        seen |= _CITY_BIT.get(city, 0)
+
+    count = 0
+    candidates = chain.from_iterable(
+        zip(_SIMILAR_KEYS.get(city, ()), similar.get(city, ())) for city in city_list
+    )
+    for bit, payload in candidates:
+        if not seen & bit:
+            seen |= bit
+            yield payload
+            count += 1
+            if count == limit:
+                return
 
     # Fill up with fallbacks if needed
-    if len(results) < min(limit, 3):
-        for fb in FALLBACK_SUGGESTIONS:
-            key = _normalise(fb["city"])
-            if key not in seen:
-                seen.add(key)
-                results.append(fb)
-            if len(results) >= limit:
-                break
-
-    return {"input_cities": city_list, "suggestions": results[:limit]}
+    if count < min(limit, 3):
+        for bit, payload in zip(_FALLBACK_KEYS, fallback):
+            if not seen & bit:
+                seen |= bit
+                yield payload
+                count += 1
+                if count == limit:
+                    return
+
+
+def _suggest(city_list: tuple[str, ...], limit: int) -> list[dict]:
+    return list(_iter_suggestions(city_list, limit, _SIMILAR_PAYLOADS, _FALLBACK_PAYLOADS))
+
+
+_MAX_LIMIT = 8
+
+# For a single source city every limit's answer is a prefix of the limit=8
+# answer (its own alternatives, then fallbacks only if those run short), so
+# each curated city's suggestions are serialized once, in order, at import.
+_SINGLE_CITY_JSON: dict[str, tuple[bytes, ...]] = {
+    city: tuple(_iter_suggestions((city,), _MAX_LIMIT, _SIMILAR_JSON, _FALLBACK_JSON))
+    for city in _SIMILAR_PAYLOADS
+}
+
+_CACHE_SIMILAR = cache_control(86400)
+
+# Letters (accented ones included, e.g. "Cancún"), spaces, dots, apostrophes,
+# dashes and commas, bounded in length; anything else is rejected with a 422
+# during validation, before the handler runs
+_CITIES_PATTERN = r"^[\w ,.'\-]{1,200}$"
+
+
+def _render_body(city_list: tuple[str, ...], fragments: Iterable[bytes]) -> tuple[bytes, str]:
+    body = _BODY_PREFIX + orjson.dumps(city_list) + _BODY_MID + b",".join(fragments) + _BODY_SUFFIX
+    return body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+# Single curated cities are the bulk of traffic, so their finished body and
+# ETag for every limit are built at import: _PRECANNED[city][limit - 1]
+_PRECANNED: dict[str, tuple[tuple[bytes, str], ...]] = {
+    city: tuple(_render_body((city,), fragments[:limit]) for limit in range(1, _MAX_LIMIT + 1))
+    for city, fragments in _SINGLE_CITY_JSON.items()
+}
+
+
+# Otherwise a response is still a pure function of (cities, limit), as the
+# data is static; serialize each combination once and serve the cached bytes
+# and ETag afterwards. Keys are normalised, so "Tokyo, Paris" and "tokyo,paris"
+# share an entry. They stay ordered: the first city's alternatives are listed
+# (and kept under the limit) first, so "paris,tokyo" is a different response.
+@lru_cache(maxsize=4096)
+def _similar_body(city_list: tuple[str, ...], limit: int) -> tuple[bytes, str]:
+    return _render_body(city_list, _iter_suggestions(city_list, limit, _SIMILAR_JSON, _FALLBACK_JSON))
+
+
+# Deliberately async def with no awaits: FastAPI calls it inline on the event
+# loop, whereas a plain def would be dispatched to the threadpool per request.
+@router.get("/similar")
+async def get_similar(
+    request: Request,
+    cities: str = Query(
+        ...,
+        pattern=_CITIES_PATTERN,
+        description="Comma-separated city names e.g. paris,tokyo",
+    ),
+    limit: int = Query(4, ge=1, le=_MAX_LIMIT),
+):
+    """Return smart alternative city suggestions based on the provided destinations."""
+    # Normalise, drop blanks and de-duplicate in one ordered pass
+    city_list = tuple(dict.fromkeys(key for key in map(_normalise, cities.split(",")) if key))
+    precanned = _PRECANNED.get(city_list[0]) if len(city_list) == 1 else None
+    body, etag = precanned[limit - 1] if precanned is not None else _similar_body(city_list, limit)
+    headers = {"ETag": etag, "Cache-Control": _CACHE_SIMILAR}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -5,14 +5,18 @@ Maintains backward compatibility with legacy /chat endpoint
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+from typing import Optional, List, Dict, Any, Literal
 from datetime import date
+from functools import lru_cache
 import asyncio
 import uuid
 import json
 
+import orjson
+
 from app.utils.logging_config import get_logger
 from app.services.chat_service import chat_service, ChatSession
 from app.services.ai_providers import AIFactory
@@ -26,12 +30,33 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 logger = get_logger(__name__)
-router = APIRouter(prefix="/api/v1/chat", tags=["Travel Chat"])
+router = APIRouter(
+    prefix="/api/v1/chat",
+    tags=["Travel Chat"],
+    default_response_class=ORJSONResponse,
+)
 
 # Local rate limiter for chat endpoints to protect LLM and API costs.
 _chat_limiter = Limiter(key_func=get_remote_address)
 
 
+# Tool services, one instance per process (as in app.api.routes) so they are
+# not rebuilt with fresh settings and cache handles on every plan or tool call.
+@lru_cache()
+def _weather_service() -> WeatherService:
+    return WeatherService()
+
+
+@lru_cache()
+def _visa_service() -> VisaService:
+    return VisaService()
+
+
+@lru_cache()
+def _attractions_service() -> AttractionsService:
+    return AttractionsService()
+
+
 # ============= Legacy Models (for backward compatibility) =============
 
 class LegacyChatMessage(BaseModel):
@@ -60,12 +85,56 @@ class ChatMessageResponse(BaseModel):
 
 
 class TravelChatMessage(BaseModel):
-    role: str
+    # One instance per history entry per request; frozen and closed to extra
+    # keys, with role checked by pydantic-core as a literal rather than free text.
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    role: Literal["user", "assistant", "system"]
     content: str
 
 
 class TravelChatRequest(BaseModel):
     messages: List[TravelChatMessage]
+    # `extracted` from the previous /travel reply, echoed back by the client so
+    # only the latest message has to be interpreted on top of it
+    prior_extracted: Optional[Dict[str, Any]] = None
+
+
+# /travel bodies can carry a long message history; validate_json parses and
+# validates the raw bytes in one pydantic-core pass, with no intermediate dict.
+_TRAVEL_CHAT_ADAPTER = TypeAdapter(TravelChatRequest)
+
+
+def _inline_schema(model: type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema for model with its $defs inlined, for use in openapi_extra"""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def resolve(node: Any) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if ref:
+                return resolve(defs[ref.rsplit("/", 1)[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(value) for value in node]
+        return node
+
+    return resolve(schema)
+
+
+async def _travel_chat_body(request: Request) -> TravelChatRequest:
+    """Parse the /travel body straight from bytes, reporting errors like FastAPI does"""
+    try:
+        return _TRAVEL_CHAT_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        errors = []
+        for err in e.errors(include_url=False):
+            err["loc"] = ("body", *err["loc"])
+            if err["type"] == "json_invalid":
+                err["input"] = {}  # the raw bytes, which aren't JSON-serializable
+            errors.append(err)
+        raise RequestValidationError(errors)
 
 
 class TravelChatResponse(BaseModel):
@@ -353,8 +422,17 @@ async def update_pipeline_data(
     return result
 
 
-@router.post("/travel", response_model=TravelChatResponse)
-async def travel_chat_legacy(request: TravelChatRequest):
+@router.post(
+    "/travel",
+    response_model=TravelChatResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _inline_schema(TravelChatRequest)}},
+        }
+    },
+)
+async def travel_chat_legacy(request: TravelChatRequest = Depends(_travel_chat_body)):
     """
     Legacy travel chat endpoint (for backward compatibility)
     Accepts array of messages, returns single response
@@ -362,12 +440,17 @@ async def travel_chat_legacy(request: TravelChatRequest):
     # Create a temporary session for this conversation
     session_id = f"temp_{uuid.uuid4()}"
     
-    # Use the last user message
-    last_message = None
-    for msg in reversed(request.messages):
-        if msg.role == 'user':
-            last_message = msg.content
-            break
+    # The last user turn is answered; earlier ones seed the state when the
+    # client sends none. A lone first message, the most common request, has
+    # nothing earlier to collect.
+    if len(request.messages) == 1:
+        only = request.messages[0]
+        last_message = only.content if only.role == 'user' else None
+        earlier: List[str] = []
+    else:
+        user_turns = [msg.content for msg in request.messages if msg.role == 'user']
+        last_message = user_turns[-1] if user_turns else None
+        earlier = user_turns[:-1]
     
     if not last_message:
         return TravelChatResponse(
@@ -377,6 +460,22 @@ async def travel_chat_legacy(request: TravelChatRequest):
             suggestions=[]
         )
     
+    if request.prior_extracted:
+        chat_service._put_session(ChatSession(
+            session_id=session_id,
+            extracted_preferences=dict(request.prior_extracted),
+        ))
+    elif earlier:
+        # No echoed state (an older client): rebuild it once from the earlier
+        # user turns with the per-message heuristic
+        seed = ChatSession(session_id=session_id)
+        for content in earlier:
+            chat_service._merge_extracted_preferences(
+                seed, chat_service._extract_preferences_heuristic(content)
+            )
+        if seed.extracted_preferences:
+            chat_service._put_session(seed)
+
     # Process through new chat service
     session = await chat_service.send_message(
         session_id=session_id,
@@ -474,8 +573,8 @@ async def generate_structured_itinerary(request: TripPlanningRequest):
     Generates a structured day-by-day itinerary based on preferences and weather.
     Returns JSON data suitable for rendering a timeline UI.
     """
-    ai_provider = AIFactory.create_from_settings()
-    weather_service = WeatherService()
+    ai_provider = AIFactory.shared_from_settings()
+    weather_service = _weather_service()
     
     # 1. Try to get weather context to make the plan "smart"
     weather_context = "Weather data unavailable"
@@ -536,7 +635,7 @@ async def generate_structured_itinerary(request: TripPlanningRequest):
         )
         
         content = response.choices[0].message.content
-        data = json.loads(content)
+        data = orjson.loads(content)
         
         # Validate and return
         return TripPlanResponse(**data)
@@ -681,7 +780,7 @@ async def _fallback_tool_chat(message: str) -> LegacyChatResponse:
     Fallback to tool-based chat if main service fails
     Maintains the original tool-calling functionality
     """
-    ai_provider = AIFactory.create_from_settings()
+    ai_provider = AIFactory.shared_from_settings()
     
     if ai_provider.__class__.__name__ == "MockAIProvider":
         if "weather" in message.lower():
@@ -786,14 +885,14 @@ async def _fallback_tool_chat(message: str) -> LegacyChatResponse:
             
             for tool_call in tool_calls:
                 function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
+                function_args = orjson.loads(tool_call.function.arguments)
                 tool_response = ""
                 
                 if function_name == "get_weather_for_city":
                     city = function_args.get("city", "").lower()
                     coords = MOCK_GEOCODER.get(city)
                     if coords and "lat" in coords:
-                        weather = await WeatherService().get_weather(
+                        weather = await _weather_service().get_weather(
                             coords["lat"], coords["lon"], date.today()
                         )
                         tool_response = json.dumps(weather)
@@ -801,14 +900,14 @@ async def _fallback_tool_chat(message: str) -> LegacyChatResponse:
                         tool_response = json.dumps({"error": "City not found"})
                 
                 elif function_name == "get_visa_requirements":
-                    visa = await VisaService().get_visa_requirements(
+                    visa = await _visa_service().get_visa_requirements(
                         function_args.get("passport_country", "US"),
                         function_args.get("destination_country", "FR")
                     )
                     tool_response = json.dumps(visa)
                 
                 elif function_name == "get_attractions":
-                    attractions = await AttractionsService().get_natural_attractions(
+                    attractions = await _attractions_service().get_natural_attractions(
                         function_args.get("city", "Paris")
                     )
                     tool_response = json.dumps(attractions)
@@ -819,7 +918,7 @@ async def _fallback_tool_chat(message: str) -> LegacyChatResponse:
                     coords = MOCK_GEOCODER.get(dest)
                     weather_cond = "unknown"
                     if coords:
-                        w = await WeatherService().get_weather(coords["lat"], coords["lon"], date.today())
+                        w = await _weather_service().get_weather(coords["lat"], coords["lon"], date.today())
                         weather_cond = w.get("condition", "unknown")
                     
                     tool_response = json.dumps({
@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator
 from functools import lru_cache
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
 import os
 
 # Determine the correct .env file path
@@ -96,6 +96,9 @@ class Settings(BaseSettings):
     llm_provider: str = "openai"
     llm_base_url: Optional[str] = None
     llm_model: str = "gpt-3.5-turbo"
+    # Ceiling on a non-streaming chat completion; past it the chat turn is
+    # answered from the keyword fallback instead of waiting on the provider
+    chat_llm_timeout_seconds: float = 15.0
 
     # Web Search
     brave_search_api_key: Optional[str] = None  # https://brave.com/search/api/
@@ -173,3 +176,31 @@ POPULAR_DESTINATIONS = [
     {"id": "prague_cz", "name": "Prague", "country": "Czech Republic", "country_code": "CZ", "city": "Prague", "coordinates": {"lat": 50.0755, "lng": 14.4378}, "cost_index": 45, "continent": "europe"},
     {"id": "auckland_nz", "name": "Auckland", "country": "New Zealand", "country_code": "NZ", "city": "Auckland", "coordinates": {"lat": -36.8485, "lng": 174.7633}, "cost_index": 70, "continent": "oceania"},
 ]
+
+
+class PopularDest(NamedTuple):
+    """Flat, immutable view of a POPULAR_DESTINATIONS entry for hot paths"""
+    id: str
+    name: str
+    country: str
+    city: str
+    country_code: str
+    lat: float
+    lng: float
+    continent: Optional[str]
+
+
+# Same entries as POPULAR_DESTINATIONS (which stays the public dict shape)
+POPULAR_DESTS: Tuple[PopularDest, ...] = tuple(
+    PopularDest(
+        id=d["id"],
+        name=d["name"],
+        country=d["country"],
+        city=d["city"],
+        country_code=d["country_code"],
+        lat=d["coordinates"]["lat"],
+        lng=d["coordinates"]["lng"],
+        continent=d.get("continent"),
+    )
+    for d in POPULAR_DESTINATIONS
+)
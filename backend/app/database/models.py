@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, ForeignKey, Text, Index
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.database.connection import generate_uuid, Base
@@ -72,8 +72,8 @@ class SearchHistory(Base):
     user_id = Column(String, ForeignKey("users.id"), index=True)
     origin = Column(String, nullable=False, index=True)
     destination = Column(String, nullable=True, index=True)
-    travel_start = Column(DateTime, nullable=True)
-    travel_end = Column(DateTime, nullable=True)
+    travel_start = Column(Date, nullable=True)
+    travel_end = Column(Date, nullable=True)
     search_query = Column(Text, nullable=False)
     results_count = Column(Integer, default=0)
     created_at = Column(DateTime, default=utcnow_naive, index=True)
@@ -103,15 +103,20 @@ class Itinerary(Base):
     destination_id = Column(String, nullable=False)
     destination_name = Column(String, nullable=False)
     destination_country = Column(String, nullable=False)
-    travel_start = Column(DateTime, nullable=False)
-    travel_end = Column(DateTime, nullable=False)
+    travel_start = Column(Date, nullable=False)
+    travel_end = Column(Date, nullable=False)
     notes = Column(Text, nullable=True)
     is_public = Column(Boolean, default=False)
     created_at = Column(DateTime, default=utcnow_naive)
     updated_at = Column(DateTime, default=utcnow_naive, onupdate=utcnow_naive)
     
     user = relationship("User")
-    days = relationship("ItineraryDay", back_populates="itinerary", cascade="all, delete-orphan")
+    days = relationship(
+        "ItineraryDay",
+        back_populates="itinerary",
+        cascade="all, delete-orphan",
+        order_by="ItineraryDay.day_number",
+    )
 
 
 class ItineraryDay(Base):
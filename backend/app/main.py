@@ -1,6 +1,8 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -49,6 +51,13 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting TravelAI API")
 
+    # Run new tasks eagerly (Python 3.12+): coroutines that finish without
+    # blocking — e.g. cache hits inside the recommendation gather fan-out —
+    # complete inline instead of bouncing through the event loop.
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+        logger.info("Eager asyncio task factory enabled")
+
     # Warn loudly when SECRET_KEY is not set via env var.
     # Without a stable key, every restart invalidates all user JWTs and
     # logs everyone out. Set SECRET_KEY in your Render environment variables.
@@ -115,7 +124,8 @@ app = FastAPI(
     title="TravelAI API",
     description="AI-enhanced travel recommendation platform",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add rate limiter to app
@@ -240,6 +250,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses above 256 bytes; even small payloads such as
+# suggestions repeat their field names enough to shrink several-fold.
+# NDJSON streams (/recommendations/stream) stay uncompressed so each line is
+# delivered as soon as it is produced, like SSE (excluded by default).
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=256,
+    compresslevel=5,
+    exclude_content_types=(*DEFAULT_EXCLUDED_CONTENT_TYPES, "application/x-ndjson"),
+)
+
 # Include routers
 app.include_router(main_router)
 app.include_router(auth_router)
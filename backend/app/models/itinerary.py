@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import date, datetime
 from enum import Enum
@@ -52,8 +52,7 @@ class ItineraryActivityResponse(ItineraryActivityBase):
     day_id: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ItineraryDayBase(BaseModel):
@@ -77,8 +76,7 @@ class ItineraryDayResponse(ItineraryDayBase):
     itinerary_id: str
     activities: List[ItineraryActivityResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ItineraryBase(BaseModel):
@@ -111,8 +109,7 @@ class ItineraryResponse(ItineraryBase):
     updated_at: datetime
     days: List[ItineraryDayResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ItinerarySummary(BaseModel):
@@ -127,5 +124,4 @@ class ItinerarySummary(BaseModel):
     total_days: int
     total_activities: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
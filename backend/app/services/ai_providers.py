@@ -4,6 +4,7 @@ Supports OpenAI, Anthropic, and mock fallback
 """
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 import json
 
@@ -35,6 +36,9 @@ class AIProvider(ABC):
 
 
 class OpenAIProvider(AIProvider):
+    # OpenAI-compatible backends known to accept response_format={"type": "json_object"}
+    JSON_MODE_PROVIDERS = frozenset({"openai", "deepseek"})
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -45,6 +49,7 @@ class OpenAIProvider(AIProvider):
         self.api_key = api_key
         self.model = model
         self.provider = provider_name or "openai"
+        self.supports_json_mode = self.provider in self.JSON_MODE_PROVIDERS
         self.client = None
         if api_key:
             try:
@@ -262,3 +267,12 @@ class AIFactory:
 
         # deepseek uses base_url https://api.deepseek.com/v1; openai uses default
         return OpenAIProvider(api_key=api_key, base_url=base_url, model=model, provider_name=provider)
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def shared_from_settings() -> AIProvider:
+        """
+        Process-wide provider built from settings. Reusing it keeps one SDK
+        client, and so one HTTP connection pool, across requests.
+        """
+        return AIFactory.create_from_settings()
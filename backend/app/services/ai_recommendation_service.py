@@ -1,9 +1,11 @@
-from typing import List, Dict, Optional
+from typing import AsyncIterable, Iterable, List, Dict, Optional, Union
 from app.config import get_settings
 from app.models.destination import Destination
 from app.models.user import UserPreferences, TravelRequest, Interest
 from app.utils.scoring import calculate_destination_score
 import asyncio
+import heapq
+from operator import attrgetter
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -37,31 +39,30 @@ class AIRecommendationService:
     async def generate_recommendations(
         self,
         request: TravelRequest,
-        destinations: List[Destination]
+        destinations: Union[Iterable[Destination], AsyncIterable[Destination]]
     ) -> List[Destination]:
         """
         Generate AI-powered personalized recommendations
         1. Score all destinations based on user preferences
         2. Sort by overall score
         3. Generate AI explanations for top recommendations
+
+        destinations may be an async iterable, in which case each destination
+        is scored as soon as it arrives while the rest are still being fetched.
         """
         # Calculate scores for all destinations
         scored_destinations = []
-        for dest in destinations:
-            scores = calculate_destination_score(dest, request.user_preferences)
-            dest.weather_score = scores.get("weather", 0)
-            dest.affordability_score = scores.get("affordability", 0)
-            dest.visa_score = scores.get("visa", 0)
-            dest.attractions_score = scores.get("attractions", 0)
-            dest.events_score = scores.get("events", 0)
-            dest.overall_score = scores.get("overall", 0)
-            scored_destinations.append(dest)
-        
-        # Sort by overall score (descending)
-        scored_destinations.sort(key=lambda x: x.overall_score, reverse=True)
+        if isinstance(destinations, AsyncIterable):
+            async for dest in destinations:
+                scored_destinations.append(self.score_destination(dest, request.user_preferences))
+        else:
+            for dest in destinations:
+                scored_destinations.append(self.score_destination(dest, request.user_preferences))
         
-        # Select top N for AI enhancement
-        top_destinations = scored_destinations[:request.num_recommendations]
+        # Select top N by overall score for AI enhancement
+        top_destinations = heapq.nlargest(
+            request.num_recommendations, scored_destinations, key=attrgetter("overall_score")
+        )
         
         # Generate AI explanations for top recommendations
         if self._get_client():
@@ -92,6 +93,17 @@ class AIRecommendationService:
         
         return top_destinations
     
+    def score_destination(self, dest: Destination, preferences: UserPreferences) -> Destination:
+        """Attach preference scores to a destination"""
+        scores = calculate_destination_score(dest, preferences)
+        dest.weather_score = scores.get("weather", 0)
+        dest.affordability_score = scores.get("affordability", 0)
+        dest.visa_score = scores.get("visa", 0)
+        dest.attractions_score = scores.get("attractions", 0)
+        dest.events_score = scores.get("events", 0)
+        dest.overall_score = scores.get("overall", 0)
+        return dest
+
     async def _generate_explanations_batch(
         self,
         destinations: List[Destination],
@@ -3,9 +3,11 @@ Unified AI Chat Service with Memory and Context
 Provides a ChatGPT-like conversational experience for travel planning
 """
 
-from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
+from typing import List, Dict, Any, Optional, AsyncGenerator, Callable, Set, Tuple
 from datetime import datetime, timedelta, date
+from functools import lru_cache
 from collections import OrderedDict
+from itertools import islice
 from pydantic import BaseModel, Field
 import json
 import asyncio
@@ -13,6 +15,8 @@ import re
 import hashlib
 from time import perf_counter
 
+import orjson
+
 from app.config import get_settings
 from app.services.ai_providers import AIFactory
 from app.services.travelgenie_service import travelgenie_service
@@ -20,6 +24,7 @@ from app.services.visa_service import VisaService
 from app.services.events_service import EventsService
 from app.services.flight_service import FlightService
 from app.utils.datetime_utils import utcnow_naive
+from app.utils.keyword_scan import compile_keyword_table, first_label, labels_in
 from app.utils.logging_config import get_logger
 from app.database.connection import SessionLocal
 from app.database.models import User, UserPreferences, PersistedChatSession
@@ -61,6 +66,28 @@ class ChatSession(BaseModel):
     recommendation_feedback: Dict[str, float] = Field(default_factory=dict)
 
 
+def _previous_assistant_reply(messages: List[ChatMessage]) -> str:
+    """
+    Content of the latest assistant message before the just-added user message.
+    Walks the history backwards in place rather than copying it with [:-1].
+    """
+    return next(
+        (m.content for m in islice(reversed(messages), 1, None) if m.role == "assistant"),
+        "",
+    )
+
+
+# Turns of raw history sent to the model. Older turns are not lost: everything
+# extracted from them is restated in the system prompt's CURRENT CONTEXT, so
+# prompt size stays flat however long the conversation runs.
+_HISTORY_WINDOW = 10
+
+
+def _recent_history(messages: List[ChatMessage]) -> List[Dict[str, Any]]:
+    """Last _HISTORY_WINDOW messages in chat-completions format"""
+    return [{"role": m.role, "content": m.content} for m in messages[-_HISTORY_WINDOW:]]
+
+
 class _ResponseCache:
     """
     Simple in-memory TTL cache for AI responses.
@@ -74,11 +101,7 @@ class _ResponseCache:
 
     def _key(self, session: "ChatSession", message: str) -> str:
         # Key = planning stage + last assistant reply (first 100 chars) + current message
-        last_reply = ""
-        for msg in reversed(session.messages[:-1]):  # exclude the just-added user message
-            if msg.role == "assistant":
-                last_reply = msg.content[:100]
-                break
+        last_reply = _previous_assistant_reply(session.messages)[:100]
         raw = f"{session.planning_stage}|{last_reply}|{message.strip().lower()}"
         return hashlib.md5(raw.encode()).hexdigest()
 
@@ -100,6 +123,72 @@ class _ResponseCache:
         self._store[key] = (response, utcnow_naive())
 
 
+class _CombinedStreamParser:
+    """
+    Incremental splitter for the tagged combined-stream format.
+    feed() returns the newly visible <assistant_response> text for each delta.
+    Only the unresolved tail is kept and searched, so each delta costs
+    O(len(delta)) instead of rescanning everything received so far.
+    """
+
+    START_TAG = "<assistant_response>"
+    END_TAGS = ("</assistant_response>", "<extracted_json>")
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._pending = ""
+        self._state = "prefix"  # prefix -> body -> done, or prefix -> passthrough
+
+    @property
+    def raw(self) -> str:
+        """Everything received so far, for the final structured parse"""
+        return "".join(self._parts)
+
+    def feed(self, delta: str) -> str:
+        self._parts.append(delta)
+        if self._state == "passthrough":
+            return delta
+        if self._state == "done":
+            return ""
+
+        self._pending += delta
+        if self._state == "prefix":
+            start_idx = self._pending.find(self.START_TAG)
+            if start_idx == -1:
+                candidate = self._pending.lstrip()
+                # Wait while the model is still emitting a partial opening tag;
+                # anything else means the provider ignored the wrapper format.
+                if candidate and not self.START_TAG.startswith(candidate):
+                    self._state = "passthrough"
+                    visible, self._pending = self._pending, ""
+                    return visible
+                return ""
+            self._state = "body"
+            self._pending = self._pending[start_idx + len(self.START_TAG):]
+
+        end_idx = self._pending.find(self.END_TAGS[0])
+        if end_idx == -1:
+            end_idx = self._pending.find(self.END_TAGS[1])
+        if end_idx != -1:
+            self._state = "done"
+            visible, self._pending = self._pending[:end_idx], ""
+            return visible
+
+        # Hold back a trailing fragment that may be the start of a closing tag
+        cut = self._pending.rfind("<")
+        if cut != -1 and any(tag.startswith(self._pending[cut:]) for tag in self.END_TAGS):
+            visible, self._pending = self._pending[:cut], self._pending[cut:]
+            return visible
+        visible, self._pending = self._pending, ""
+        return visible
+
+    def flush(self) -> str:
+        """Release held-back text once the stream ends without a closing tag"""
+        visible = self._pending if self._state == "body" else ""
+        self._pending = ""
+        return visible
+
+
 # Max number of sessions to keep in-process memory.
 # Each ChatSession ~20 KB with full history -> 1,000 sessions ~= 20 MB.
 # Older sessions are evicted (they are already persisted to DB/Redis).
@@ -131,6 +220,334 @@ _MONTH_TO_NUM = {
 }
 
 
+# Patterns for the deterministic preference parser, compiled once
+_ORIGIN_RE = re.compile(
+    r"\bfrom\s+([A-Za-z][A-Za-z\s]{1,40}?)(?=\s+(?:to|for|with|in|on|during|next|this|$))",
+    re.IGNORECASE,
+)
+_DESTINATION_RES = (
+    re.compile(
+        r"\bto\s+([A-Za-z][A-Za-z\s]{1,40}?)(?=\s+(?:for|with|from|in|on|during|next|this|$))",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"\bvisit\s+([A-Za-z][A-Za-z\s]{1,40}?)(?=\s+(?:for|with|from|in|on|during|next|this|$))",
+        re.IGNORECASE,
+    ),
+)
+_DESTINATION_PHRASE_RE = re.compile(r"(?:to|in|visit)\s+([A-Za-z\s]{2,40})", re.IGNORECASE)
+# Optional ```json / ``` fences around a model's JSON reply; group 1 is the body
+_FENCE_RE = re.compile(r"(?:```(?:json)?)?\s*(.*?)\s*(?:```)?", re.DOTALL | re.IGNORECASE)
+_ISO_DATE_RE = re.compile(r"\b(\d{4}-\d{2}(?:-\d{2})?)\b")
+_MONTH_RE = re.compile(r"\b(" + "|".join(_MONTH_TO_NUM) + r")\b(?:\s+(\d{4}))?", re.IGNORECASE)
+
+
+def _keyword_re(*keywords: str) -> "re.Pattern[str]":
+    """Compile keywords into one alternation, matching any of them as a substring"""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# Budget level / travel party -> keywords, in priority order: when keywords
+# from several levels appear, the earliest level wins. Each table is scanned
+# in one regex pass. Input is lowercased.
+_BUDGET_LEVEL_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "low": ("budget", "cheap", "affordable", "backpack"),
+    "luxury": ("luxury", "premium", "5-star", "five-star"),
+    "high": ("high budget", "upscale"),
+    "moderate": ("mid", "moderate", "comfortable"),
+}
+_BUDGET_LEVEL_SCAN = compile_keyword_table(_BUDGET_LEVEL_KEYWORDS)
+_TRAVELING_WITH_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "family": ("family", "kids", "children"),
+    "couple": ("partner", "couple", "wife", "husband"),
+    "friends": ("friends", "group"),
+    "solo": ("solo", "alone", "myself"),
+}
+_TRAVELING_WITH_SCAN = compile_keyword_table(_TRAVELING_WITH_KEYWORDS)
+# Planning stage a message asks for outright, in priority order
+_STAGE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "booking_checklist": ("book", "reserve", "checklist", "packing"),
+    "itinerary": ("itinerary", "day plan", "schedule"),
+    "compare": ("compare", "vs", "versus"),
+}
+_STAGE_SCAN = compile_keyword_table(_STAGE_KEYWORDS)
+
+# Other keyword groups for the deterministic parsers below, each scanned in a
+# single regex pass instead of one `in` test per keyword. Input is lowercased.
+_COMPARE_RE = _keyword_re("compare", "vs", "versus")
+_INTENT_ITINERARY_RE = _keyword_re("itinerary", "day-by-day", "schedule")
+_INTENT_INFORMATION_RE = _keyword_re("weather", "flight", "visa", "hotel")
+_GROUNDING_TRIGGER_RE = _keyword_re(
+    "weather", "flight", "fly", "hotel", "accommodation",
+    "event", "festival", "visa", "cost", "price", "when",
+    "best time", "cheap", "budget", "how much",
+)
+
+# Canned fallback replies for topic questions, used when the LLM is unavailable.
+# Each takes (destination, origin, has_budget).
+def _weather_reply(destination: Optional[str], origin: Optional[str], has_budget: bool) -> str:
+    if destination:
+        return f"I can help with weather for {destination}. What dates are you planning to travel?"
+    return "I can help with weather. Which destination should I check?"
+
+
+def _flight_reply(destination: Optional[str], origin: Optional[str], has_budget: bool) -> str:
+    if origin and destination:
+        return f"I can estimate flights from {origin} to {destination}. What are your travel dates?"
+    if destination:
+        return f"I can check flights to {destination}. What city are you departing from?"
+    return "I can help with flights. Tell me your departure city and destination."
+
+
+def _hotel_reply(destination: Optional[str], origin: Optional[str], has_budget: bool) -> str:
+    if destination and has_budget:
+        return f"Got it. For {destination}, what dates should I use to suggest hotels in your budget?"
+    if destination:
+        return (
+            f"I can suggest hotels in {destination}. "
+            "What budget level do you prefer: low, moderate, high, or luxury?"
+        )
+    return "I can suggest hotels. Which destination are you interested in?"
+
+
+def _visa_reply(destination: Optional[str], origin: Optional[str], has_budget: bool) -> str:
+    if destination:
+        return f"I can guide you on visa checks for {destination}. What passport country are you traveling with?"
+    return "I can help with visa guidance. Tell me your destination and passport country."
+
+
+# Checked in order; the first topic mentioned in the message picks the reply
+_FALLBACK_TOPICS = (
+    (_keyword_re("weather"), _weather_reply),
+    (_keyword_re("flight", "fly"), _flight_reply),
+    (_keyword_re("hotel", "accommodation"), _hotel_reply),
+    (_keyword_re("visa"), _visa_reply),
+)
+
+# Follow-up asked for the first missing detail, in the order _fallback_response
+# checks them: origin, destination, travel dates, budget, who's traveling.
+_FALLBACK_FOLLOW_UPS = tuple(
+    f"I can build your plan right away. {question}"
+    for question in (
+        "What city are you flying from?",
+        "Which destination are you considering?",
+        "What dates are you planning to travel?",
+        "What's your budget level (low, moderate, high, or luxury)?",
+        "Who is traveling (solo, couple, family, or friends)?",
+    )
+)
+# Appended by _dedupe_fallback_response when a follow-up would repeat verbatim
+_FOLLOW_UP_EXAMPLE = " Example: \"From New York to Rome in June, couple, moderate budget.\""
+
+
+def _has_travel_dates(prefs: Dict[str, Any]) -> bool:
+    travel_dates = prefs.get("travel_dates")
+    return isinstance(travel_dates, dict) and bool(travel_dates.get("start") or travel_dates.get("end"))
+
+
+def _has_budget(prefs: Dict[str, Any]) -> bool:
+    return bool(prefs.get("budget_level") or prefs.get("budget_daily") or prefs.get("budget_total"))
+
+
+# (is the detail known?, follow-up asking for it) in priority order. The walk
+# stops at the first missing detail, so later checks are skipped.
+_FALLBACK_FOLLOW_UP_CHECKS: Tuple[Tuple[Callable[[Dict[str, Any], Optional[str]], bool], str], ...] = tuple(zip(
+    (
+        lambda prefs, destination: bool(prefs.get("origin")),
+        lambda prefs, destination: bool(destination),
+        lambda prefs, destination: _has_travel_dates(prefs),
+        lambda prefs, destination: _has_budget(prefs),
+        lambda prefs, destination: bool(prefs.get("traveling_with") or prefs.get("num_travelers")),
+    ),
+    _FALLBACK_FOLLOW_UPS,
+))
+
+# Interest tag -> keywords, scanned in one regex pass. Input is lowercased.
+_INTEREST_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "beach": ("beach",),
+    "mountain": ("mountain",),
+    "adventure": ("hiking", "adventure"),
+    "food": ("food",),
+    "culture": ("culture",),
+    "history": ("history",),
+    "nightlife": ("nightlife",),
+    "relaxation": ("relax",),
+    "art": ("museum", "art"),
+    "shopping": ("shopping",),
+}
+_INTEREST_SCAN = compile_keyword_table(_INTEREST_KEYWORDS)
+
+# Grounding payload used when a turn skips tool lookups. Built once and shared:
+# every consumer only reads "facts" and "citations", so it must never be mutated.
+_NO_GROUNDING: Dict[str, Any] = {"facts": {}, "citations": []}
+
+# Static parts of the chat system prompt, built once at import. Only the
+# CURRENT CONTEXT lines vary per turn, so they are spliced in between.
+_SYSTEM_PROMPT_HEAD = """You are TravelAI, an expert travel assistant with deep knowledge of destinations worldwide.
+
+YOUR CAPABILITIES:
+- Provide personalized destination recommendations
+- Search flights, hotels, and attractions
+- Create detailed day-by-day itineraries
+- Check visa requirements and travel advisories
+- Find events and activities
+- Compare destinations
+- Answer travel-related questions
+
+COMMUNICATION STYLE:
+- Be friendly, enthusiastic, and helpful
+- Use emojis sparingly to make responses engaging
+- Keep responses concise but informative
+- Ask clarifying questions when needed
+- Proactively suggest relevant information
+
+RESPONSE FORMAT:
+- Use markdown for formatting (bold, lists, etc.)
+- Structure information clearly
+- Include practical details (prices, durations, best times)
+- When suggesting destinations, mention 2-3 key highlights
+
+FACTUAL ACCURACY & SAFETY:
+- Never fabricate precise real-world facts like exact visa rules or live prices.
+- If you are unsure about visas, legal requirements, or real-time prices, clearly say you are unsure and advise the user to double-check with official sources.
+- Do not provide medical, legal, or financial advice beyond general common-sense travel tips.
+- Avoid offensive, hateful, or explicit content.
+
+CURRENT CONTEXT:
+"""
+_SYSTEM_PROMPT_FOOTER = (
+    "\n\nRemember: Your goal is to help users plan their perfect trip while gathering enough information to provide personalized recommendations."
+)
+
+# Standalone extraction prompt used by _update_context; only the quoted
+# message varies per call.
+_EXTRACTION_PROMPT_HEAD = """Analyze this travel-related message and extract structured information.
+
+Message: """
+_EXTRACTION_PROMPT_TAIL = """
+
+Extract the following (use null if not mentioned):
+- origin: departure city/country
+- destinations: mentioned destinations (array)
+- travel_dates: {start: "YYYY-MM", end: "YYYY-MM"}
+- duration: number of days
+- budget_level: "budget" | "moderate" | "luxury" | "ultra-luxury"
+- interests: activities they enjoy (array)
+- traveling_with: "solo" | "couple" | "family" | "friends"
+- kids_ages: ages if family with children (array)
+- accommodation_type: "hotel" | "hostel" | "airbnb" | "resort"
+- activity_pace: "relaxed" | "moderate" | "active"
+- special_occasion: honeymoon, anniversary, birthday, etc.
+- dietary_restrictions: (array)
+- accessibility_needs: (array)
+- visa_preference: "visa_free" | "easy_visa" | "any"
+- weather_preference: "warm" | "cold" | "mild" | "tropical"
+- nightlife_priority: "low" | "medium" | "high"
+- car_hire: boolean
+- flight_class: "economy" | "premium" | "business" | "first"
+
+Also detect:
+- intent: main purpose (recommendation, booking, comparison, information, itinerary)
+- confidence: 0-1 how confident in extraction
+
+Return as JSON only."""
+
+# Output contracts appended to the system prompt for the combined
+# (reply + extraction) LLM calls.
+_STREAM_OUTPUT_FORMAT = """
+
+OUTPUT FORMAT (required):
+Return ONLY the following wrapped blocks:
+<assistant_response>
+Your user-facing travel reply (max 150 words).
+</assistant_response>
+<extracted_json>
+{"origin":null,"destinations":null,"travel_dates":null,"duration":null,"budget_level":null,"interests":null,"traveling_with":null,"intent":null}
+</extracted_json>
+
+Rules:
+- Keep <assistant_response> natural, concise, and helpful.
+- In <extracted_json>, only fill fields you can identify confidently from the user's message; keep others null.
+- No markdown fences or extra text outside these two blocks.
+"""
+_JSON_OUTPUT_FORMAT = """
+
+OUTPUT FORMAT (required):
+Reply with a single JSON object - no markdown fences, no extra text:
+{"extracted":{"origin":null,"destinations":null,"travel_dates":null,"duration":null,"budget_level":null,"interests":null,"traveling_with":null,"intent":null},"response":"Your reply here"}
+
+Rules:
+- In "extracted": only fill fields you can confidently identify from the user's message; leave others null.
+- In "response": write a natural, friendly travel assistant reply, max 150 words.
+- Output ONLY the JSON object - nothing before or after it."""
+
+
+@lru_cache(maxsize=1024)
+def _heuristic_preferences(text: str, lower: str, year: int) -> Dict[str, Any]:
+    """
+    Keyword extraction behind ChatService._extract_preferences_heuristic.
+    Memoized on the message, so retried or double-submitted turns skip the
+    regex passes; year is part of the key because month-only dates use it.
+    The returned dict is shared between callers and must not be mutated.
+    """
+    extracted: Dict[str, Any] = {}
+
+    origin_match = _ORIGIN_RE.search(text)
+    if origin_match:
+        extracted["origin"] = origin_match.group(1).strip(" ,.")
+
+    destinations: List[str] = []
+    seen_destinations: Set[str] = set()
+    for pattern in _DESTINATION_RES:
+        for match in pattern.finditer(text):
+            candidate = match.group(1).strip(" ,.")
+            key = candidate.lower()
+            if candidate and key not in seen_destinations:
+                seen_destinations.add(key)
+                destinations.append(candidate)
+    if destinations:
+        extracted["destinations"] = destinations[:3]
+
+    # Only the first two dates are used, so stop scanning after them
+    iso_like_dates = [m.group(1) for m in islice(_ISO_DATE_RE.finditer(text), 2)]
+    if iso_like_dates:
+        start_raw = iso_like_dates[0]
+        end_raw = iso_like_dates[1] if len(iso_like_dates) > 1 else iso_like_dates[0]
+        extracted["travel_dates"] = {
+            "start": start_raw[:7],
+            "end": end_raw[:7],
+        }
+    else:
+        month_match = _MONTH_RE.search(lower)
+        if month_match:
+            month_num = _MONTH_TO_NUM[month_match.group(1).lower()]
+            trip_year = month_match.group(2) or str(year)
+            extracted["travel_dates"] = {"start": f"{trip_year}-{month_num}", "end": f"{trip_year}-{month_num}"}
+
+    budget_level = first_label(lower, _BUDGET_LEVEL_KEYWORDS, _BUDGET_LEVEL_SCAN)
+    if budget_level:
+        extracted["budget_level"] = budget_level
+
+    traveling_with = first_label(lower, _TRAVELING_WITH_KEYWORDS, _TRAVELING_WITH_SCAN)
+    if traveling_with:
+        extracted["traveling_with"] = traveling_with
+
+    interests = sorted(labels_in(lower, _INTEREST_SCAN))
+    if interests:
+        extracted["interests"] = interests
+
+    if _COMPARE_RE.search(lower):
+        extracted["intent"] = "comparison"
+    elif _INTENT_ITINERARY_RE.search(lower):
+        extracted["intent"] = "itinerary"
+    elif _INTENT_INFORMATION_RE.search(lower):
+        extracted["intent"] = "information"
+    else:
+        extracted["intent"] = "recommendation"
+
+    return extracted
+
+
 class ChatService:
     """
     Production-ready chat service with:
@@ -210,7 +627,7 @@ class ChatService:
     def _init_ai(self):
         """Initialize AI provider"""
         try:
-            self.ai_provider = AIFactory.create_from_settings()
+            self.ai_provider = AIFactory.shared_from_settings()
             logger.info("Chat AI provider initialized", provider=type(self.ai_provider).__name__)
         except Exception as e:
             logger.warning("Failed to initialize AI provider", error=str(e))
@@ -440,51 +857,14 @@ class ChatService:
     
     def _get_system_prompt(self, session: ChatSession) -> str:
         """Generate dynamic system prompt based on context"""
-        base_prompt = """You are TravelAI, an expert travel assistant with deep knowledge of destinations worldwide.
-
-YOUR CAPABILITIES:
-- Provide personalized destination recommendations
-- Search flights, hotels, and attractions
-- Create detailed day-by-day itineraries
-- Check visa requirements and travel advisories
-- Find events and activities
-- Compare destinations
-- Answer travel-related questions
-
-COMMUNICATION STYLE:
-- Be friendly, enthusiastic, and helpful
-- Use emojis sparingly to make responses engaging
-- Keep responses concise but informative
-- Ask clarifying questions when needed
-- Proactively suggest relevant information
-
-RESPONSE FORMAT:
-- Use markdown for formatting (bold, lists, etc.)
-- Structure information clearly
-- Include practical details (prices, durations, best times)
-- When suggesting destinations, mention 2-3 key highlights
-
-FACTUAL ACCURACY & SAFETY:
-- Never fabricate precise real-world facts like exact visa rules or live prices.
-- If you are unsure about visas, legal requirements, or real-time prices, clearly say you are unsure and advise the user to double-check with official sources.
-- Do not provide medical, legal, or financial advice beyond general common-sense travel tips.
-- Avoid offensive, hateful, or explicit content.
-
-CURRENT CONTEXT:
-- User preferences: {preferences}
-- Conversation focus: {intent}
-- Extracted info: {extracted}
-
-Remember: Your goal is to help users plan their perfect trip while gathering enough information to provide personalized recommendations."""
-
         preferences = session.extracted_preferences.get('preferences_summary', 'Not yet specified')
         intent = session.current_intent or 'General travel inquiry'
         extracted = json.dumps(session.extracted_preferences, indent=2) if session.extracted_preferences else 'None yet'
-        
-        return base_prompt.format(
-            preferences=preferences,
-            intent=intent,
-            extracted=extracted
+
+        return (
+            f"{_SYSTEM_PROMPT_HEAD}- User preferences: {preferences}\n"
+            f"- Conversation focus: {intent}\n"
+            f"- Extracted info: {extracted}{_SYSTEM_PROMPT_FOOTER}"
         )
     
     async def send_message(
@@ -518,6 +898,8 @@ Remember: Your goal is to help users plan their perfect trip while gathering eno
             content=user_message,
             timestamp=utcnow_naive()
         ))
+        # Lowered once per turn and shared by the keyword heuristics below
+        user_lower = user_message.lower()
 
         # --- Optimised AI path ---
         if self.ai_provider and getattr(self.ai_provider, 'client', None):
@@ -531,8 +913,8 @@ Remember: Your goal is to help users plan their perfect trip while gathering eno
                 # 2. Grounding (skipped when not useful)
                 grounding = (
                     await self._collect_grounded_facts(session, user_message)
-                    if self._should_run_grounding(session, user_message)
-                    else {"facts": {}, "citations": []}
+                    if self._should_run_grounding(session, user_message, user_lower)
+                    else _NO_GROUNDING
                 )
                 # 3. Single combined API call
                 ai_response, extracted = await self._combined_api_call(session, grounding)
@@ -540,13 +922,13 @@ Remember: Your goal is to help users plan their perfect trip while gathering eno
 
             # Merge AI extraction with deterministic parsing so fallback mode
             # still progresses instead of repeating the same prompt.
-            heuristic = self._extract_preferences_heuristic(user_message)
+            heuristic = self._extract_preferences_heuristic(user_message, user_lower)
             merged = {**heuristic, **(extracted or {})}
             self._merge_extracted_preferences(session, merged)
         else:
             self._merge_extracted_preferences(
                 session,
-                self._extract_preferences_heuristic(user_message),
+                self._extract_preferences_heuristic(user_message, user_lower),
             )
             ai_response = self._fallback_response(session)
 
@@ -559,7 +941,7 @@ Remember: Your goal is to help users plan their perfect trip while gathering eno
 
         session.updated_at = utcnow_naive()
         session.is_ready_for_recommendations = self._check_ready_for_recommendations(session)
-        session.planning_stage = self._infer_planning_stage(session, user_message)
+        session.planning_stage = self._infer_planning_stage(session, user_message, user_lower)
         await self._save_session(session)
 
         return session
@@ -594,12 +976,14 @@ Remember: Your goal is to help users plan their perfect trip while gathering eno
             content=user_message,
             timestamp=utcnow_naive()
         ))
+        # Lowered once per turn and shared by the keyword heuristics below
+        user_lower = user_message.lower()
 
         # Collect grounding only when useful (skip extraction to save API call)
         grounding = (
             await self._collect_grounded_facts(session, user_message)
-            if self._should_run_grounding(session, user_message)
-            else {"facts": {}, "citations": []}
+            if self._should_run_grounding(session, user_message, user_lower)
+            else _NO_GROUNDING
         )
 
         full_response = ""
@@ -612,25 +996,7 @@ Remember: Your goal is to help users plan their perfect trip while gathering eno
             used_combined_stream = True
             try:
                 stream_started = perf_counter()
-                combined_system = (
-                    self._get_system_prompt(session)
-                    + """
-
-OUTPUT FORMAT (required):
-Return ONLY the following wrapped blocks:
-<assistant_response>
-Your user-facing travel reply (max 150 words).
-</assistant_response>
-<extracted_json>
-{"origin":null,"destinations":null,"travel_dates":null,"duration":null,"budget_level":null,"interests":null,"traveling_with":null,"intent":null}
-</extracted_json>
-
-Rules:
-- Keep <assistant_response> natural, concise, and helpful.
-- In <extracted_json>, only fill fields you can identify confidently from the user's message; keep others null.
-- No markdown fences or extra text outside these two blocks.
-"""
-                )
+                combined_system = self._get_system_prompt(session) + _STREAM_OUTPUT_FORMAT
 
                 messages: List[Dict[str, Any]] = [{"role": "system", "content": combined_system}]
                 if grounding.get("facts"):
@@ -641,8 +1007,7 @@ Rules:
                             f"{json.dumps(grounding['facts'], indent=2)}"
                         ),
                     })
-                for msg in session.messages[-10:]:
-                    messages.append({"role": msg.role, "content": msg.content})
+                messages.extend(_recent_history(session.messages))
 
                 stream = await client.chat.completions.create(
                     model=getattr(self.ai_provider, 'model', 'gpt-3.5-turbo'),
@@ -652,56 +1017,24 @@ Rules:
                     stream=True,
                 )
 
-                raw_stream_output = ""
-                response_emitted_len = 0
-                passthrough_mode = False
-                passthrough_emitted_len = 0
-                response_start_tag = "<assistant_response>"
-                response_end_tag = "</assistant_response>"
-                extracted_start_tag = "<extracted_json>"
-
+                parser = _CombinedStreamParser()
                 async for chunk in stream:
                     delta = chunk.choices[0].delta.content
                     if not delta:
                         continue
-
-                    raw_stream_output += delta
-                    token_to_emit = ""
-
-                    if passthrough_mode:
-                        token_to_emit = raw_stream_output[passthrough_emitted_len:]
-                        passthrough_emitted_len = len(raw_stream_output)
-                    else:
-                        start_idx = raw_stream_output.find(response_start_tag)
-                        if start_idx == -1:
-                            candidate = raw_stream_output.lstrip()
-                            # Wait while the model is still emitting a partial opening tag.
-                            if candidate and not response_start_tag.startswith(candidate):
-                                # Provider ignored wrapper format; passthrough immediately.
-                                passthrough_mode = True
-                                token_to_emit = raw_stream_output[passthrough_emitted_len:]
-                                passthrough_emitted_len = len(raw_stream_output)
-                        else:
-                            content_start = start_idx + len(response_start_tag)
-                            content_end = raw_stream_output.find(response_end_tag, content_start)
-                            extracted_start = raw_stream_output.find(extracted_start_tag, content_start)
-                            if content_end != -1:
-                                visible_end = content_end
-                            elif extracted_start != -1:
-                                visible_end = extracted_start
-                            else:
-                                visible_end = len(raw_stream_output)
-
-                            visible_content = raw_stream_output[content_start:visible_end]
-                            if len(visible_content) > response_emitted_len:
-                                token_to_emit = visible_content[response_emitted_len:]
-                                response_emitted_len = len(visible_content)
-
+                    token_to_emit = parser.feed(delta)
                     if token_to_emit:
                         emitted_any_token = True
                         full_response += token_to_emit
                         yield token_to_emit
 
+                token_to_emit = parser.flush()
+                if token_to_emit:
+                    emitted_any_token = True
+                    full_response += token_to_emit
+                    yield token_to_emit
+
+                raw_stream_output = parser.raw
                 parsed_response, combined_extracted = self._parse_combined_stream_output(raw_stream_output)
                 if not full_response.strip() and parsed_response:
                     emitted_any_token = True
@@ -765,7 +1098,7 @@ Rules:
         ))
 
         if used_combined_stream:
-            heuristic = self._extract_preferences_heuristic(user_message)
+            heuristic = self._extract_preferences_heuristic(user_message, user_lower)
             merged = {**heuristic, **(combined_extracted or {})}
             self._merge_extracted_preferences(session, merged)
         else:
@@ -774,7 +1107,7 @@ Rules:
 
         session.updated_at = utcnow_naive()
         session.is_ready_for_recommendations = self._check_ready_for_recommendations(session)
-        session.planning_stage = self._infer_planning_stage(session, user_message)
+        session.planning_stage = self._infer_planning_stage(session, user_message, user_lower)
         await self._save_session(session)
 
     def _extract_tagged_block(self, text: str, start_tag: str, end_tag: str) -> Optional[str]:
@@ -826,9 +1159,7 @@ Rules:
         """Best-effort parse for model responses that may wrap/append JSON."""
         if not raw:
             return None
-        clean = raw.strip()
-        clean = re.sub(r'^```(?:json)?\s*', '', clean, flags=re.IGNORECASE)
-        clean = re.sub(r'\s*```$', '', clean).strip()
+        clean = _FENCE_RE.fullmatch(raw.strip()).group(1)
 
         candidates = [clean]
         start = clean.find("{")
@@ -838,107 +1169,28 @@ Rules:
 
         for candidate in candidates:
             try:
-                parsed = json.loads(candidate)
+                parsed = orjson.loads(candidate)
                 if isinstance(parsed, dict):
                     return parsed
-            except (json.JSONDecodeError, ValueError):
+            except orjson.JSONDecodeError:
                 continue
         return None
 
-    def _extract_preferences_heuristic(self, user_message: str) -> Dict[str, Any]:
+    def _extract_preferences_heuristic(self, user_message: str, lower: Optional[str] = None) -> Dict[str, Any]:
         """
         Deterministic fallback extraction so session context keeps improving
         even when the LLM is unavailable or returns malformed JSON.
+        Pass lower when the caller already has user_message.lower().
         """
         text = user_message.strip()
-        lower = text.lower()
-        extracted: Dict[str, Any] = {}
-
-        origin_match = re.search(
-            r"\bfrom\s+([A-Za-z][A-Za-z\s]{1,40}?)(?=\s+(?:to|for|with|in|on|during|next|this|$))",
-            text,
-            re.IGNORECASE,
-        )
-        if origin_match:
-            extracted["origin"] = origin_match.group(1).strip(" ,.")
-
-        destinations: List[str] = []
-        for pattern in [
-            r"\bto\s+([A-Za-z][A-Za-z\s]{1,40}?)(?=\s+(?:for|with|from|in|on|during|next|this|$))",
-            r"\bvisit\s+([A-Za-z][A-Za-z\s]{1,40}?)(?=\s+(?:for|with|from|in|on|during|next|this|$))",
-        ]:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                candidate = match.group(1).strip(" ,.")
-                if candidate and candidate.lower() not in {d.lower() for d in destinations}:
-                    destinations.append(candidate)
-        if destinations:
-            extracted["destinations"] = destinations[:3]
-
-        iso_like_dates = re.findall(r"\b(\d{4}-\d{2}(?:-\d{2})?)\b", text)
-        if iso_like_dates:
-            start_raw = iso_like_dates[0]
-            end_raw = iso_like_dates[1] if len(iso_like_dates) > 1 else iso_like_dates[0]
-            extracted["travel_dates"] = {
-                "start": start_raw[:7],
-                "end": end_raw[:7],
-            }
-        else:
-            month_match = re.search(
-                r"\b(" + "|".join(_MONTH_TO_NUM.keys()) + r")\b(?:\s+(\d{4}))?",
-                lower,
-                re.IGNORECASE,
-            )
-            if month_match:
-                month_num = _MONTH_TO_NUM[month_match.group(1).lower()]
-                year = month_match.group(2) or str(utcnow_naive().year)
-                extracted["travel_dates"] = {"start": f"{year}-{month_num}", "end": f"{year}-{month_num}"}
-
-        if any(k in lower for k in ["budget", "cheap", "affordable", "backpack"]):
-            extracted["budget_level"] = "low"
-        elif any(k in lower for k in ["luxury", "premium", "5-star", "five-star"]):
-            extracted["budget_level"] = "luxury"
-        elif any(k in lower for k in ["high budget", "upscale"]):
-            extracted["budget_level"] = "high"
-        elif any(k in lower for k in ["mid", "moderate", "comfortable"]):
-            extracted["budget_level"] = "moderate"
-
-        if any(k in lower for k in ["family", "kids", "children"]):
-            extracted["traveling_with"] = "family"
-        elif any(k in lower for k in ["partner", "couple", "wife", "husband"]):
-            extracted["traveling_with"] = "couple"
-        elif any(k in lower for k in ["friends", "group"]):
-            extracted["traveling_with"] = "friends"
-        elif any(k in lower for k in ["solo", "alone", "myself"]):
-            extracted["traveling_with"] = "solo"
-
-        interest_map = {
-            "beach": "beach",
-            "mountain": "mountain",
-            "hiking": "adventure",
-            "adventure": "adventure",
-            "food": "food",
-            "culture": "culture",
-            "history": "history",
-            "nightlife": "nightlife",
-            "relax": "relaxation",
-            "museum": "art",
-            "art": "art",
-            "shopping": "shopping",
+        lower = text.lower() if lower is None else lower.strip()
+        extracted = _heuristic_preferences(text, lower, utcnow_naive().year)
+        # The cached dict is shared; hand out fresh containers so merges into
+        # session state can never alter it
+        return {
+            key: value.copy() if isinstance(value, (list, dict)) else value
+            for key, value in extracted.items()
         }
-        interests = sorted({v for k, v in interest_map.items() if k in lower})
-        if interests:
-            extracted["interests"] = interests
-
-        if any(k in lower for k in ["compare", "vs", "versus"]):
-            extracted["intent"] = "comparison"
-        elif any(k in lower for k in ["itinerary", "day-by-day", "schedule"]):
-            extracted["intent"] = "itinerary"
-        elif any(k in lower for k in ["weather", "flight", "visa", "hotel"]):
-            extracted["intent"] = "information"
-        else:
-            extracted["intent"] = "recommendation"
-
-        return extracted
 
     def _merge_extracted_preferences(self, session: ChatSession, extracted: Dict[str, Any]) -> None:
         """Normalize and merge extracted fields into session state."""
@@ -989,35 +1241,7 @@ Rules:
         
         try:
             # Use AI to extract structured information
-            extraction_prompt = f"""Analyze this travel-related message and extract structured information.
-
-Message: "{user_message}"
-
-Extract the following (use null if not mentioned):
-- origin: departure city/country
-- destinations: mentioned destinations (array)
-- travel_dates: {{start: "YYYY-MM", end: "YYYY-MM"}}
-- duration: number of days
-- budget_level: "budget" | "moderate" | "luxury" | "ultra-luxury"
-- interests: activities they enjoy (array)
-- traveling_with: "solo" | "couple" | "family" | "friends"
-- kids_ages: ages if family with children (array)
-- accommodation_type: "hotel" | "hostel" | "airbnb" | "resort"
-- activity_pace: "relaxed" | "moderate" | "active"
-- special_occasion: honeymoon, anniversary, birthday, etc.
-- dietary_restrictions: (array)
-- accessibility_needs: (array)
-- visa_preference: "visa_free" | "easy_visa" | "any"
-- weather_preference: "warm" | "cold" | "mild" | "tropical"
-- nightlife_priority: "low" | "medium" | "high"
-- car_hire: boolean
-- flight_class: "economy" | "premium" | "business" | "first"
-
-Also detect:
-- intent: main purpose (recommendation, booking, comparison, information, itinerary)
-- confidence: 0-1 how confident in extraction
-
-Return as JSON only."""
+            extraction_prompt = f'{_EXTRACTION_PROMPT_HEAD}"{user_message}"{_EXTRACTION_PROMPT_TAIL}'
 
             client = getattr(self.ai_provider, 'client', None)
             if client:
@@ -1058,7 +1282,7 @@ Return as JSON only."""
                 grounding = (
                     await self._collect_grounded_facts(session, user_message)
                     if self._should_run_grounding(session, user_message)
-                    else {"facts": {}, "citations": []}
+                    else _NO_GROUNDING
                 )
             messages = [
                 {"role": "system", "content": self._get_system_prompt(session)}
@@ -1072,12 +1296,7 @@ Return as JSON only."""
                     )
                 })
             
-            recent_messages = session.messages[-10:]
-            for msg in recent_messages:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
+            messages.extend(_recent_history(session.messages))
             
             client = getattr(self.ai_provider, 'client', None)
             stream = await client.chat.completions.create(
@@ -1098,15 +1317,9 @@ Return as JSON only."""
 
     def _dedupe_fallback_response(self, session: ChatSession, response: str) -> str:
         """If fallback repeats, append a concrete input example to break loops."""
-        previous_assistant = next(
-            (m.content for m in reversed(session.messages[:-1]) if m.role == "assistant"),
-            "",
-        )
+        previous_assistant = _previous_assistant_reply(session.messages)
         if previous_assistant.strip() == response.strip():
-            return (
-                response
-                + " Example: \"From New York to Rome in June, couple, moderate budget.\""
-            )
+            return response + _FOLLOW_UP_EXAMPLE
         return response
     
     def _fallback_response(self, session: ChatSession) -> str:
@@ -1116,91 +1329,16 @@ Return as JSON only."""
         prefs = session.extracted_preferences or {}
 
         destination = self._infer_destination(session, last_message)
-        origin = prefs.get("origin")
-        travel_dates = prefs.get("travel_dates")
-        has_dates = isinstance(travel_dates, dict) and bool(travel_dates.get("start") or travel_dates.get("end"))
-        has_budget = bool(prefs.get("budget_level") or prefs.get("budget_daily") or prefs.get("budget_total"))
-        has_travel_group = bool(prefs.get("traveling_with") or prefs.get("num_travelers"))
-
-        if "weather" in last_lower:
-            if destination:
-                return self._dedupe_fallback_response(
-                    session,
-                    f"I can help with weather for {destination}. What dates are you planning to travel?",
-                )
-            return self._dedupe_fallback_response(
-                session,
-                "I can help with weather. Which destination should I check?",
-            )
-
-        if "flight" in last_lower or "fly" in last_lower:
-            if origin and destination:
-                return self._dedupe_fallback_response(
-                    session,
-                    f"I can estimate flights from {origin} to {destination}. What are your travel dates?",
-                )
-            if destination:
-                return self._dedupe_fallback_response(
-                    session,
-                    f"I can check flights to {destination}. What city are you departing from?",
-                )
-            return self._dedupe_fallback_response(
-                session,
-                "I can help with flights. Tell me your departure city and destination.",
-            )
-
-        if "hotel" in last_lower or "accommodation" in last_lower:
-            if destination and has_budget:
-                return self._dedupe_fallback_response(
-                    session,
-                    f"Got it. For {destination}, what dates should I use to suggest hotels in your budget?",
-                )
-            if destination:
-                return self._dedupe_fallback_response(
-                    session,
-                    f"I can suggest hotels in {destination}. What budget level do you prefer: low, moderate, high, or luxury?",
-                )
-            return self._dedupe_fallback_response(
-                session,
-                "I can suggest hotels. Which destination are you interested in?",
-            )
 
-        if "visa" in last_lower:
-            if destination:
+        for pattern, reply in _FALLBACK_TOPICS:
+            if pattern.search(last_lower):
                 return self._dedupe_fallback_response(
-                    session,
-                    f"I can guide you on visa checks for {destination}. What passport country are you traveling with?",
+                    session, reply(destination, prefs.get("origin"), _has_budget(prefs))
                 )
-            return self._dedupe_fallback_response(
-                session,
-                "I can help with visa guidance. Tell me your destination and passport country.",
-            )
 
-        missing_parts: List[str] = []
-        if not origin:
-            missing_parts.append("starting city")
-        if not destination:
-            missing_parts.append("destination")
-        if not has_dates:
-            missing_parts.append("travel dates")
-        if not has_budget:
-            missing_parts.append("budget")
-        if not has_travel_group:
-            missing_parts.append("who's traveling")
-
-        if missing_parts:
-            question_map = {
-                "starting city": "What city are you flying from?",
-                "destination": "Which destination are you considering?",
-                "travel dates": "What dates are you planning to travel?",
-                "budget": "What's your budget level (low, moderate, high, or luxury)?",
-                "who's traveling": "Who is traveling (solo, couple, family, or friends)?",
-            }
-            next_question = question_map.get(missing_parts[0], "Can you share one more detail?")
-            return self._dedupe_fallback_response(
-                session,
-                f"I can build your plan right away. {next_question}"
-            )
+        for known, follow_up in _FALLBACK_FOLLOW_UP_CHECKS:
+            if not known(prefs, destination):
+                return self._dedupe_fallback_response(session, follow_up)
 
         return self._dedupe_fallback_response(
             session,
@@ -1222,7 +1360,7 @@ Return as JSON only."""
         if isinstance(destinations, list) and destinations:
             return str(destinations[0]).strip()
 
-        match = re.search(r"(?:to|in|visit)\s+([A-Za-z\s]{2,40})", message, re.IGNORECASE)
+        match = _DESTINATION_PHRASE_RE.search(message)
         if match:
             # Trim at the first stop-word so "Europe with my family" -> "Europe"
             words = match.group(1).strip().split()
@@ -1235,7 +1373,7 @@ Return as JSON only."""
                 return " ".join(dest_words[:3]).strip()  # max 3-word destination name
         return None
 
-    def _should_run_grounding(self, session: ChatSession, message: str) -> bool:
+    def _should_run_grounding(self, session: ChatSession, message: str, lower: Optional[str] = None) -> bool:
         """
         Only fetch external tool data (weather/visa/events/flights) when it would
         actually improve the response. Skips grounding during early discovery or
@@ -1248,28 +1386,18 @@ Return as JSON only."""
         if session.planning_stage != "discover":
             return True
         # In discovery, only ground when user explicitly asks for real-time data
-        grounding_triggers = {
-            "weather", "flight", "fly", "hotel", "accommodation",
-            "event", "festival", "visa", "cost", "price", "when",
-            "best time", "cheap", "budget", "how much",
-        }
-        msg_lower = message.lower()
-        return any(kw in msg_lower for kw in grounding_triggers)
-
-    def _infer_planning_stage(self, session: ChatSession, message: str) -> str:
-        lower = message.lower()
+        return _GROUNDING_TRIGGER_RE.search(message.lower() if lower is None else lower) is not None
+
+    def _infer_planning_stage(self, session: ChatSession, message: str, lower: Optional[str] = None) -> str:
+        if lower is None:
+            lower = message.lower()
+        stage = first_label(lower, _STAGE_KEYWORDS, _STAGE_SCAN)
+        if stage:
+            return stage
+        # Preference checks only run when no keyword decided the stage, and
+        # stop at the first missing field
         prefs = session.extracted_preferences
-        has_destination = bool(prefs.get("destinations"))
-        has_dates = bool(prefs.get("travel_dates"))
-        has_budget = bool(prefs.get("budget_level") or prefs.get("budget_daily") or prefs.get("budget_total"))
-
-        if any(k in lower for k in ["book", "reserve", "checklist", "packing"]):
-            return "booking_checklist"
-        if any(k in lower for k in ["itinerary", "day plan", "schedule"]):
-            return "itinerary"
-        if any(k in lower for k in ["compare", "vs", "versus"]):
-            return "compare"
-        if has_destination and has_dates and has_budget:
+        if prefs.get("destinations") and prefs.get("travel_dates") and _has_budget(prefs):
             return "shortlist"
         return "discover"
 
@@ -1291,19 +1419,7 @@ Return as JSON only."""
 
         try:
             started = perf_counter()
-            system = (
-                self._get_system_prompt(session)
-                + """
-
-OUTPUT FORMAT (required):
-Reply with a single JSON object - no markdown fences, no extra text:
-{"extracted":{"origin":null,"destinations":null,"travel_dates":null,"duration":null,"budget_level":null,"interests":null,"traveling_with":null,"intent":null},"response":"Your reply here"}
-
-Rules:
-- In "extracted": only fill fields you can confidently identify from the user's message; leave others null.
-- In "response": write a natural, friendly travel assistant reply, max 150 words.
-- Output ONLY the JSON object - nothing before or after it."""
-            )
+            system = self._get_system_prompt(session) + _JSON_OUTPUT_FORMAT
 
             messages: List[Dict[str, Any]] = [{"role": "system", "content": system}]
 
@@ -1316,17 +1432,28 @@ Rules:
                     ),
                 })
 
-            for msg in session.messages[-10:]:
-                messages.append({"role": msg.role, "content": msg.content})
+            messages.extend(_recent_history(session.messages))
 
             model_name = getattr(self.ai_provider, 'model', 'gpt-3.5-turbo')
-            resp = await client.chat.completions.create(
-                model=model_name,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=700,
-                # Note: no response_format here - we parse JSON ourselves so this
-                # works even with providers that don't support the parameter.
+            # JSON mode makes the server guarantee a parseable object. It is only
+            # requested from providers known to accept it; _parse_json_object
+            # still tolerates fenced or chatty replies from everyone else.
+            json_mode: Dict[str, Any] = (
+                {"response_format": {"type": "json_object"}}
+                if getattr(self.ai_provider, 'supports_json_mode', False)
+                else {}
+            )
+            # wait_for cancels and reaps the request on timeout, so a slow
+            # provider costs at most the ceiling before the fallback reply
+            resp = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=model_name,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=700,
+                    **json_mode,
+                ),
+                timeout=self.settings.chat_llm_timeout_seconds,
             )
             usage = getattr(resp, "usage", None)
             self._log_llm_usage(
@@ -1383,6 +1510,12 @@ Rules:
 
             return ai_response or self._fallback_response(session), extracted
 
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Combined API call timed out; using fallback reply",
+                timeout_s=self.settings.chat_llm_timeout_seconds,
+            )
+            return self._fallback_response(session), {}
         except Exception as e:
             logger.error("Combined API call failed", error=str(e))
             return self._fallback_response(session), {}
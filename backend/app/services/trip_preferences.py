@@ -0,0 +1,641 @@
+"""
+Destination lookups and deterministic preference extraction for the
+autonomous agent. Everything here is module-level data and pure functions
+over a message and the preferences gathered so far, kept apart from the
+agent class so it can be imported and tested on its own.
+"""
+
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import POPULAR_DESTINATIONS
+from app.utils.keyword_scan import compile_keyword_table, first_label, labels_in, phrase_matcher
+
+# ── Destination helpers ──────────────────────────────────────────────────────
+
+_DEST_MAP: Dict[str, Dict] = {}
+_DESTINATION_CITY_BY_NAME: Dict[str, str] = {}
+_DESTINATION_COUNTRY_CODE_BY_NAME: Dict[str, str] = {}
+_DESTINATION_AIRPORT_CODES_BY_NAME: Dict[str, List[str]] = {}
+_DESTINATION_TAGS_BY_NAME: Dict[str, List[str]] = {}
+for _d in POPULAR_DESTINATIONS:
+    lookup_keys = [_d.get("name"), _d.get("city"), _d.get("id"), *(_d.get("aliases") or [])]
+    for _key in lookup_keys:
+        normalized_key = str(_key or "").strip().lower()
+        if normalized_key:
+            _DEST_MAP[normalized_key] = _d
+            _DESTINATION_TAGS_BY_NAME[normalized_key] = [
+                str(tag).strip().lower()
+                for tag in (_d.get("focus_tags") or [])
+                if str(tag).strip()
+            ]
+    city_name = str(_d.get("city") or _d.get("name") or "").strip()
+    country_code = str(_d.get("country_code") or "").strip().upper()
+    airport_codes = [str(code).strip().upper() for code in (_d.get("airport_codes") or []) if str(code).strip()]
+    for _key in lookup_keys:
+        if _key and city_name:
+            _DESTINATION_CITY_BY_NAME[str(_key).strip().lower()] = city_name
+        if _key and airport_codes:
+            _DESTINATION_AIRPORT_CODES_BY_NAME[str(_key).strip().lower()] = airport_codes
+    for _key in (*lookup_keys, _d.get("country")):
+        if _key and country_code:
+            _DESTINATION_COUNTRY_CODE_BY_NAME[str(_key).strip().lower()] = country_code
+
+# Hand-crafted extras not in POPULAR_DESTINATIONS
+_EXTRA_COORDS: Dict[str, tuple] = {
+    "bali": (-8.4095, 115.1889),
+    "phuket": (7.8804, 98.3923),
+    "kyoto": (35.0116, 135.7681),
+    "maldives": (3.2028, 73.2207),
+    "queenstown": (-45.0312, 168.6626),
+    "costa rica": (9.7489, -83.7534),
+    "iceland": (64.9631, -19.0208),
+    "santorini": (36.3932, 25.4615),
+    "machu picchu": (-13.1631, -72.5450),
+    "amalfi": (40.6340, 14.6027),
+    "london": (51.5074, -0.1278),
+    "amsterdam": (52.3676, 4.9041),
+    "berlin": (52.5200, 13.4050),
+    "rome": (41.9028, 12.4964),
+    "milan": (45.4642, 9.1900),
+    "vienna": (48.2082, 16.3738),
+    "prague": (50.0755, 14.4378),
+    "lisbon": (38.7169, -9.1399),
+    "madrid": (40.4168, -3.7038),
+    "barcelona": (41.3851, 2.1734),
+    "athens": (37.9838, 23.7275),
+    "istanbul": (41.0082, 28.9784),
+    "dubai": (25.2048, 55.2708),
+    "singapore": (1.3521, 103.8198),
+    "hong kong": (22.3193, 114.1694),
+    "seoul": (37.5665, 126.9780),
+    "osaka": (34.6937, 135.5023),
+    "shanghai": (31.2304, 121.4737),
+    "mumbai": (19.0760, 72.8777),
+    "delhi": (28.6139, 77.2090),
+    "cairo": (30.0444, 31.2357),
+    "cape town": (-33.9249, 18.4241),
+    "nairobi": (-1.2921, 36.8219),
+    "sydney": (-33.8688, 151.2093),
+    "melbourne": (-37.8136, 144.9631),
+    "toronto": (43.6532, -79.3832),
+    "vancouver": (49.2827, -123.1207),
+    "mexico city": (19.4326, -99.1332),
+    "cancun": (21.1619, -86.8515),
+    "rio de janeiro": (-22.9068, -43.1729),
+    "buenos aires": (-34.6037, -58.3816),
+    "lima": (-12.0464, -77.0428),
+    "miami": (25.7617, -80.1918),
+    "las vegas": (36.1699, -115.1398),
+    "los angeles": (34.0522, -118.2437),
+    "san francisco": (37.7749, -122.4194),
+    "chicago": (41.8781, -87.6298),
+    "washington dc": (38.9072, -77.0369),
+    "boston": (42.3601, -71.0589),
+    # Greek islands & Mediterranean
+    "corfu": (39.6243, 19.9217),
+    "mykonos": (37.4467, 25.3289),
+    "rhodes": (36.4341, 28.2176),
+    "crete": (35.2401, 24.8093),
+    "zakynthos": (37.7883, 20.8989),
+    "paros": (37.0856, 25.1489),
+    "naxos": (37.1036, 25.3764),
+    "lefkada": (38.7167, 20.6500),
+    "kefalonia": (38.1753, 20.5690),
+    "skiathos": (39.1622, 23.4872),
+    "milos": (36.6897, 24.4400),
+    "hydra": (37.3480, 23.4739),
+    "ibiza": (38.9067, 1.4206),
+    "mallorca": (39.6953, 3.0176),
+    "menorca": (39.9496, 4.1156),
+    "tenerife": (28.2916, -16.6291),
+    "gran canaria": (27.9202, -15.5474),
+    "lanzarote": (29.0469, -13.5899),
+    "sicily": (37.5999, 14.0154),
+    "sardinia": (40.1209, 9.0129),
+    "capri": (40.5500, 14.2167),
+    "positano": (40.6280, 14.4843),
+    "dubrovnik": (42.6507, 18.0944),
+    "split": (43.5081, 16.4402),
+    "kotor": (42.4246, 18.7712),
+    "valletta": (35.8997, 14.5147),
+    "monaco": (43.7384, 7.4246),
+    "nice": (43.7102, 7.2620),
+    "florence": (43.7696, 11.2558),
+    "venice": (45.4408, 12.3155),
+    "naples": (40.8518, 14.2681),
+    "porto": (41.1579, -8.6291),
+    "seville": (37.3891, -5.9845),
+    "granada": (37.1773, -3.5986),
+    "bruges": (51.2093, 3.2247),
+    "ghent": (51.0543, 3.7174),
+    "salzburg": (47.8095, 13.0550),
+    "innsbruck": (47.2692, 11.4041),
+    "zurich": (47.3769, 8.5417),
+    "geneva": (46.2044, 6.1432),
+    "krakow": (50.0647, 19.9450),
+    "warsaw": (52.2297, 21.0122),
+    "budapest": (47.4979, 19.0402),
+    "bucharest": (44.4268, 26.1025),
+    "sofia": (42.6977, 23.3219),
+    "riga": (56.9496, 24.1052),
+    "tallinn": (59.4370, 24.7536),
+    "vilnius": (54.6872, 25.2797),
+    "reykjavik": (64.1466, -21.9426),
+    "oslo": (59.9139, 10.7522),
+    "stockholm": (59.3293, 18.0686),
+    "copenhagen": (55.6761, 12.5683),
+    "helsinki": (60.1699, 24.9384),
+    "edinburgh": (55.9533, -3.1883),
+    "dublin": (53.3498, -6.2603),
+}
+
+_EXTRA_COUNTRY_CODES: Dict[str, str] = {
+    "amalfi": "IT",
+    "amsterdam": "NL",
+    "athens": "GR",
+    "berlin": "DE",
+    "boston": "US",
+    "bruges": "BE",
+    "budapest": "HU",
+    "bucharest": "RO",
+    "buenos aires": "AR",
+    "cancun": "MX",
+    "capri": "IT",
+    "chicago": "US",
+    "copenhagen": "DK",
+    "corfu": "GR",
+    "costa rica": "CR",
+    "crete": "GR",
+    "delhi": "IN",
+    "dublin": "IE",
+    "edinburgh": "GB",
+    "florence": "IT",
+    "geneva": "CH",
+    "ghent": "BE",
+    "gran canaria": "ES",
+    "granada": "ES",
+    "helsinki": "FI",
+    "hong kong": "HK",
+    "hydra": "GR",
+    "ibiza": "ES",
+    "iceland": "IS",
+    "innsbruck": "AT",
+    "kefalonia": "GR",
+    "koh samui": "TH",
+    "kotor": "ME",
+    "krakow": "PL",
+    "lanzarote": "ES",
+    "las vegas": "US",
+    "lefkada": "GR",
+    "lima": "PE",
+    "lisbon": "PT",
+    "los angeles": "US",
+    "machu picchu": "PE",
+    "madrid": "ES",
+    "mallorca": "ES",
+    "maldives": "MV",
+    "melbourne": "AU",
+    "menorca": "ES",
+    "mexico city": "MX",
+    "milan": "IT",
+    "milos": "GR",
+    "monaco": "MC",
+    "mumbai": "IN",
+    "mykonos": "GR",
+    "nairobi": "KE",
+    "naples": "IT",
+    "naxos": "GR",
+    "nice": "FR",
+    "osaka": "JP",
+    "oslo": "NO",
+    "paros": "GR",
+    "phuket": "TH",
+    "porto": "PT",
+    "positano": "IT",
+    "prague": "CZ",
+    "queenstown": "NZ",
+    "reykjavik": "IS",
+    "rhodes": "GR",
+    "riga": "LV",
+    "rio de janeiro": "BR",
+    "salzburg": "AT",
+    "san francisco": "US",
+    "santorini": "GR",
+    "sardinia": "IT",
+    "seoul": "KR",
+    "seville": "ES",
+    "shanghai": "CN",
+    "sicily": "IT",
+    "singapore": "SG",
+    "skiathos": "GR",
+    "sofia": "BG",
+    "split": "HR",
+    "stockholm": "SE",
+    "sydney": "AU",
+    "tallinn": "EE",
+    "tenerife": "ES",
+    "toronto": "CA",
+    "valletta": "MT",
+    "vancouver": "CA",
+    "venice": "IT",
+    "vienna": "AT",
+    "vilnius": "LT",
+    "warsaw": "PL",
+    "washington dc": "US",
+    "zakynthos": "GR",
+    "zurich": "CH",
+}
+for _key, _code in _EXTRA_COUNTRY_CODES.items():
+    _DESTINATION_COUNTRY_CODE_BY_NAME.setdefault(_key, _code)
+
+# Alias map: shorthand → canonical name used in _extract_preferences
+_DEST_ALIASES: Dict[str, str] = {
+    "nyc": "New York",
+    "new york city": "New York",
+    "ny": "New York",
+    "la": "Los Angeles",
+    "sf": "San Francisco",
+    "dc": "Washington DC",
+    "uk": "London",
+    "england": "London",
+    "france": "Paris",
+    "japan": "Tokyo",
+    "thailand": "Bangkok",
+    "indonesia": "Bali",
+    "greece": "Athens",
+    "egypt": "Cairo",
+    "australia": "Sydney",
+    "nz": "Queenstown",
+    "new zealand": "Queenstown",
+    "uae": "Dubai",
+    "south africa": "Cape Town",
+    "brazil": "Rio de Janeiro",
+    "argentina": "Buenos Aires",
+    "peru": "Lima",
+    "india": "Mumbai",
+}
+
+# Whole-word scans over a message for alias, extra-coords and destination keys
+_ALIAS_RE = phrase_matcher(_DEST_ALIASES)
+# Extra-coords names long enough to match in free text (shorter ones misfire)
+_EXTRA_PLACE_RE = phrase_matcher(key for key in _EXTRA_COORDS if len(key) >= 4)
+# Destination-map keys, for the whole-word new-trip check
+_DEST_KEY_RE = phrase_matcher(key for key in _DEST_MAP if len(key) >= 4)
+# (" key", city name) for the word-start destination scan in
+# _extract_preferences, padded once here instead of per message and key
+_DEST_WORD_STARTS: Tuple[Tuple[str, str], ...] = tuple(
+    (f" {key}", rec["name"]) for key, rec in _DEST_MAP.items() if len(key) >= 4
+)
+
+
+def _get_coords(destination: str) -> Optional[tuple]:
+    key = destination.strip().lower()
+    rec = _DEST_MAP.get(key)
+    if rec:
+        return rec["coordinates"]["lat"], rec["coordinates"]["lng"]
+    return _EXTRA_COORDS.get(key)
+
+
+def _get_destination_city(destination: str) -> str:
+    key = str(destination or "").strip().lower()
+    if not key:
+        return ""
+    return _DESTINATION_CITY_BY_NAME.get(key) or str(destination).strip()
+
+
+def _get_country_code(destination: str) -> Optional[str]:
+    key = str(destination or "").strip().lower()
+    if not key:
+        return None
+    if len(key) == 2 and key.isalpha():
+        return key.upper()
+    return _DESTINATION_COUNTRY_CODE_BY_NAME.get(key) or _EXTRA_COUNTRY_CODES.get(key)
+
+
+# ── Preference extraction ────────────────────────────────────────────────────
+
+_MONTH_MAP = {
+    "january": "01", "february": "02", "march": "03", "april": "04",
+    "may": "05", "june": "06", "july": "07", "august": "08",
+    "september": "09", "october": "10", "november": "11", "december": "12",
+    "jan": "01", "feb": "02", "mar": "03", "apr": "04",
+    "jun": "06", "jul": "07", "aug": "08", "sep": "09",
+    "oct": "10", "nov": "11", "dec": "12",
+}
+# Any month name in one scan (earliest mention wins), plus the date shapes
+# that accompany it
+_MONTH_NAME_RE = re.compile(r"\b(" + "|".join(_MONTH_MAP) + r")\b")
+_YEAR_RE = re.compile(r"20\d\d")
+_ISO_DATE_RE = re.compile(r"\b(\d{4}-\d{2}(?:-\d{2})?)\b")
+
+_INTEREST_KW: Dict[str, List[str]] = {
+    "culture": ["culture", "museum", "history", "historic", "heritage", "art", "architecture"],
+    "food": ["food", "cuisine", "restaurant", "eating", "gastronomy", "culinary"],
+    "adventure": ["adventure", "hiking", "trekking", "outdoor", "extreme", "climbing"],
+    "beach": ["beach", "ocean", "sea", "coast", "surf", "swimming", "snorkeling"],
+    "shopping": ["shopping", "mall", "market", "bazaar", "boutique"],
+    "nightlife": ["nightlife", "club", "bar", "party", "pub"],
+    "nature": ["nature", "wildlife", "safari", "park", "forest", "garden", "national park"],
+    "photography": ["photography", "photo", "scenic", "instagrammable"],
+    "relaxation": ["relax", "spa", "wellness", "peaceful", "tranquil", "retreat"],
+    "family": ["family", "kids", "children", "theme park", "amusement"],
+}
+
+# Region keywords — broad geographic areas that should NOT be kept as destinations
+# but signal the user wants to travel to a new region (clearing previous destination).
+_REGION_KEYWORDS: Dict[str, List[str]] = {
+    "Europe": ["europe", "european"],
+    "Asia": ["asia", "asian", "southeast asia", "east asia", "south asia"],
+    "South America": ["south america", "latin america"],
+    "North America": ["north america"],
+    "Middle East": ["middle east"],
+    "Africa": ["africa", "african"],
+    "Oceania": ["oceania", "pacific islands"],
+    "Caribbean": ["caribbean"],
+    "Scandinavia": ["scandinavia", "scandinavian", "nordic"],
+    "Balkans": ["balkans", "balkan"],
+}
+
+# Words that strongly indicate the user wants to start a completely new trip
+_NEW_TRIP_SIGNALS = [
+    "new trip", "new destination", "different destination", "different place",
+    "somewhere else", "instead", "forget bali", "cancel that", "start over",
+    "start fresh", "change destination", "never mind",
+]
+_NEW_TRIP_RE = re.compile("|".join(map(re.escape, _NEW_TRIP_SIGNALS)))
+
+# Interest / region keyword tables, each scanned in one pass
+_INTEREST_SCAN = compile_keyword_table(_INTEREST_KW)
+_REGION_SCAN = compile_keyword_table(_REGION_KEYWORDS)
+
+
+# Budget level -> keywords, in priority order, matched as substrings in one
+# scan. A bare "budget" only counts as a whole word.
+_BUDGET_LEVEL_KEYWORDS: Dict[str, List[str]] = {
+    "luxury": ["luxury", "five star", "5-star", "high end", "premium"],
+    "moderate": ["moderate", "mid-range", "midrange", "medium"],
+    "budget": ["cheap", "affordable", "backpacker", "hostel"],
+}
+_BUDGET_LEVEL_SCAN = compile_keyword_table(_BUDGET_LEVEL_KEYWORDS)
+_BUDGET_WORD_RE = re.compile(r"\bbudget\b")
+
+# The remaining extraction patterns, compiled once at import rather than
+# looked up in re's cache on every message
+_TRAVEL_PHRASE_RE = re.compile(
+    r"(?:visit|go to|going to|travel to|travelling to|traveling to|trip to|heading to|in|to)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)"
+)
+_LEADING_PLACE_RE = re.compile(r"^([A-Za-z][a-z]+(?:\s+[A-Za-z][a-z]+)?)\s*,\s*(?:\w+\s+)?\d{4}")
+_ORIGIN_RE = re.compile(r"(?:from|leaving|departing)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)")
+_FROM_PLACE_RE = re.compile(r"from\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)")
+_DURATION_RE = re.compile(r"(\d+)\s*(day|week|night)")
+_DOLLAR_AMOUNT_RE = re.compile(r"\$\s*([\d,]+)")
+_SOLO_RE = re.compile(r"\b(solo|alone|by myself|myself)\b")
+_COUPLE_RE = re.compile(r"\b(couple|partner|spouse|wife|husband|girlfriend|boyfriend)\b")
+_FAMILY_RE = re.compile(r"\b(family|families|kids|children)\b")
+_FRIENDS_RE = re.compile(r"\b(friends|group|squad)\b")
+_PASSPORT_RE = re.compile(r"(us|uk|australian|canadian|indian|british|american)\s*(passport|citizen)")
+_PASSPORT_CODES = {
+    "us": "US", "american": "US", "uk": "UK", "british": "UK",
+    "australian": "AU", "canadian": "CA", "indian": "IN",
+}
+
+def _extract_preferences(text: str, existing: Dict[str, Any]) -> Dict[str, Any]:
+    prefs = dict(existing)
+    lower = text.lower()
+
+    # ── New-trip intent: clear destinations so the agent asks fresh ──────────
+    if _NEW_TRIP_RE.search(lower):
+        prefs.pop("destinations", None)
+        prefs.pop("region_intent", None)
+
+    # ── Region detection ─────────────────────────────────────────────────────
+    # If the user mentions a broad region (e.g. "europe") without a specific
+    # city, clear the old destinations and store the region as context so the
+    # agent can ask for a specific city within that region.
+    regions = labels_in(lower, _REGION_SCAN)
+    detected_region = next((label for label in _REGION_KEYWORDS if label in regions), None)
+
+    # Destinations — check aliases first, then the main map. `found` keeps
+    # match order; `seen` makes the duplicate check O(1).
+    found: List[str] = []
+    seen: Set[str] = set()
+    # 1. Check alias map (e.g. "NYC" → "New York")
+    aliases = {m.group(1) for m in _ALIAS_RE.finditer(lower)}
+    for alias, canonical in _DEST_ALIASES.items():
+        if alias in aliases and canonical not in seen:
+            seen.add(canonical)
+            found.append(canonical)
+    # 2. Match against known destination map (minimum 4 chars to avoid false positives)
+    padded = f" {lower}"
+    for padded_key, city in _DEST_WORD_STARTS:
+        if padded_key in padded:
+            if city not in seen:
+                seen.add(city)
+                found.append(city)
+    # 3. Match against extra coords (e.g. "London", "Rome")
+    places = {m.group(1) for m in _EXTRA_PLACE_RE.finditer(lower)}
+    for key in _EXTRA_COORDS:
+        if key in places:
+            canonical = key.title()
+            if canonical not in seen:
+                seen.add(canonical)
+                found.append(canonical)
+    # 4. Fallback: extract destination from explicit travel phrases
+    #    e.g. "visit Corfu", "go to Santorini", "trip to X", or "Corfu, August 2026"
+    if not found:
+        travel_phrase = _TRAVEL_PHRASE_RE.search(text)
+        if travel_phrase:
+            found.append(travel_phrase.group(1))
+        else:
+            # Last resort: first capitalised word(s) followed by a comma + date/number
+            leading = _LEADING_PLACE_RE.match(text)
+            if leading:
+                found.append(leading.group(1).title())
+    # Extract origin BEFORE finalising destinations so we can exclude it
+    origin_m = _ORIGIN_RE.search(text)
+    origin_city = origin_m.group(1) if origin_m else None
+    if origin_city:
+        prefs["origin"] = origin_city
+        # Remove origin from destinations list
+        found = [d for d in found if d.lower() != origin_city.lower()]
+
+    if found:
+        prefs["destinations"] = found[:3]
+        prefs.pop("region_intent", None)  # specific city found — clear region
+    elif detected_region:
+        # Region mentioned but no specific city — clear stale destination and
+        # store region context so the agent can ask "which city in Europe?"
+        prefs.pop("destinations", None)
+        prefs["region_intent"] = detected_region
+
+    # Duration
+    m = _DURATION_RE.search(lower)
+    if m:
+        n, unit = int(m.group(1)), m.group(2)
+        prefs["duration"] = n * 7 if "week" in unit else n
+
+    # Budget keywords — check "moderate budget" before "budget" to avoid false match
+    budget_level = first_label(lower, _BUDGET_LEVEL_KEYWORDS, _BUDGET_LEVEL_SCAN)
+    if budget_level is None and _BUDGET_WORD_RE.search(lower):
+        budget_level = "budget"
+    if budget_level:
+        prefs["budget_level"] = budget_level
+
+    # Budget dollar amount
+    m2 = _DOLLAR_AMOUNT_RE.search(text)
+    if m2:
+        prefs["budget_amount"] = int(m2.group(1).replace(",", ""))
+
+    # Interests
+    interests: List[str] = list(prefs.get("interests") or [])
+    known_interests = set(interests)
+    mentioned = labels_in(lower, _INTEREST_SCAN)
+    for interest in _INTEREST_KW:
+        if interest in mentioned and interest not in known_interests:
+            known_interests.add(interest)
+            interests.append(interest)
+    if interests:
+        prefs["interests"] = interests
+
+    # Traveling with
+    if _SOLO_RE.search(lower):
+        prefs["traveling_with"] = "solo"
+    elif _COUPLE_RE.search(lower):
+        prefs["traveling_with"] = "couple"
+    elif _FAMILY_RE.search(lower):
+        prefs["traveling_with"] = "family"
+    elif _FRIENDS_RE.search(lower):
+        prefs["traveling_with"] = "friends"
+
+    # Month / dates
+    month_m = _MONTH_NAME_RE.search(lower)
+    if month_m:
+        month_num = _MONTH_MAP[month_m.group(1)]
+        yr_m = _YEAR_RE.search(text)
+        year = int(yr_m.group()) if yr_m else date.today().year
+        duration = int(prefs.get("duration") or 7)
+        end_day = min(28, 1 + duration)
+        prefs["travel_dates"] = {
+            "start": f"{year}-{month_num}-01",
+            "end": f"{year}-{month_num}-{end_day:02d}",
+        }
+
+    # Origin city (already extracted above, but handle if not yet set)
+    if not prefs.get("origin"):
+        origin_m2 = _FROM_PLACE_RE.search(text)
+        if origin_m2:
+            prefs["origin"] = origin_m2.group(1)
+
+    # Passport
+    p_m = _PASSPORT_RE.search(lower)
+    if p_m:
+        prefs["passport_country"] = _PASSPORT_CODES.get(p_m.group(1), "US")
+
+    return prefs
+
+
+def _has_min_requirements(prefs: Dict) -> bool:
+    """Only destination is required — dates and other details are optional.
+
+    The agent will proceed with seasonal/general research if dates are missing,
+    rather than blocking the user.
+    """
+    return bool(prefs.get("destinations"))
+
+
+# Confidence recorded for a preference the first time it is extracted
+_DEFAULT_PREFERENCE_CONFIDENCE: Dict[str, float] = {
+    "destinations": 0.95,
+    "travel_dates": 0.9,
+    "origin": 0.9,
+    "duration": 0.9,
+    "budget_level": 0.85,
+    "budget_amount": 0.85,
+    "interests": 0.9,
+    "traveling_with": 0.9,
+    "passport_country": 0.9,
+    "dietary_restrictions": 0.9,
+}
+
+# Soft (non-blocking) hints in the order they are surfaced. Each field is
+# missing when prefs holds no truthy value for it, so one table drives the
+# whole check instead of a branch per field.
+_SOFT_FIELD_QUESTIONS: Tuple[Tuple[str, str], ...] = (
+    ("travel_dates", "When are you planning to travel? (e.g. 'April 2026') — I can do seasonal research without this"),
+    ("origin", "Where will you be travelling from? (needed for flight search)"),
+    ("traveling_with", "Who's travelling? (solo, couple, family, friends)"),
+    ("duration", "How many days is the trip?"),
+    ("budget_level", "What's your budget level? (budget, moderate, luxury)"),
+    ("interests", "What do you enjoy? (beaches, culture, food, adventure, nightlife, nature)"),
+)
+
+
+def _get_missing_fields(prefs: Dict) -> List[Dict[str, str]]:
+    """Return list of truly blocking missing fields (destination only).
+
+    Everything else is surfaced as optional enrichment questions, not blockers.
+    """
+    if not prefs.get("destinations"):
+        return [{"field": "destinations", "question": "Where would you like to go?"}]
+    # Soft hints — surfaced only when destination is already known
+    return [
+        {"field": field, "question": question}
+        for field, question in _SOFT_FIELD_QUESTIONS
+        if not prefs.get(field)
+    ]
+
+
+def _merge_unique_list(*values: Any) -> List[str]:
+    merged: List[str] = []
+    seen: set = set()
+    for value in values:
+        items = value if isinstance(value, list) else [value]
+        for item in items:
+            text = str(item or "").strip()
+            if not text:
+                continue
+            key = text.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(text)
+    return merged
+
+
+def _normalize_travel_dates(value: Any, duration: Optional[int] = None) -> Optional[Dict[str, str]]:
+    if isinstance(value, dict):
+        start = str(value.get("start") or "").strip()
+        end = str(value.get("end") or "").strip()
+        if start or end:
+            return {"start": start or end, "end": end or start}
+        return None
+
+    text = str(value or "").strip()
+    if not text:
+        return None
+
+    iso_dates = _ISO_DATE_RE.findall(text)
+    if iso_dates:
+        start = iso_dates[0]
+        end = iso_dates[1] if len(iso_dates) > 1 else iso_dates[0]
+        if len(start) == 7:
+            start = f"{start}-01"
+        if len(end) == 7:
+            day = min(28, 1 + int(duration or 7))
+            end = f"{end}-{day:02d}"
+        return {"start": start, "end": end}
+
+    month_match = _MONTH_NAME_RE.search(text.lower())
+    if month_match:
+        month_num = _MONTH_MAP[month_match.group(1)]
+        year_match = _YEAR_RE.search(text)
+        year = int(year_match.group()) if year_match else date.today().year
+        trip_length = int(duration or 7)
+        end_day = min(28, 1 + trip_length)
+        return {
+            "start": f"{year}-{month_num}-01",
+            "end": f"{year}-{month_num}-{end_day:02d}",
+        }
+    return None
@@ -0,0 +1,78 @@
+"""
+HTTP caching helpers for read-only endpoints.
+Serializes a payload once with orjson, tags it with an ETag and answers
+conditional requests (If-None-Match) with 304 Not Modified.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Fallback for types orjson doesn't serialize natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def cache_control(max_age: int, stale_while_revalidate: int = 0) -> str:
+    """Build a public Cache-Control header value"""
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
+
+
+def _opaque_tag(etag: str) -> str:
+    """Strip the weak indicator; If-None-Match uses weak comparison"""
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Return True if the request's If-None-Match header covers etag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = _opaque_tag(etag)
+    return any(_opaque_tag(tag.strip()) == opaque for tag in if_none_match.split(","))
+
+
+def weak_etag(*parts: Any) -> str:
+    """Build a weak ETag from the inputs that determine a response"""
+    key = "\0".join(str(part) for part in parts).encode()
+    return f'W/"{hashlib.blake2b(key, digest_size=8).hexdigest()}"'
+
+
+def not_modified(request: Request, etag: str, cache_control_value: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds etag, else None"""
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control_value})
+    return None
+
+
+def cached_json_response(
+    request: Request,
+    payload: Any,
+    cache_control_value: str,
+    etag: Optional[str] = None,
+) -> Response:
+    """
+    Serialize payload and return it with ETag / Cache-Control headers,
+    or an empty 304 if the client already holds this exact representation.
+    Without an explicit etag, one is derived from the serialized body.
+    """
+    body = orjson.dumps(payload, default=_orjson_default)
+    if etag is None:
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control_value}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,45 @@
+"""
+Single-pass keyword scans over short free text (chat messages, feature names).
+A label -> keywords table is compiled once into one regex, so a message is
+scanned once instead of with one substring test per keyword.
+
+Each pattern is a zero-width lookahead over every keyword, longest first, so
+finditer tries it at every offset and reports at most one keyword per offset:
+the longest one starting there. A shorter keyword starting at the same offset
+is not reported ("art" when the text says "artisan" and both are keywords),
+although a substring test would find it. That only changes the result when
+the two keywords carry different labels, so keep tables free of such pairs.
+"""
+
+import re
+from typing import Dict, Iterable, Mapping, Optional, Set, Tuple
+
+# (pattern, keyword -> label)
+KeywordScan = Tuple["re.Pattern[str]", Dict[str, str]]
+
+
+def _alternation(keywords: Iterable[str]) -> str:
+    return "|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+
+
+def compile_keyword_table(table: Mapping[str, Iterable[str]]) -> KeywordScan:
+    """Compile a label -> keywords table into a substring scan"""
+    label_by_keyword = {kw: label for label, kws in table.items() for kw in kws}
+    return re.compile(f"(?=({_alternation(label_by_keyword)}))"), label_by_keyword
+
+
+def labels_in(text: str, scan: KeywordScan) -> Set[str]:
+    """Labels with a keyword occurring in text"""
+    pattern, label_by_keyword = scan
+    return {label_by_keyword[m.group(1)] for m in pattern.finditer(text)}
+
+
+def first_label(text: str, table: Mapping[str, Iterable[str]], scan: KeywordScan) -> Optional[str]:
+    """Highest-priority label (table order) with a keyword occurring in text"""
+    found = labels_in(text, scan)
+    return next((label for label in table if label in found), None) if found else None
+
+
+def phrase_matcher(phrases: Iterable[str]) -> "re.Pattern[str]":
+    """Whole-word scan for a fixed phrase set; group 1 is the phrase found"""
+    return re.compile(rf"(?=\b({_alternation(phrases)})\b)")
@@ -434,8 +434,11 @@ class MetaLearner:
         # ── A/B experiment analysis ──────────────────────────────────
         # Compare exploration sessions (random depth) vs exploitation
         # sessions (optimal depth) to validate or update strategy.
-        exploration_records = [r for r in records if r.get("is_exploration")]
-        exploitation_records = [r for r in records if not r.get("is_exploration")]
+        # Split in one pass over the (potentially long) performance history
+        exploration_records: List[Dict[str, Any]] = []
+        exploitation_records: List[Dict[str, Any]] = []
+        for r in records:
+            (exploration_records if r.get("is_exploration") else exploitation_records).append(r)
         experiment_analysis: Optional[Dict[str, Any]] = None
         if len(exploration_records) >= 3 and len(exploitation_records) >= 3:
             def _acceptance_rate(recs: list) -> float:
@@ -0,0 +1,70 @@
+"""
+Coalescing of identical async calls.
+Concurrent callers asking for the same key share one in-flight future, so
+e.g. two candidates in the same country trigger a single visa lookup.
+RequestCache lives for one request; AsyncTTLCache spans requests.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class RequestCache:
+    """Memoize awaitables by key for the lifetime of one request"""
+
+    def __init__(self):
+        self._f: Dict[Hashable, asyncio.Future] = {}
+
+    async def fetch(self, key: Hashable, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the shared result for key, starting coro_factory() only on first use"""
+        future = self._f.get(key)
+        if future is None:
+            future = asyncio.ensure_future(coro_factory())
+            self._f[key] = future
+        return await future
+
+
+class AsyncTTLCache:
+    """
+    Process-wide memo of awaitables with a TTL and LRU eviction.
+    Concurrent callers share one in-flight future; failed calls aren't kept.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, asyncio.Future]]" = OrderedDict()
+
+    async def fetch(self, key: Hashable, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the cached result for key, calling coro_factory() on a miss or after expiry"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            future = entry[1]
+        else:
+            future = asyncio.ensure_future(coro_factory())
+            self._entries[key] = (now + self.ttl, future)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        try:
+            # Shielded so one caller going away doesn't cancel the shared call
+            return await asyncio.shield(future)
+        except Exception:
+            if future.done():
+                self.evict(key, future)
+            raise
+
+    def evict(self, key: Hashable, future: Optional[asyncio.Future] = None) -> None:
+        """Drop key (only if it still holds future, when given)"""
+        entry = self._entries.get(key)
+        if entry is not None and (future is None or entry[1] is future):
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._entries.clear()
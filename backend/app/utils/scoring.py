@@ -1,8 +1,47 @@
 from typing import Dict, Optional, Tuple
 from datetime import date
+from functools import lru_cache
 from app.models.destination import Destination
 from app.models.user import UserPreferences, Interest
 
+# Weights for the overall score
+_WEIGHTS = (
+    ("weather", 0.20),
+    ("affordability", 0.25),
+    ("visa", 0.15),
+    ("attractions", 0.20),
+    ("events", 0.10),
+    ("interest_alignment", 0.10),
+)
+
+
+# Scoring helpers live on the service classes; build each one once per process
+# instead of per destination (AffordabilityService loads its cost index on init).
+# Imported lazily because the services import this package.
+@lru_cache()
+def _weather_scorer():
+    from app.services.weather_service import WeatherService
+    return WeatherService()
+
+
+@lru_cache()
+def _affordability_scorer():
+    from app.services.affordability_service import AffordabilityService
+    return AffordabilityService()
+
+
+@lru_cache()
+def _visa_scorer():
+    from app.services.visa_service import VisaService
+    return VisaService()
+
+
+@lru_cache()
+def _attractions_scorer():
+    from app.services.attractions_service import AttractionsService
+    return AttractionsService()
+
+
 def calculate_destination_score(
     destination: Destination,
     preferences: UserPreferences
@@ -15,9 +54,7 @@ def calculate_destination_score(
     
     # Weather score (20% weight)
     if destination.weather:
-        from app.services.weather_service import WeatherService
-        weather_service = WeatherService()
-        scores["weather"] = weather_service.calculate_weather_score(
+        scores["weather"] = _weather_scorer().calculate_weather_score(
             destination.weather, 
             preferences.preferred_weather
         )
@@ -26,9 +63,7 @@ def calculate_destination_score(
     
     # Affordability score (25% weight)
     if destination.affordability:
-        from app.services.affordability_service import AffordabilityService
-        affordability_service = AffordabilityService()
-        scores["affordability"] = affordability_service.calculate_affordability_score(
+        scores["affordability"] = _affordability_scorer().calculate_affordability_score(
             destination.affordability,
             preferences.budget_daily,
             preferences.travel_style.value
@@ -38,9 +73,7 @@ def calculate_destination_score(
     
     # Visa score (15% weight)
     if destination.visa:
-        from app.services.visa_service import VisaService
-        visa_service = VisaService()
-        scores["visa"] = visa_service.calculate_visa_score(
+        scores["visa"] = _visa_scorer().calculate_visa_score(
             destination.visa,
             preferences.visa_preference
         )
@@ -49,9 +82,7 @@ def calculate_destination_score(
     
     # Attractions score (20% weight)
     if destination.attractions:
-        from app.services.attractions_service import AttractionsService
-        attractions_service = AttractionsService()
-        scores["attractions"] = attractions_service.calculate_attractions_score(
+        scores["attractions"] = _attractions_scorer().calculate_attractions_score(
             destination.attractions,
             [i.value for i in preferences.interests]
         )
@@ -71,16 +102,7 @@ def calculate_destination_score(
     )
     
     # Calculate weighted overall score
-    weights = {
-        "weather": 0.20,
-        "affordability": 0.25,
-        "visa": 0.15,
-        "attractions": 0.20,
-        "events": 0.10,
-        "interest_alignment": 0.10
-    }
-    
-    overall = sum(scores.get(k, 50) * w for k, w in weights.items())
+    overall = sum(scores.get(k, 50) * w for k, w in _WEIGHTS)
     scores["overall"] = round(overall, 1)
     
     return scores
@@ -0,0 +1,67 @@
+"""
+In-memory token bucket rate limiting keyed by caller (user id or IP).
+Buckets refill lazily on access using time.monotonic(); the per-key table is
+an LRU-bounded OrderedDict so idle callers are evicted first.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class TokenBucket:
+    """A single token bucket: up to `cap` tokens, refilled at `rate` tokens/second"""
+
+    __slots__ = ("tokens", "last", "cap", "rate")
+
+    def __init__(self, cap: float, rate: float, now: float):
+        self.tokens = cap
+        self.last = now
+        self.cap = cap
+        self.rate = rate
+
+    def allow(self, now: float, cost: int = 1) -> bool:
+        """Refill for the time elapsed since the last call, then try to spend `cost` tokens"""
+        self.tokens = min(self.cap, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets with LRU eviction.
+
+    Checks are O(1) and contain no awaits, so calls made from async
+    dependencies on the event loop don't need a lock.
+    """
+
+    def __init__(self, capacity: int, per_seconds: float, max_keys: int = 100_000):
+        self.capacity = float(capacity)
+        self.rate = capacity / per_seconds
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def allow(self, key: str, cost: int = 1, now: Optional[float] = None) -> bool:
+        """Return True if `key` may proceed, spending `cost` tokens"""
+        if now is None:
+            now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.capacity, self.rate, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.allow(now, cost)
+
+    def retry_after(self, cost: int = 1) -> int:
+        """Seconds an empty bucket needs to accumulate `cost` tokens"""
+        return max(1, int(-(-cost // self.rate)))
+
+    def reset(self) -> None:
+        """Forget all buckets"""
+        self._buckets.clear()
@@ -106,3 +106,67 @@ class TestChatRoutes:
         )
         assert feedback.status_code == 200
         assert feedback.json()["destination"] == "Bali"
+
+    def test_travel_chat_validates_raw_json_body(self, client: TestClient):
+        response = client.post(
+            "/api/v1/chat/travel",
+            json={"messages": [{"role": "user", "content": "A beach trip to Bali"}]},
+        )
+        assert response.status_code == 200
+        assert isinstance(response.json()["reply"], str)
+
+        missing = client.post("/api/v1/chat/travel", json={"messages": [{"role": "user"}]})
+        assert missing.status_code == 422
+        assert missing.json()["errors"][0]["loc"] == ["body", "messages", 0, "content"]
+
+        malformed = client.post(
+            "/api/v1/chat/travel",
+            content=b"{not json",
+            headers={"Content-Type": "application/json"},
+        )
+        assert malformed.status_code == 422
+        assert malformed.json()["errors"][0]["type"] == "json_invalid"
+
+    def test_travel_chat_builds_on_prior_extracted(self, client: TestClient):
+        response = client.post(
+            "/api/v1/chat/travel",
+            json={
+                "messages": [{"role": "user", "content": "We are a family of four"}],
+                "prior_extracted": {"origin": "Oslo", "destinations": ["Rome"]},
+            },
+        )
+        assert response.status_code == 200
+        extracted = response.json()["extracted"]
+        assert extracted["origin"] == "Oslo"
+        assert extracted["destinations"] == ["Rome"]
+        assert extracted["traveling_with"] == "family"
+
+    def test_travel_chat_rebuilds_state_from_history_without_prior_extracted(self, client: TestClient):
+        response = client.post(
+            "/api/v1/chat/travel",
+            json={
+                "messages": [
+                    {"role": "user", "content": "Flying from London to Lisbon in June"},
+                    {"role": "assistant", "content": "Lovely. Who is coming along?"},
+                    {"role": "user", "content": "We are a family of four"},
+                ],
+            },
+        )
+        assert response.status_code == 200
+        extracted = response.json()["extracted"]
+        assert extracted["origin"] == "London"
+        assert extracted["destinations"] == ["Lisbon"]
+        assert extracted["travel_dates"]["start"].endswith("-06")
+        assert extracted["traveling_with"] == "family"
+
+    def test_travel_chat_rejects_unknown_roles_and_keys(self, client: TestClient):
+        bad_role = client.post("/api/v1/chat/travel", json={"messages": [{"role": "bot", "content": "hi"}]})
+        assert bad_role.status_code == 422
+        assert bad_role.json()["errors"][0]["type"] == "literal_error"
+
+        extra_key = client.post(
+            "/api/v1/chat/travel",
+            json={"messages": [{"role": "user", "content": "hi", "id": "1"}]},
+        )
+        assert extra_key.status_code == 422
+        assert extra_key.json()["errors"][0]["type"] == "extra_forbidden"
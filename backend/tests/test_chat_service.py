@@ -2,9 +2,18 @@
 Unit tests for ChatService internals (parser + streaming fallback behavior).
 """
 
+import asyncio
 from types import SimpleNamespace
 
-from app.services.chat_service import ChatService, ChatSession
+from app.services.ai_providers import AIFactory
+from app.services.chat_service import (
+    ChatMessage,
+    ChatService,
+    ChatSession,
+    _CombinedStreamParser,
+    _previous_assistant_reply,
+    _recent_history,
+)
 
 
 class _FakeChunk:
@@ -47,6 +56,155 @@ def test_parse_combined_stream_output_tagged_blocks():
     assert extracted["intent"] == "discover"
 
 
+def test_stream_parser_emits_only_response_text_across_split_tags():
+    parser = _CombinedStreamParser()
+    parts = [
+        "<assistant_",
+        "response>Hel",
+        "lo <3 there</assis",
+        'tant_response><extracted_json>{"origin":"Rome"}',
+        "</extracted_json>",
+    ]
+    emitted = [parser.feed(part) for part in parts]
+    assert emitted == ["", "Hel", "lo <3 there", "", ""]
+    assert parser.flush() == ""
+    assert parser.raw == "".join(parts)
+
+    parser = _CombinedStreamParser()
+    assert parser.feed("Plain ") == "Plain "
+    assert parser.feed("<b>reply</b>") == "<b>reply</b>"
+
+    parser = _CombinedStreamParser()
+    assert parser.feed("<assistant_response>Cut off <") == "Cut off "
+    assert parser.flush() == "<"
+
+
+def test_system_prompt_splices_current_context():
+    service = ChatService()
+    session = ChatSession(
+        session_id="prompt-session",
+        extracted_preferences={"origin": "London", "preferences_summary": "beaches {and} food"},
+        current_intent="recommendation",
+    )
+
+    prompt = service._get_system_prompt(session)
+
+    assert prompt.startswith("You are TravelAI")
+    assert "- User preferences: beaches {and} food\n" in prompt
+    assert "- Conversation focus: recommendation\n" in prompt
+    assert '"origin": "London"' in prompt
+    assert prompt.endswith("personalized recommendations.")
+
+
+def test_heuristic_keyword_groups():
+    service = ChatService()
+
+    extracted = service._extract_preferences_heuristic("Cheap trip with the kids, Rome vs Paris?")
+    assert extracted["budget_level"] == "low"
+    assert extracted["traveling_with"] == "family"
+    assert extracted["intent"] == "comparison"
+
+    extracted = service._extract_preferences_heuristic("A five-star honeymoon with my wife")
+    assert extracted["budget_level"] == "luxury"
+    assert extracted["traveling_with"] == "couple"
+    assert extracted["intent"] == "recommendation"
+
+    extracted = service._extract_preferences_heuristic("Beaches, street food, art museums and some hiking")
+    assert extracted["interests"] == ["adventure", "art", "beach", "food"]
+    assert "interests" not in service._extract_preferences_heuristic("Somewhere quiet")
+
+    extracted = service._extract_preferences_heuristic("From London to Lisbon for a week, 2026-05-01 to 2026-06-10 or 2026-07-01")
+    assert extracted["origin"] == "London"
+    assert extracted["destinations"] == ["Lisbon"]
+    assert extracted["travel_dates"] == {"start": "2026-05", "end": "2026-06"}
+    extracted = service._extract_preferences_heuristic("Fly to Rome for a week, visit rome in spring, then to Paris with friends")
+    assert extracted["destinations"] == ["Rome", "Paris"]
+    assert service._extract_preferences_heuristic("Somewhere in October 2027")["travel_dates"] == {
+        "start": "2027-10",
+        "end": "2027-10",
+    }
+
+    session = ChatSession(session_id="stage-session")
+    assert service._infer_planning_stage(session, "Help me with a packing list") == "booking_checklist"
+    assert service._infer_planning_stage(session, "Sketch a day plan") == "itinerary"
+    assert service._infer_planning_stage(session, "Somewhere warm") == "discover"
+
+
+def test_previous_assistant_reply_skips_trailing_user_message():
+    messages = [
+        ChatMessage(role="user", content="hi"),
+        ChatMessage(role="assistant", content="Where to?"),
+        ChatMessage(role="user", content="Rome"),
+    ]
+    assert _previous_assistant_reply(messages) == "Where to?"
+    assert _previous_assistant_reply(messages[:1]) == ""
+    # The trailing message is never considered, whatever its role
+    assert _previous_assistant_reply(messages[:2]) == ""
+
+
+def test_recent_history_keeps_a_fixed_window():
+    messages = [ChatMessage(role="user" if i % 2 == 0 else "assistant", content=str(i)) for i in range(25)]
+    history = _recent_history(messages)
+    assert len(history) == 10
+    assert history[0] == {"role": "assistant", "content": "15"}
+    assert history[-1] == {"role": "user", "content": "24"}
+    assert _recent_history(messages[:3]) == [
+        {"role": "user", "content": "0"},
+        {"role": "assistant", "content": "1"},
+        {"role": "user", "content": "2"},
+    ]
+
+
+def test_fallback_response_dispatches_on_first_matching_topic():
+    service = ChatService()
+
+    def reply(message, **prefs):
+        session = ChatSession(
+            session_id="fallback-session",
+            messages=[ChatMessage(role="user", content=message)],
+            extracted_preferences=prefs,
+        )
+        return service._fallback_response(session)
+
+    assert reply("Weather and flights for Rome?", destinations=["Rome"]).startswith(
+        "I can help with weather for Rome."
+    )
+    assert reply("Can I fly there?", destinations=["Rome"], origin="Oslo").startswith(
+        "I can estimate flights from Oslo to Rome."
+    )
+    assert reply("Any accommodation ideas?", destinations=["Rome"], budget_level="low").startswith(
+        "Got it. For Rome,"
+    )
+    assert reply("Do I need a visa?") == (
+        "I can help with visa guidance. Tell me your destination and passport country."
+    )
+    assert reply("Hello") == "I can build your plan right away. What city are you flying from?"
+    assert reply("Hello", origin="Oslo", destinations=["Rome"], budget_level="low") == (
+        "I can build your plan right away. What dates are you planning to travel?"
+    )
+    assert reply(
+        "Hello",
+        origin="Oslo",
+        destinations=["Rome"],
+        travel_dates={"start": "2026-05"},
+        budget_level="low",
+        traveling_with="solo",
+    ).startswith("Great, I have enough to continue.")
+
+
+def test_chat_service_reuses_the_shared_ai_provider():
+    assert AIFactory.shared_from_settings() is AIFactory.shared_from_settings()
+    assert ChatService().ai_provider is AIFactory.shared_from_settings()
+
+
+def test_parse_json_object_strips_markdown_fences():
+    service = ChatService()
+    assert service._parse_json_object('```json\n{"response": "hi"}\n```') == {"response": "hi"}
+    assert service._parse_json_object('```\n{"a": 1}```') == {"a": 1}
+    assert service._parse_json_object('Sure! {"a": 1} hope that helps') == {"a": 1}
+    assert service._parse_json_object("no json here") is None
+
+
 async def test_streaming_falls_back_to_legacy_when_combined_call_fails_early(monkeypatch):
     service = ChatService()
 
@@ -112,3 +270,69 @@ async def test_streaming_passthrough_handles_short_non_tagged_output(monkeypatch
 
     full = "".join(chunks)
     assert "Short reply" in full
+
+
+async def test_combined_call_requests_json_mode_only_when_supported():
+    service = ChatService()
+    calls = []
+
+    class _RecordingCompletions:
+        async def create(self, **kwargs):
+            calls.append(kwargs)
+            message = SimpleNamespace(content='{"response": "Lisbon it is", "extracted": {"destinations": ["Lisbon"]}}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_RecordingCompletions()))
+    session = ChatSession(session_id="json-mode", messages=[ChatMessage(role="user", content="Lisbon")])
+    grounding = {"facts": {}, "citations": []}
+
+    service.ai_provider = SimpleNamespace(client=client, model="gpt-4o-mini", supports_json_mode=True)
+    reply, extracted = await service._combined_api_call(session, grounding)
+    assert reply == "Lisbon it is"
+    assert extracted == {"destinations": ["Lisbon"]}
+    assert calls[-1]["response_format"] == {"type": "json_object"}
+
+    service.ai_provider = SimpleNamespace(client=client, model="local-model")
+    await service._combined_api_call(session, grounding)
+    assert "response_format" not in calls[-1]
+
+
+async def test_combined_call_falls_back_when_the_provider_is_too_slow(monkeypatch):
+    service = ChatService()
+    cancelled = []
+
+    class _SlowCompletions:
+        async def create(self, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+    service.ai_provider = SimpleNamespace(
+        client=SimpleNamespace(chat=SimpleNamespace(completions=_SlowCompletions())),
+        model="gpt-3.5-turbo",
+    )
+    monkeypatch.setattr(service.settings, "chat_llm_timeout_seconds", 0.01)
+    session = ChatSession(session_id="slow-llm", messages=[ChatMessage(role="user", content="hello")])
+
+    reply, extracted = await service._combined_api_call(session, {"facts": {}, "citations": []})
+    assert reply == service._fallback_response(session)
+    assert extracted == {}
+    assert cancelled == [True]
+
+
+def test_heuristic_is_memoized_without_sharing_mutable_results():
+    service = ChatService()
+    message = "Family trip to Lisbon in June with beaches and food"
+
+    first = service._extract_preferences_heuristic(message)
+    first["destinations"].append("Porto")
+    first["interests"].clear()
+    first["travel_dates"]["start"] = "1999-01"
+
+    second = service._extract_preferences_heuristic(message)
+    assert second["destinations"] == ["Lisbon"]
+    assert second["interests"] == ["beach", "food"]
+    assert second["travel_dates"]["start"].endswith("-06")
+    assert second is not first
@@ -0,0 +1,203 @@
+"""
+Tests for itinerary endpoints
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.auth_routes import limiter as auth_limiter
+from app.database.models import User
+from app.utils.security import get_password_hash
+
+
+ITINERARY_PAYLOAD = {
+    "title": "Paris getaway",
+    "destination_id": "paris_fr",
+    "destination_name": "Paris",
+    "destination_country": "France",
+    "travel_start": "2030-05-01",
+    "travel_end": "2030-05-03",
+    "notes": "Spring trip",
+}
+
+
+@pytest.fixture(autouse=True)
+def reset_login_rate_limit():
+    """Each test logs in at least once; keep the 10/minute login limit out of the way"""
+    auth_limiter.reset()
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def itinerary(client: TestClient, auth_token: str) -> dict:
+    """Create an itinerary owned by the test user"""
+    response = client.post("/api/v1/itineraries", json=ITINERARY_PAYLOAD, headers=_auth(auth_token))
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.fixture
+def other_token(client: TestClient, db_session: Session) -> str:
+    """Get authentication token for a second user"""
+    user = User(
+        email="other@example.com",
+        hashed_password=get_password_hash("password456"),
+        is_active=True
+    )
+    db_session.add(user)
+    db_session.commit()
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "other@example.com", "password": "password456"}
+    )
+    return response.json()["access_token"]
+
+
+class TestItineraryCrud:
+    """Tests for itinerary create/read/update/delete"""
+
+    def test_create_itinerary_generates_days(self, itinerary: dict):
+        """Test creating an itinerary auto-generates one day per travel date"""
+        assert itinerary["title"] == "Paris getaway"
+        assert itinerary["travel_start"] == "2030-05-01"
+        assert itinerary["travel_end"] == "2030-05-03"
+        assert [d["day_number"] for d in itinerary["days"]] == [1, 2, 3]
+        assert itinerary["days"][0]["activities"] == []
+
+    def test_list_itineraries(self, client: TestClient, auth_token: str, itinerary: dict):
+        """Test listing the current user's itineraries"""
+        response = client.get("/api/v1/itineraries", headers=_auth(auth_token))
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["id"] == itinerary["id"]
+        assert data[0]["total_days"] == 3
+        assert data[0]["total_activities"] == 0
+
+    def test_get_itinerary(self, client: TestClient, auth_token: str, itinerary: dict):
+        """Test fetching an itinerary by id"""
+        response = client.get(f"/api/v1/itineraries/{itinerary['id']}", headers=_auth(auth_token))
+        assert response.status_code == 200
+        assert response.json() == itinerary
+
+    def test_update_itinerary(self, client: TestClient, auth_token: str, itinerary: dict):
+        """Test updating itinerary fields"""
+        response = client.put(
+            f"/api/v1/itineraries/{itinerary['id']}",
+            json={"title": "Longer Paris trip", "travel_end": "2030-05-05"},
+            headers=_auth(auth_token)
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["title"] == "Longer Paris trip"
+        assert data["travel_end"] == "2030-05-05"
+
+    def test_delete_itinerary(self, client: TestClient, auth_token: str, itinerary: dict):
+        """Test deleting an itinerary"""
+        response = client.delete(f"/api/v1/itineraries/{itinerary['id']}", headers=_auth(auth_token))
+        assert response.status_code == 204
+        response = client.get(f"/api/v1/itineraries/{itinerary['id']}", headers=_auth(auth_token))
+        assert response.status_code == 404
+
+    def test_get_missing_itinerary(self, client: TestClient, auth_token: str):
+        """Test fetching a non-existent itinerary"""
+        response = client.get("/api/v1/itineraries/does-not-exist", headers=_auth(auth_token))
+        assert response.status_code == 404
+
+
+class TestItineraryOwnership:
+    """Tests for itinerary access control"""
+
+    def test_private_itinerary_hidden_from_other_user(self, client: TestClient, other_token: str, itinerary: dict):
+        """Test another user cannot view a private itinerary"""
+        response = client.get(f"/api/v1/itineraries/{itinerary['id']}", headers=_auth(other_token))
+        assert response.status_code == 403
+
+    def test_public_itinerary_visible_to_other_user(
+        self, client: TestClient, auth_token: str, other_token: str, itinerary: dict
+    ):
+        """Test another user can view a public itinerary but not modify it"""
+        client.put(
+            f"/api/v1/itineraries/{itinerary['id']}",
+            json={"is_public": True},
+            headers=_auth(auth_token)
+        )
+        response = client.get(f"/api/v1/itineraries/{itinerary['id']}", headers=_auth(other_token))
+        assert response.status_code == 200
+
+        response = client.put(
+            f"/api/v1/itineraries/{itinerary['id']}",
+            json={"title": "Hijacked"},
+            headers=_auth(other_token)
+        )
+        assert response.status_code == 403
+
+    def test_other_user_cannot_add_activity(self, client: TestClient, other_token: str, itinerary: dict):
+        """Test another user cannot add activities"""
+        day_id = itinerary["days"][0]["id"]
+        response = client.post(
+            f"/api/v1/itineraries/{itinerary['id']}/days/{day_id}/activities",
+            json={"title": "Louvre"},
+            headers=_auth(other_token)
+        )
+        assert response.status_code == 403
+
+
+class TestItineraryDaysAndActivities:
+    """Tests for day and activity management"""
+
+    def test_add_update_delete_activity(self, client: TestClient, auth_token: str, itinerary: dict):
+        """Test the activity lifecycle on a day"""
+        base = f"/api/v1/itineraries/{itinerary['id']}/days/{itinerary['days'][0]['id']}/activities"
+
+        response = client.post(
+            base,
+            json={"title": "Louvre", "activity_type": "attraction", "cost": 22.0},
+            headers=_auth(auth_token)
+        )
+        assert response.status_code == 200
+        activities = response.json()["days"][0]["activities"]
+        assert len(activities) == 1
+        assert activities[0]["activity_type"] == "attraction"
+        activity_id = activities[0]["id"]
+
+        response = client.put(
+            f"{base}/{activity_id}",
+            json={"cost": 30.0},
+            headers=_auth(auth_token)
+        )
+        assert response.status_code == 200
+        assert response.json()["days"][0]["activities"][0]["cost"] == 30.0
+
+        response = client.delete(f"{base}/{activity_id}", headers=_auth(auth_token))
+        assert response.status_code == 200
+        assert response.json()["days"][0]["activities"] == []
+
+    def test_add_and_delete_day(self, client: TestClient, auth_token: str, itinerary: dict):
+        """Test adding and removing a day"""
+        base = f"/api/v1/itineraries/{itinerary['id']}/days"
+        response = client.post(
+            base,
+            json={"day_number": 4, "date": "2030-05-04T00:00:00", "activities": [{"title": "Versailles"}]},
+            headers=_auth(auth_token)
+        )
+        assert response.status_code == 200
+        days = response.json()["days"]
+        assert [d["day_number"] for d in days] == [1, 2, 3, 4]
+        assert days[-1]["activities"][0]["title"] == "Versailles"
+
+        response = client.delete(f"{base}/{days[-1]['id']}", headers=_auth(auth_token))
+        assert response.status_code == 200
+        assert len(response.json()["days"]) == 3
+
+    def test_update_missing_day(self, client: TestClient, auth_token: str, itinerary: dict):
+        """Test updating a day that does not exist"""
+        response = client.put(
+            f"/api/v1/itineraries/{itinerary['id']}/days/missing",
+            json={"notes": "x"},
+            headers=_auth(auth_token)
+        )
+        assert response.status_code == 404
@@ -0,0 +1,34 @@
+"""
+Tests for the single-pass keyword scans
+"""
+from app.utils.keyword_scan import compile_keyword_table, first_label, labels_in, phrase_matcher
+
+TABLE = {
+    "culture": ("art", "museum"),
+    "food": ("street food", "food"),
+    "craft": ("artisan",),
+}
+SCAN = compile_keyword_table(TABLE)
+
+
+def test_labels_in_reports_overlapping_keywords():
+    assert labels_in("museum then street food", SCAN) == {"culture", "food"}
+    assert labels_in("nothing here", SCAN) == set()
+
+
+def test_longest_keyword_at_an_offset_hides_shorter_ones():
+    # "art" and "artisan" start at the same offset; only the longer is reported
+    assert labels_in("artisan bakeries", SCAN) == {"craft"}
+    assert labels_in("art and artisan", SCAN) == {"culture", "craft"}
+
+
+def test_first_label_follows_table_order():
+    assert first_label("food and art", TABLE, SCAN) == "culture"
+    assert first_label("artisan food", TABLE, SCAN) == "food"
+    assert first_label("nothing here", TABLE, SCAN) is None
+
+
+def test_phrase_matcher_matches_whole_words_only():
+    pattern = phrase_matcher(["new york", "york", "rome"])
+    assert [m.group(1) for m in pattern.finditer("new york or rome")] == ["new york", "york", "rome"]
+    assert pattern.search("romeo") is None
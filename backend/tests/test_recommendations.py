@@ -68,6 +68,27 @@ async def test_generate_recommendations_sorts_and_limits(monkeypatch):
     assert all(isinstance(d.recommendation_reason, str) and d.recommendation_reason for d in results)
 
 
+async def test_generate_recommendations_accepts_async_iterable(monkeypatch):
+    service = AIRecommendationService()
+    request = _make_request(num_recommendations=2)
+    monkeypatch.setattr(service, "_get_client", lambda: None)
+
+    score_map = {"a": 50.0, "b": 90.0, "c": 70.0}
+    monkeypatch.setattr(
+        "app.services.ai_recommendation_service.calculate_destination_score",
+        lambda destination, _preferences: {"overall": score_map[destination.id]},
+    )
+
+    async def arriving():
+        for dest_id, name in [("a", "Alpha"), ("b", "Beta"), ("c", "Gamma")]:
+            yield _make_destination(dest_id, name)
+
+    results = await service.generate_recommendations(request, arriving())
+
+    assert [d.id for d in results] == ["b", "c"]
+    assert results[0].overall_score == 90.0
+
+
 async def test_compare_destinations_returns_empty_without_llm(monkeypatch):
     service = AIRecommendationService()
     monkeypatch.setattr(service, "_get_client", lambda: None)
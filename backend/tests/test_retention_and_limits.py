@@ -8,6 +8,7 @@ from app.api import auto_research_routes
 from app.config import get_settings
 from app.database.models import AnalyticsEvent, PersistedChatSession
 from app.services import retention_service
+from app.utils.token_bucket import TokenBucketLimiter
 
 
 def test_run_retention_cleanup_deletes_expired_and_old_records(db_session, monkeypatch):
@@ -88,3 +89,26 @@ def test_auto_research_start_rate_limited(client, monkeypatch):
 
     # Limiter is 60/minute; repeated calls should trigger 429.
     assert 429 in statuses
+
+
+def test_token_bucket_allows_burst_then_refills():
+    limiter = TokenBucketLimiter(capacity=3, per_seconds=3)
+
+    assert [limiter.allow("a", now=0.0) for _ in range(4)] == [True, True, True, False]
+    # Other keys have their own bucket.
+    assert limiter.allow("b", now=0.0)
+    # One token per second refills lazily, capped at capacity.
+    assert limiter.allow("a", now=1.0)
+    assert not limiter.allow("a", now=1.0)
+    assert [limiter.allow("a", now=100.0) for _ in range(4)] == [True, True, True, False]
+
+
+def test_token_bucket_evicts_least_recently_used_key():
+    limiter = TokenBucketLimiter(capacity=1, per_seconds=60, max_keys=2)
+
+    assert limiter.allow("a", now=0.0)
+    assert limiter.allow("b", now=0.0)
+    assert not limiter.allow("a", now=0.0)  # touches "a"
+    assert limiter.allow("c", now=0.0)  # evicts "b"
+
+    assert limiter.allow("b", now=0.0)  # fresh bucket for "b"
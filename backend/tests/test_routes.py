@@ -1,11 +1,17 @@
 """
 Tests for recommendation and destination endpoints
 """
+import json
 import pytest
 from fastapi.testclient import TestClient
 from datetime import date, timedelta
 from sqlalchemy.orm import Session
 
+from app.main import app
+from app.api import routes
+from app.database.models import SearchHistory
+from app.models.user import TravelRequest
+
 
 class TestDestinations:
     """Tests for destinations endpoints"""
@@ -36,6 +42,24 @@ class TestDestinations:
         data = response.json()
         assert all(d["country_code"] == "JP" for d in data)
 
+    def test_list_destinations_query_and_country(self, client: TestClient):
+        """Test query and country filters combine, case-insensitively"""
+        response = client.get("/api/v1/destinations?query=japan&country=jp")
+        assert response.status_code == 200
+        ids = {d["id"] for d in response.json()}
+        assert ids == {"tokyo_jp", "kyoto_jp"}
+
+        response = client.get("/api/v1/destinations?query=paris&country=JP")
+        assert response.json() == []
+
+    def test_list_destinations_unfiltered_pages(self, client: TestClient):
+        """Test unfiltered pages match the source list at precomputed and other sizes"""
+        for max_results in (20, 7):
+            response = client.get(f"/api/v1/destinations?max_results={max_results}")
+            assert response.status_code == 200
+            assert response.json() == routes.POPULAR_DESTINATIONS[:max_results]
+            assert response.headers["etag"].startswith('W/"')
+
     def test_list_destinations_max_results(self, client: TestClient):
         """Test limiting results"""
         response = client.get("/api/v1/destinations?max_results=5")
@@ -52,6 +76,19 @@ class TestDestinations:
         assert data["name"] == "Paris"
         assert data["country"] == "France"
 
+    def test_get_destination_details_fetches_events_with_dates(self, client: TestClient, fake_services):
+        """Test events are fetched only when both travel dates are given"""
+        events = fake_services[routes.get_events_service]
+
+        response = client.get("/api/v1/destinations/paris_fr")
+        assert response.status_code == 200
+        assert response.json()["events"] == []
+        assert events.calls == []
+
+        response = client.get("/api/v1/destinations/paris_fr?travel_start=2026-06-10&travel_end=2026-06-15")
+        assert response.status_code == 200
+        assert [name for name, _ in events.calls] == ["get_events"]
+
     def test_get_destination_not_found(self, client: TestClient):
         """Test getting non-existent destination"""
         response = client.get("/api/v1/destinations/nonexistent")
@@ -90,6 +127,51 @@ class TestVisaRequirements:
         assert "summary" in data
 
 
+class TestHttpCaching:
+    """Tests for ETag / Cache-Control on read-only endpoints"""
+
+    def test_visa_requirements_cache_headers(self, client: TestClient):
+        """Test visa responses carry a long-lived Cache-Control and an ETag"""
+        response = client.get("/api/v1/visa-requirements/US/FR")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=86400"
+        assert response.headers["etag"]
+
+    def test_if_none_match_returns_304(self, client: TestClient):
+        """Test a matching If-None-Match short-circuits to 304"""
+        first = client.get("/api/v1/destinations?country=JP")
+        etag = first.headers["etag"]
+
+        response = client.get("/api/v1/destinations?country=JP", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_destinations_etag_tracks_filters(self, client: TestClient):
+        """Test destination list ETags are weak and vary with the filter inputs"""
+        japan = client.get("/api/v1/destinations?country=JP").headers["etag"]
+        france = client.get("/api/v1/destinations?country=FR").headers["etag"]
+        assert japan.startswith('W/"')
+        assert japan != france
+        assert client.get("/api/v1/destinations?country=jp").headers["etag"] == japan
+
+        # If-None-Match uses weak comparison, so the opaque tag alone matches too
+        response = client.get("/api/v1/destinations?country=JP", headers={"If-None-Match": japan[2:]})
+        assert response.status_code == 304
+
+    def test_large_response_is_gzipped(self, client: TestClient):
+        """Test responses above the size threshold are gzip-compressed"""
+        response = client.get("/api/v1/destinations?max_results=50", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_stale_etag_returns_body(self, client: TestClient):
+        """Test a non-matching If-None-Match returns the full response"""
+        response = client.get("/api/v1/destinations", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert len(response.json()) > 0
+
+
 class TestWeather:
     """Tests for weather endpoint"""
 
@@ -118,3 +200,152 @@ class TestAttractions:
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
+
+
+class _FakeService:
+    """Records calls and returns a canned value for any async service method"""
+
+    def __init__(self, result=None):
+        self.calls = []
+        self.result = result
+
+    def __getattr__(self, name):
+        async def method(*args, **kwargs):
+            self.calls.append((name, args))
+            return self.result
+        return method
+
+
+class _FakeAIService:
+    async def generate_recommendations(self, request, destinations):
+        return [dest async for dest in destinations][:request.num_recommendations]
+
+    def score_destination(self, dest, preferences):
+        dest.overall_score = 50.0
+        return dest
+
+
+@pytest.fixture
+def fake_services(client: TestClient):
+    """Swap the enrichment services for in-memory fakes"""
+    services = {
+        routes.get_ai_service: _FakeAIService(),
+        routes.get_weather_service: _FakeService(),
+        routes.get_visa_service: _FakeService(),
+        routes.get_attractions_service: _FakeService([]),
+        routes.get_affordability_service: _FakeService(),
+        routes.get_events_service: _FakeService([]),
+    }
+    for provider, fake in services.items():
+        app.dependency_overrides[provider] = (lambda f: lambda: f)(fake)
+    routes.recommendations_limiter.reset()
+    routes._visa_cache.clear()
+    yield services
+    routes._visa_cache.clear()
+    for provider in services:
+        app.dependency_overrides.pop(provider, None)
+
+
+class TestRecommendations:
+    """Tests for the recommendations endpoint"""
+
+    def _request(self, **prefs) -> dict:
+        start = date.today() + timedelta(days=30)
+        return {
+            "origin": "London",
+            "travel_start": str(start),
+            "travel_end": str(start + timedelta(days=7)),
+            "num_recommendations": 3,
+            "user_preferences": prefs,
+        }
+
+    def test_recommendations_use_injected_services(self, client: TestClient, fake_services):
+        """Test recommendations are enriched through the injected services"""
+        response = client.post("/api/v1/recommendations", json=self._request())
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 3
+        assert all(d["city"] != "London" for d in data)
+        visa_calls = fake_services[routes.get_visa_service].calls
+        assert visa_calls and all(args[0] == "US" for _, args in visa_calls)
+
+    def test_recommendations_respect_continent(self, client: TestClient, fake_services):
+        """Test the preferred continent filter is applied to candidates"""
+        response = client.post("/api/v1/recommendations", json=self._request(preferred_continent="asia"))
+        assert response.status_code == 200
+        ids = {d["id"] for d in response.json()}
+        assert ids <= {"tokyo_jp", "bali_id", "singapore_sg", "bangkok_th", "kyoto_jp"}
+
+    def test_recommendations_share_duplicate_lookups(self, client: TestClient, fake_services):
+        """Test candidates in the same country share one visa and affordability lookup"""
+        # Tokyo and Kyoto are both in Japan
+        response = client.post("/api/v1/recommendations", json=self._request(preferred_continent="asia"))
+        assert response.status_code == 200
+        for provider in (routes.get_visa_service, routes.get_affordability_service):
+            calls = fake_services[provider].calls
+            assert len(calls) == len(set(calls))
+
+    def test_visa_lookups_cached_across_requests(self, client: TestClient, fake_services):
+        """Test a repeat request reuses visa results from the process-wide cache"""
+        visa_calls = fake_services[routes.get_visa_service].calls
+        assert client.post("/api/v1/recommendations", json=self._request()).status_code == 200
+        first = len(visa_calls)
+        assert client.post("/api/v1/recommendations", json=self._request()).status_code == 200
+        assert first > 0
+        assert len(visa_calls) == first
+
+    def test_stream_recommendations_ndjson(self, client: TestClient, fake_services):
+        """Test the streaming endpoint emits one scored destination per line"""
+        response = client.post("/api/v1/recommendations/stream", json=self._request(preferred_continent="asia"))
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        # Not gzipped, so lines are flushed to the client as they are produced
+        assert "content-encoding" not in response.headers
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert {row["id"] for row in rows} == {"tokyo_jp", "bali_id", "singapore_sg", "bangkok_th", "kyoto_jp"}
+        assert all(row["overall_score"] == 50.0 for row in rows)
+
+    def test_recommendations_rate_limited_per_user(self, client: TestClient, fake_services, auth_token: str):
+        """Test the token bucket rejects a user's burst but not other callers"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        statuses = [
+            client.post("/api/v1/recommendations", json=self._request(), headers=headers).status_code
+            for _ in range(31)
+        ]
+        assert statuses[:30] == [200] * 30
+        assert statuses[30] == 429
+
+        # Anonymous callers are keyed by IP and have their own bucket
+        response = client.post("/api/v1/recommendations", json=self._request())
+        assert response.status_code == 200
+
+
+class TestSearchHistory:
+    """Tests for background search history writes"""
+
+    def test_save_uses_a_fresh_session_and_closes_it(self, db_session: Session, test_user, monkeypatch):
+        """Test each save opens its own session and closes it afterwards"""
+        opened = []
+
+        def session_factory():
+            session = Session(bind=db_session.get_bind())
+            opened.append(session)
+            return session
+
+        monkeypatch.setattr(routes, "SessionLocal", session_factory)
+
+        start = date.today() + timedelta(days=30)
+        request = TravelRequest(
+            origin="London",
+            travel_start=start,
+            travel_end=start + timedelta(days=7),
+            user_preferences={},
+        )
+        routes._save_search_history(test_user.id, request, 3)
+        routes._save_search_history(test_user.id, request, 5)
+
+        assert len(opened) == 2 and opened[0] is not opened[1]
+        assert not any(session.in_transaction() for session in opened)
+        rows = db_session.query(SearchHistory).filter_by(user_id=test_user.id).all()
+        assert sorted(r.results_count for r in rows) == [3, 5]
+        assert rows[0].search_query.startswith("From London, 1 travelers")
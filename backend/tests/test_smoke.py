@@ -30,3 +30,16 @@ def test_chat_smoke_roundtrip(client: TestClient):
     session = fetch.json()
     assert session["session_id"] == session_id
     assert session["message_count"] >= 2
+
+
+def test_social_placeholders_smoke():
+    from fastapi import FastAPI
+    from app.api.social_routes import router as social_router
+
+    social_app = FastAPI()
+    social_app.include_router(social_router)
+    with TestClient(social_app) as social_client:
+        assert social_client.get("/api/v1/social/feed/trending").json() == []
+        assert social_client.get("/api/v1/social/influencers/abc").status_code == 501
+        feed = social_client.post("/api/v1/social/feed", json={}).json()
+        assert feed["items"] == [] and feed["has_more"] is False
@@ -0,0 +1,112 @@
+"""
+Tests for the smart suggestions endpoint
+"""
+import orjson
+from fastapi.testclient import TestClient
+
+from app.api import suggestions_routes
+
+
+class TestSimilar:
+    """Tests for GET /suggestions/similar"""
+
+    def test_similar_single_city(self, client: TestClient):
+        """Test curated alternatives are returned in order for a known city"""
+        response = client.get("/api/v1/suggestions/similar?cities=Paris")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["input_cities"] == ["paris"]
+        assert [s["city"] for s in data["suggestions"]] == ["Lyon", "Bruges", "Prague"]
+        assert set(data["suggestions"][0]) == {"city", "country", "reason"}
+
+    def test_similar_multi_city_dedupes_and_limits(self, client: TestClient):
+        """Test suggestions across cities skip inputs and duplicates and respect limit"""
+        response = client.get("/api/v1/suggestions/similar?cities=lisbon,barcelona&limit=8")
+        cities = [s["city"] for s in response.json()["suggestions"]]
+        assert cities == ["Porto", "Seville", "Valencia", "San Sebastián"]
+
+        response = client.get("/api/v1/suggestions/similar?cities=lisbon,barcelona&limit=2")
+        assert [s["city"] for s in response.json()["suggestions"]] == ["Porto", "Seville"]
+
+    def test_similar_normalises_input(self, client: TestClient):
+        """Test input cities are lowercased, trimmed and de-hyphenated"""
+        response = client.get("/api/v1/suggestions/similar?cities= New-York ,,")
+        data = response.json()
+        assert data["input_cities"] == ["new york"]
+        assert [s["city"] for s in data["suggestions"]] == ["Chicago", "Toronto", "Montreal"]
+
+    def test_similar_resolves_aliases(self, client: TestClient):
+        """Test aliases and spacing variants resolve to the curated city"""
+        response = client.get("/api/v1/suggestions/similar", params={"cities": "NYC,newyork,New   York,capetown"})
+        data = response.json()
+        assert data["input_cities"] == ["new york", "cape town"]
+        expected = client.get("/api/v1/suggestions/similar?cities=new york,cape town").json()
+        assert data["suggestions"] == expected["suggestions"]
+
+    def test_similar_dedupes_input_cities(self, client: TestClient):
+        """Test repeated input cities are echoed and expanded once"""
+        response = client.get("/api/v1/suggestions/similar?cities=rome,Rome,kyoto")
+        assert response.json()["input_cities"] == ["rome", "kyoto"]
+
+    def test_similar_unknown_city_uses_fallbacks(self, client: TestClient):
+        """Test unknown cities are topped up with generic fallbacks, skipping inputs"""
+        response = client.get("/api/v1/suggestions/similar?cities=porto,atlantis")
+        data = response.json()
+        assert [s["city"] for s in data["suggestions"]] == ["Lisbon", "Tbilisi", "Chiang Mai", "Oaxaca"]
+
+    def test_similar_equivalent_inputs_share_cache_entry(self, client: TestClient):
+        """Test spelling variants hit one cached response while city order still matters"""
+        suggestions_routes._similar_body.cache_clear()
+        a = client.get("/api/v1/suggestions/similar?cities=Tokyo, Paris&limit=2").json()
+        b = client.get("/api/v1/suggestions/similar?cities=tokyo,PARIS&limit=2").json()
+        assert a == b
+        assert suggestions_routes._similar_body.cache_info().hits == 1
+
+        c = client.get("/api/v1/suggestions/similar?cities=paris,tokyo&limit=2").json()
+        assert [s["city"] for s in c["suggestions"]] == ["Lyon", "Bruges"]
+        assert [s["city"] for s in a["suggestions"]] == ["Osaka", "Seoul"]
+
+    def test_similar_cache_headers_and_304(self, client: TestClient):
+        """Test responses carry an ETag and a matching If-None-Match gets a 304"""
+        first = client.get("/api/v1/suggestions/similar?cities=tokyo")
+        assert first.headers["cache-control"] == "public, max-age=86400"
+        etag = first.headers["etag"]
+
+        response = client.get("/api/v1/suggestions/similar?cities=Tokyo", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_similar_is_gzipped(self, client: TestClient):
+        """Test small suggestion payloads are still compressed"""
+        response = client.get("/api/v1/suggestions/similar?cities=paris", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_byte_assembled_bodies_match_orjson(self):
+        """Test bodies assembled from pre-serialized fragments equal a plain orjson dump"""
+        city_lists = [(city,) for city in suggestions_routes.SIMILAR]
+        city_lists += [("lisbon", "barcelona"), ("porto", "atlantis"), ("atlantis",), ("kyoto", "tokyo", "seoul")]
+        for city_list in city_lists:
+            for limit in range(1, 9):
+                body, _ = suggestions_routes._similar_body.__wrapped__(city_list, limit)
+                expected = orjson.dumps({
+                    "input_cities": city_list,
+                    "suggestions": suggestions_routes._suggest(city_list, limit),
+                })
+                assert body == expected
+                if len(city_list) == 1 and city_list[0] in suggestions_routes._PRECANNED:
+                    assert suggestions_routes._PRECANNED[city_list[0]][limit - 1][0] == expected
+
+    def test_similar_validates_limit(self, client: TestClient):
+        """Test limit outside 1..8 is rejected"""
+        response = client.get("/api/v1/suggestions/similar?cities=paris&limit=9")
+        assert response.status_code == 422
+
+    def test_similar_validates_cities(self, client: TestClient):
+        """Test cities with unexpected characters or excessive length are rejected"""
+        response = client.get("/api/v1/suggestions/similar?cities=<script>")
+        assert response.status_code == 422
+        response = client.get("/api/v1/suggestions/similar", params={"cities": "a" * 201})
+        assert response.status_code == 422
+        response = client.get("/api/v1/suggestions/similar", params={"cities": "Cancún, St. John's"})
+        assert response.status_code == 200
+        assert response.json()["input_cities"] == ["cancún", "st. john's"]
@@ -0,0 +1,94 @@
+"""
+Tests for the autonomous agent's deterministic preference extraction
+"""
+from datetime import date
+
+import pytest
+
+from app.services.trip_preferences import (
+    _SOFT_FIELD_QUESTIONS,
+    _extract_preferences,
+    _get_missing_fields,
+    _has_min_requirements,
+    _normalize_travel_dates,
+)
+
+THIS_YEAR = date.today().year
+
+EXTRACTION_CASES = [
+    # Months: the earliest mention wins, and a year or duration shapes the range
+    ("Bali in July or maybe March", {}, {
+        "destinations": ["Bali"],
+        "travel_dates": {"start": f"{THIS_YEAR}-07-01", "end": f"{THIS_YEAR}-07-08"},
+    }),
+    ("Lisbon in march 2027 for 10 days", {}, {
+        "destinations": ["Lisbon"],
+        "duration": 10,
+        "travel_dates": {"start": "2027-03-01", "end": "2027-03-11"},
+    }),
+    # "mar" only counts as a whole word, so "market" is an interest, not March
+    ("browsing the night market in Bangkok", {}, {"destinations": ["Bangkok"], "interests": ["shopping"]}),
+    # Interests come out in table order and extend the ones already known
+    ("snorkeling and street food", {}, {"interests": ["food", "beach"]}),
+    ("museums please", {"interests": ["beach"]}, {"interests": ["beach", "culture"]}),
+    # A bare region replaces the previous destination with region context
+    ("somewhere in southeast asia", {"destinations": ["Bali"]}, {"region_intent": "Asia"}),
+    ("cancel that", {"destinations": ["Bali"]}, {}),
+    # Aliases resolve to the canonical city
+    ("a weekend in NYC", {}, {"destinations": ["New York"]}),
+    # Origin, duration in weeks and a dollar amount
+    ("Tokyo from London for 2 weeks, $3,000", {}, {
+        "origin": "London",
+        "destinations": ["Tokyo"],
+        "duration": 14,
+        "budget_amount": 3000,
+    }),
+    # Budget words match as substrings, so hyphenated and inflected forms count
+    ("cheaper hostels", {}, {"budget_level": "budget"}),
+    ("five star hotels", {}, {"budget_level": "luxury"}),
+    ("mid-range places", {}, {"budget_level": "moderate"}),
+    ("a luxury-style weekend", {}, {"budget_level": "luxury"}),
+    ("premium-class flights", {}, {"budget_level": "luxury"}),
+    ("moderate-priced stay", {}, {"budget_level": "moderate"}),
+    ("cheap-ish hotels", {}, {"budget_level": "budget"}),
+    ("travelling cheaply", {}, {"budget_level": "budget"}),
+    ("hostelling around", {}, {"budget_level": "budget"}),
+    ("a moderate budget", {}, {"budget_level": "moderate"}),
+    ("on a budget", {}, {"budget_level": "budget"}),
+    ("just me, travelling alone", {}, {"traveling_with": "solo"}),
+]
+
+
+@pytest.mark.parametrize("text,existing,expected", EXTRACTION_CASES)
+def test_extract_preferences(text, existing, expected):
+    assert _extract_preferences(text, existing) == expected
+
+
+def test_extract_preferences_does_not_mutate_existing():
+    existing = {"destinations": ["Bali"], "interests": ["beach"]}
+    _extract_preferences("start fresh with museums", existing)
+    assert existing == {"destinations": ["Bali"], "interests": ["beach"]}
+
+
+def test_missing_fields_follow_table_order():
+    assert [f["field"] for f in _get_missing_fields({"origin": "London"})] == ["destinations"]
+    prefs = {"destinations": ["Bali"], "origin": "London", "duration": 7}
+    assert [f["field"] for f in _get_missing_fields(prefs)] == [
+        "travel_dates", "traveling_with", "budget_level", "interests",
+    ]
+    complete = {"destinations": ["Bali"], **{field: "x" for field, _ in _SOFT_FIELD_QUESTIONS}}
+    assert _get_missing_fields(complete) == []
+
+
+def test_min_requirements_need_only_a_destination():
+    assert _has_min_requirements({"destinations": ["Bali"]})
+    assert not _has_min_requirements({"origin": "London", "travel_dates": {"start": "2026-05-01"}})
+
+
+@pytest.mark.parametrize("value,duration,expected", [
+    ("2026-05-03 to 2026-05-10", None, {"start": "2026-05-03", "end": "2026-05-10"}),
+    ("2026-05", None, {"start": "2026-05-01", "end": "2026-05-08"}),
+    ("june 2027", 5, {"start": "2027-06-01", "end": "2027-06-06"}),
+])
+def test_normalize_travel_dates(value, duration, expected):
+    assert _normalize_travel_dates(value, duration) == expected
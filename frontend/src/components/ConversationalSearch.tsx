@@ -70,6 +70,7 @@ function buildTravelRequest(extracted: Record<string, any>): TravelRequest {
 export default function ConversationalSearch({ onSubmit, isLoading }: ConversationalSearchProps) {
   const [messages, setMessages] = useState<Message[]>([]);
   const [history, setHistory] = useState<Array<{ role: 'user' | 'assistant'; content: string }>>([]);
+  const [extracted, setExtracted] = useState<Record<string, any> | undefined>(undefined);
   const [inputValue, setInputValue] = useState('');
   const [isThinking, setIsThinking] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
@@ -105,7 +106,8 @@ export default function ConversationalSearch({ onSubmit, isLoading }: Conversati
     setHistory(newHistory);
 
     try {
-      const result = await api.travelChat(newHistory);
+      const result = await api.travelChat(newHistory, extracted);
+      setExtracted(result.extracted);
 
       const botMsg: Message = {
         id: (Date.now() + 1).toString(),
@@ -133,7 +135,7 @@ export default function ConversationalSearch({ onSubmit, isLoading }: Conversati
       setIsThinking(false);
       setTimeout(() => inputRef.current?.focus(), 100);
     }
-  }, [history, isThinking, onSubmit]);
+  }, [history, extracted, isThinking, onSubmit]);
 
   const handleKeyDown = (e: React.KeyboardEvent<HTMLInputElement>) => {
     if (e.key === 'Enter' && !e.shiftKey) {
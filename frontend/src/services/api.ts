@@ -385,13 +385,16 @@ class ApiService {
   }
 
   // Natural language travel chat (LLM-powered preference extraction)
-  async travelChat(messages: Array<{ role: 'user' | 'assistant'; content: string }>): Promise<{
+  async travelChat(
+    messages: Array<{ role: 'user' | 'assistant'; content: string }>,
+    priorExtracted?: Record<string, any>,
+  ): Promise<{
     reply: string;
     extracted: Record<string, any>;
     ready: boolean;
     suggestions: string[];
   }> {
-    const response = await this.client.post('/chat/travel', { messages });
+    const response = await this.client.post('/chat/travel', { messages, prior_extracted: priorExtracted });
     return response.data;
   }
 